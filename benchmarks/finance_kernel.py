@@ -0,0 +1,77 @@
+"""
+Micro-benchmark: utils.finance kernel vs the list-comprehension npv/irr/payback
+it replaced. Run from the repo root:
+
+    python -m benchmarks.finance_kernel
+"""
+import timeit
+
+import numpy as np
+
+from utils.finance import irr, npv, payback_period
+
+
+# ------------------------------------------------------------
+# Previous implementations (page + utils copies), for reference
+# ------------------------------------------------------------
+
+def npv_listcomp(rate, flows):
+    return np.sum([cf / (1 + rate)**t for t, cf in enumerate(flows, start=1)])
+
+
+def irr_bisection(flows):
+    lo, hi = -0.99, 5.0
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        npv_mid = sum(cf / (1 + mid)**t for t, cf in enumerate(flows, start=0))
+        npv_lo = sum(cf / (1 + lo)**t for t, cf in enumerate(flows, start=0))
+        if npv_mid == 0 or abs(npv_mid) < 1e-6:
+            return mid
+        if npv_lo * npv_mid < 0:
+            hi = mid
+        else:
+            lo = mid
+    return 0.0
+
+
+def payback_loop(flows):
+    cum = np.cumsum(flows)
+    for i in range(1, len(flows)):
+        if cum[i] >= 0:
+            return i - 1 + (abs(cum[i-1]) / flows[i])
+    return None
+
+
+def _best(fn, number):
+    try:
+        return min(timeit.repeat(fn, number=number, repeat=5)) / number
+    except OverflowError:
+        return float("nan")    # the scalar bisection overflows on long horizons
+
+
+def main():
+    print(f"{'periods':>8} {'metric':>8} {'old (us)':>12} {'kernel (us)':>12} {'speed-up':>9}")
+    for periods in (10, 100, 1000):
+        # Monthly-scale rate for long horizons so discount factors stay representable.
+        rate = 0.1 if periods <= 100 else 0.008
+        flows = np.full(periods, 120_000.0)
+        flows[0] = -1_000_000.0
+        as_list = flows.tolist()
+        # Recovered only in the last period, the loop's worst case.
+        late = np.full(periods, 120_000.0)
+        late[0] = -120_000.0 * (periods - 1)
+        cases = [
+            ("npv", lambda: npv_listcomp(rate, as_list), lambda: npv(rate, flows, timing="end")),
+            ("irr", lambda: irr_bisection(as_list), lambda: irr(flows)),
+            ("payback", lambda: payback_loop(flows), lambda: payback_period(flows)),
+            ("pb late", lambda: payback_loop(late), lambda: payback_period(late)),
+        ]
+        for name, old, new in cases:
+            number = 20 if name == "irr" and periods >= 1000 else 200
+            t_old, t_new = _best(old, number), _best(new, number)
+            ratio = f"{t_old/t_new:>8.1f}x" if t_old == t_old else "  failed"
+            print(f"{periods:>8} {name:>8} {t_old*1e6:>12.1f} {t_new*1e6:>12.1f} {ratio}")
+
+
+if __name__ == "__main__":
+    main()
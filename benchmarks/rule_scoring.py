@@ -0,0 +1,48 @@
+"""
+Micro-benchmark: rule-bank scoring with the dict engine, a full CompiledRules
+rescore and one IncrementalScorer answer change. Run from the repo root:
+
+    python -m benchmarks.rule_scoring
+"""
+import random
+import timeit
+
+from utils.bm_rule_engine import (
+    CompiledRules, IncrementalScorer, compute_rule_score, load_rules, normalize_rule_weights,
+)
+
+
+def synthetic_rules(questions, models, answers=4, weights=5, seed=0):
+    """Normalized-style rules: every answer weights a few random models."""
+    rng = random.Random(seed)
+    return {
+        f"q{i}": {f"a{i}_{j}": {f"BM{rng.randrange(models):05d}": rng.random() for _ in range(weights)}
+                  for j in range(answers)}
+        for i in range(questions)
+    }
+
+
+def _best(fn, number):
+    return min(timeit.repeat(fn, number=number, repeat=7)) / number
+
+
+def main():
+    rng = random.Random(1)
+    banks = [("current bank", normalize_rule_weights(load_rules())), ("3000 x 3000", synthetic_rules(3000, 3000))]
+    print(f"{'bank':>14} {'dict (us)':>10} {'compiled (us)':>14} {'incremental (us)':>17}")
+    for name, rules in banks:
+        compiled = CompiledRules.from_normalized(rules)
+        profile = {q: rng.choice(list(a)) for q, a in rules.items()}
+        scorer = IncrementalScorer(compiled, k=5)
+        scorer.reset(profile)
+        qid, options = next(iter(rules.items()))
+        flip = iter(list(options) * 1_000_000)
+
+        t_dict = _best(lambda: compute_rule_score(profile, rules), 5)
+        t_full = _best(lambda: compiled.score_vector(profile), 200)
+        t_inc = _best(lambda: scorer.set_answer(qid, next(flip)), 2000)
+        print(f"{name:>14} {t_dict*1e6:>10.1f} {t_full*1e6:>14.1f} {t_inc*1e6:>17.1f}")
+
+
+if __name__ == "__main__":
+    main()
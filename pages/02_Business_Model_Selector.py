@@ -2,6 +2,8 @@ import streamlit as st
 import json
 import textwrap
 
+from utils.bm_rule_engine import IncrementalScorer, load_compiled
+
 # --------------------------------------
 # PAGE CONFIG
 # --------------------------------------
@@ -62,6 +64,41 @@ def score_model(model, archetype_tags):
     return final_score
 
 
+# --------------------------------------
+# RULE-BANK QUESTIONNAIRE (live rescoring)
+# --------------------------------------
+ACRONYMS = {"sme", "ai", "ip", "hw"}
+
+def question_label(qid):
+    return qid.split("_", 1)[1].replace("_", " ").capitalize()
+
+def option_label(key):
+    if key is None:
+        return "— not answered —"
+    words = [w.upper() if w in ACRONYMS else w for w in key.split("_")[1:] or [key]]
+    text = " ".join(words)
+    return text[0].upper() + text[1:]
+
+def rule_scorer():
+    """Session scorer over the compiled rule bank; rebuilt if the bank changes on disk."""
+    compiled = load_compiled()
+    scorer = st.session_state.get("rule_scorer")
+    if scorer is None or scorer.compiled is not compiled:
+        answers = scorer.answers if scorer is not None else {}
+        scorer = IncrementalScorer(compiled, k=5)
+        scorer.reset(answers)
+        st.session_state["rule_scorer"] = scorer
+    return scorer
+
+def rule_answer_changed(qid):
+    """Widget callback: apply one answer change as a delta on the running scores."""
+    ans = st.session_state[f"rule_{qid}"]
+    if ans is None:
+        rule_scorer().clear_answer(qid)
+    else:
+        rule_scorer().set_answer(qid, ans)
+
+
 # --------------------------------------
 # SESSION STATE
 # --------------------------------------
@@ -162,6 +199,43 @@ if st.session_state["secondary_done"]:
 
     st.markdown("</div>", unsafe_allow_html=True)
 
+    # Detailed questionnaire: every answer change rescores only the models it touches.
+    scorer = rule_scorer()
+    questions = {}
+    for qid, ans in scorer.compiled.options:
+        questions.setdefault(qid, []).append(ans)
+
+    st.markdown("<div class='section-block'>", unsafe_allow_html=True)
+    st.markdown("## 🧭 Refine With the Detailed Questionnaire")
+    st.caption("Optional. Recommendations below update as you answer.")
+
+    with st.expander(f"Answer any of the {len(questions)} questions"):
+        cols = st.columns(3)
+        for i, (qid, options) in enumerate(questions.items()):
+            choices = [None] + options
+            # Widget state is dropped on runs that skip the questionnaire; the scorer keeps the answers.
+            answer = scorer.answers.get(qid)
+            cols[i % 3].selectbox(
+                question_label(qid),
+                choices,
+                index=choices.index(answer) if answer in choices else 0,
+                format_func=option_label,
+                key=f"rule_{qid}",
+                on_change=rule_answer_changed,
+                args=(qid,)
+            )
+
+    models_by_id = {m["id"]: m for m in BUSINESS_MODELS}
+    matches = [(models_by_id[mid], score) for mid, score in scorer.top() if score > 0 and mid in models_by_id]
+    if matches:
+        st.markdown(f"#### Rule-bank matches ({len(scorer.answers)} answered)")
+        for bm, score in matches:
+            st.markdown(f"- **{bm['name']}** — rule score {score:.2f}")
+    else:
+        st.info("Answer a few questions to see rule-bank matches.")
+
+    st.markdown("</div>", unsafe_allow_html=True)
+
     with st.expander("📚 See all 70 business models"):
         for bm in BUSINESS_MODELS:
             st.markdown(f"### {bm['name']}")
@@ -1,11 +1,31 @@
 # ------------------------------------------------------
 # PAGE CONFIG
 # ------------------------------------------------------
+import json
 import streamlit as st
 import numpy as np
 import pandas as pd
-import io
-from datetime import datetime
+import matplotlib.pyplot as plt
+from utils.finance import IRR_MULTIPLE, irr_batch, irr_roots, npv, payback_period
+from utils.simulation import (
+    FUNDING_SAMPLES, PATH_DRIVERS, PATH_MODELS, SAMPLERS, cholesky_factor, funding_need, funding_summary,
+    simulate_path_npv, stack_success, stream_success
+)
+from utils.parallel_sim import parallel_success
+from utils.result_cache import ResultCache, frame_key
+from utils.pdf_report import dismiss_pdf, pdf_status, request_pdf
+from utils.portfolio import PRODUCT_COLUMNS, build_portfolio, portfolio_frame, product_frame, read_products
+from utils.goal_seek import SEEK_DRIVERS, SEEK_LABELS, TABLE_COLUMNS, goal_seek
+from utils.rnpv import default_stages, expected_rnpv, sample_rnpv, stage_breakdown, stages_to_json
+from utils.trl_logic import calculate_trl
+from utils.scenarios import (
+    OVERRIDE_COLUMNS, apply_overrides, default_overrides, scenario_flows, scenario_metrics,
+    scenario_names, stack_tables, summary_frame
+)
+from utils.sensitivity import DRIVERS, DRIVER_LABELS, driver_range, grid_irr, grid_npv, sobol_indices, tornado
+from utils.projection import (
+    SEASONALITY_PROFILES, build_monthly, to_annual, expand_annual, unit_shares, period_rate
+)
 
 # ❗ Fixed syntax: removed stray comma after page_title
 st.set_page_config(page_title="Financial Projections", layout="wide")
@@ -47,7 +67,14 @@ st.markdown("<div class='section-block'>", unsafe_allow_html=True)
 # Sidebar Inputs
 # ------------------------
 st.sidebar.header("Global Assumptions")
-years = st.sidebar.slider("Projection Years", 5, 15, 10)
+granularity = st.sidebar.radio("Granularity", ["Annual", "Monthly"], horizontal=True,
+                               help="Monthly mode models every month (up to 40 years) and discounts per period.")
+monthly = granularity == "Monthly"
+periods_per_year = 12 if monthly else 1
+years = st.sidebar.slider("Projection Years", 5, 40 if monthly else 15, 10)
+season_profile = "Flat"
+if monthly:
+    season_profile = st.sidebar.selectbox("Seasonality profile", list(SEASONALITY_PROFILES))
 discount = st.sidebar.slider("Discount Rate (%)", 0.0, 0.3, 0.1, step=0.005)
 
 st.sidebar.markdown("---")
@@ -67,13 +94,50 @@ rev_down = st.sidebar.slider("Pessimistic: Revenue -%", 0.0, 0.5, 0.20, step=0.0
 cost_up = st.sidebar.slider("Pessimistic: Costs +%", 0.0, 0.5, 0.10, step=0.01)
 
 st.sidebar.markdown("---")
-n_sims = st.sidebar.slider("Monte Carlo Samples per scenario", 100, 5000, 1000, step=100)
+n_sims = st.sidebar.slider("Max Monte Carlo samples per scenario", 10_000, 2_000_000, 500_000, step=10_000)
+tolerance = st.sidebar.slider("Stop when Success Prob. is within ± (% pts)", 0.1, 5.0, 0.5, step=0.1)
+time_budget = None
+if st.sidebar.checkbox("Also stop on a time budget", value=False,
+                       help="Caps slow runs, but the sample count then depends on machine speed, "
+                            "so the same seed may give a different result."):
+    time_budget = st.sidebar.slider("Time budget per scenario (s)", 0.5, 30.0, 5.0, step=0.5)
+interval = st.sidebar.selectbox("Confidence interval", ["wilson", "clopper-pearson"],
+                                format_func=lambda m: {"wilson": "Wilson", "clopper-pearson": "Clopper-Pearson"}[m],
+                                help="Used with pseudo-random sampling; Latin hypercube and Sobol runs stop on "
+                                     "the spread between their scrambled replicates.")
+sampler = st.sidebar.selectbox("Sampling strategy", list(SAMPLERS), format_func=SAMPLERS.get,
+                               help="Latin hypercube and Sobol reach the same precision with far fewer samples.")
+seed = st.sidebar.number_input("Simulation seed", 0, 2**31 - 1, 42, step=1,
+                               help="Same seed + same inputs = same success probability.")
+path_model = st.sidebar.selectbox("Driver uncertainty", list(PATH_MODELS), format_func=PATH_MODELS.get,
+                                  help="Per-year paths for units, price and unit cost instead of one draw per run.")
+path_vol, path_corr, reversion = (0.0, 0.0, 0.0), np.eye(len(PATH_DRIVERS)), 0.0
+if path_model != "fixed":
+    path_vol = tuple(
+        st.sidebar.slider(f"Volatility: {d} (% per year)", 0.0, 0.5, v, step=0.01)
+        for d, v in zip(PATH_DRIVERS, (0.15, 0.05, 0.08))
+    )
+    path_corr = np.eye(len(PATH_DRIVERS))
+    for (i, j), v in zip([(0, 1), (0, 2), (1, 2)], (-0.3, 0.0, 0.4)):
+        path_corr[i, j] = path_corr[j, i] = st.sidebar.slider(
+            f"Correlation: {PATH_DRIVERS[i]} / {PATH_DRIVERS[j]}", -0.95, 0.95, v, step=0.05)
+    if path_model == "mean_reverting":
+        reversion = st.sidebar.slider("Mean-reversion speed (per year)", 0.05, 3.0, 0.5, step=0.05)
+    try:
+        cholesky_factor(path_corr)
+    except ValueError as e:
+        st.sidebar.error(f"{e} Using uncorrelated drivers.")
+        path_corr = np.eye(len(PATH_DRIVERS))
+
+if "fin_cache" not in st.session_state:
+    st.session_state["fin_cache"] = ResultCache(max_entries=32)
+fin_cache = st.session_state["fin_cache"]
 
 # ------------------------
 # Helper functions
 # ------------------------
 def make_units(y1, growth, years):
-    return np.array([int(round(y1 * (1 + growth)**i)) for i in range(years)])
+    return np.rint(y1 * (1 + growth) ** np.arange(years)).astype(int)
 
 def build_df(units, price, cogs, opex, capex_y1):
     years = len(units)
@@ -101,59 +165,102 @@ def recompute(df):
     df["Net Cashflow (R)"] = df["Revenue (R)"] - df["COGS (R)"] - df["OPEX (R)"] - df["CAPEX (R)"]
     return df
 
-def npv(rate, flows):
-    return np.sum([cf / (1 + rate)**t for t, cf in enumerate(flows, start=1)])
-
-def irr(flows):
-    lo, hi = -0.99, 5.0
-    for _ in range(200):
-        mid = (lo + hi) / 2
-        npv_mid = sum(cf / (1 + mid)**t for t, cf in enumerate(flows, start=0))
-        npv_lo = sum(cf / (1 + lo)**t for t, cf in enumerate(flows, start=0))
-        if npv_mid == 0 or abs(npv_mid) < 1e-6:
-            return mid
-        if npv_lo * npv_mid < 0:
-            hi = mid
-        else:
-            lo = mid
-    return 0.0
-
-def payback(flows):
-    cum = np.cumsum(flows)
-    for i in range(1, len(flows)):
-        if cum[i] >= 0:
-            prev = cum[i-1]
-            delta = flows[i]
-            return i - 1 + (abs(prev) / delta)
-    return None
-
-def success_prob(df, discount, n):
-    base_flows = df["Net Cashflow (R)"].to_numpy()
-    rev = df["Revenue (R)"].to_numpy()
-    cost = (df["COGS (R)"] + df["OPEX (R)"] + df["CAPEX (R)"]).to_numpy()
-    rng = np.random.default_rng()
-    success = 0
-    for _ in range(n):
-        rev_mult = rng.uniform(0.8, 1.2)
-        cost_mult = rng.uniform(0.85, 1.15)
-        rate_mult = rng.uniform(0.9, 1.1)
-        sim_flows = (rev * rev_mult - cost * cost_mult)
-        if npv(discount * rate_mult, sim_flows) > 0:
-            success += 1
-    return success / n * 100
+def period_flows(df):
+    """Per-period line items: the annual table itself, or its monthly expansion in monthly mode."""
+    if not monthly:
+        return {
+            "revenue": df["Revenue (R)"].to_numpy(dtype=float),
+            "cogs": df["COGS (R)"].to_numpy(dtype=float),
+            "opex": df["OPEX (R)"].to_numpy(dtype=float),
+            "capex": df["CAPEX (R)"].to_numpy(dtype=float),
+            "net": df["Net Cashflow (R)"].to_numpy(dtype=float),
+        }
+    return expand_annual(
+        df["Units"], df["Price (R/u)"], df["COGS (R/u)"], df["OPEX (R)"], df["CAPEX (R)"],
+        unit_shares(growth, season_profile)
+    )
 
-def metrics(df, discount):
-    flows = df["Net Cashflow (R)"].tolist()
-    # Move CAPEX of Year 1 to time 0 for IRR & payback only (logic unchanged)
-    irr_val = irr([-float(df["CAPEX (R)"].iloc[0])] + flows[1:])
+def success_prob(df, discount, n, seed=None):
+    p = period_flows(df)
+    cost = p["cogs"] + p["opex"] + p["capex"]
+    rate = float(period_rate(discount, periods_per_year))
+    bar = st.progress(0.0, text="Simulating…")
+
+    def progress(done, total, pct, lo, hi):
+        bar.progress(min(1.0, done / total), text=f"Simulating… {done:,} samples, success {lo:.1f}–{hi:.1f}%")
+
+    simulate = None
+    if path_model != "fixed":
+        def simulate(size, rng):
+            return simulate_path_npv(
+                p["revenue"], p["cogs"], p["opex"] + p["capex"], rate, size, path_corr, path_vol,
+                path_model, reversion, periods_per_year, rng=rng, sampler=sampler
+            )
+
+    sim = stream_success(
+        p["revenue"], cost, rate, n, tolerance=tolerance, time_budget=time_budget,
+        rng=np.random.default_rng(seed), sampler=sampler, interval=interval, on_progress=progress,
+        simulate=simulate
+    )
+    bar.empty()
+    return sim
+
+def board_run(df, discount, n, seed=None):
+    """Multi-core run of n samples; same seed gives the same result for any core count."""
+    p = period_flows(df)
+    cost = p["cogs"] + p["opex"] + p["capex"]
+    rate = float(period_rate(discount, periods_per_year))
+    return parallel_success(p["revenue"], cost, rate, n, seed=seed or 0, sampler=sampler)
+
+def path_settings():
+    """Keyword arguments for the per-period driver model, or None for one multiplier per run."""
+    if path_model == "fixed":
+        return None
+    return {"corr": path_corr, "vol": path_vol, "model": path_model, "reversion": reversion,
+            "periods_per_year": periods_per_year}
+
+def funding_requirement(df, cash_on_hand, seed=None):
+    """Distribution of peak capital need and cash-out month for a scenario table."""
+    p = period_flows(df)
+    res = funding_need(p["revenue"], p["cogs"], p["opex"] + p["capex"], min(n_sims, FUNDING_SAMPLES),
+                       cash_on_hand, rng=np.random.default_rng(seed), sampler=sampler, paths=path_settings())
+    return res["need"], funding_summary(res, periods_per_year)
+
+def flow_metrics(flows, capex, discount):
+    rate = float(period_rate(discount, periods_per_year))
+    # Move CAPEX of the first period to time 0 for IRR & payback only (logic unchanged)
+    irr_flows = np.concatenate([[-capex[0]], flows[1:]])
+    # With several IRRs, report the one nearest the discount rate and list them all.
+    rates, status = irr_batch(irr_flows, guess=rate)
+    irr_val = rates[0]
+    roots = irr_roots(irr_flows) if status[0] == IRR_MULTIPLE else np.empty(0)
+    pb = payback_period(irr_flows, timing="t0")
+    # Operating flows are received at the end of each period.
+    npv_val = npv(rate, flows, timing="end")
     return {
-        "NPV": npv(discount, flows),
-        "IRR": irr_val,
-        "Payback": payback([-float(df["CAPEX (R)"].iloc[0])] + flows[1:]),
+        "NPV": npv_val,
+        "IRR": (1 + irr_val) ** periods_per_year - 1 if np.isfinite(irr_val) else 0.0,
+        "IRR roots": (1 + roots) ** periods_per_year - 1,
+        "Payback": pb / periods_per_year if np.isfinite(pb) else None,
         # ❗ Key name fixed to match mets["PI"] usage (formula unchanged)
-        "PI": npv(discount, flows) / max(1, df["CAPEX (R)"].sum())
+        "PI": npv_val / max(1, np.sum(capex))
     }
 
+def irr_text(mets):
+    """IRR metric value, or "Multiple" when the cashflows have more than one IRR."""
+    return "Multiple" if len(mets["IRR roots"]) > 1 else f"{mets['IRR']*100:.1f}"
+
+def irr_note(mets):
+    """Caption listing every IRR when there is more than one."""
+    if len(mets["IRR roots"]) > 1:
+        st.caption("Multiple IRRs for these cashflows: "
+                   + ", ".join(f"{r*100:.1f}%" for r in mets["IRR roots"])
+                   + ". IRR is ambiguous here — judge this scenario on NPV and PI.")
+
+def metrics(df, discount):
+    p = period_flows(df)
+    return flow_metrics(p["net"], p["capex"], discount)
+
 def scenario(df, mode):
     df = df.copy()
     if mode == "optimistic":
@@ -164,10 +271,21 @@ def scenario(df, mode):
         df["COGS (R/u)"] *= (1 + cost_up)
     return recompute(df)
 
+def base_drivers():
+    return {
+        "units": units_y1, "growth": growth, "price": price, "cogs": cogs,
+        "opex": opex_fixed, "capex": capex_y1, "discount": discount,
+    }
+
 # ------------------------
 # Default dataframes
 # ------------------------
-units = make_units(units_y1, growth, years)
+if monthly:
+    # The annual tables are the source of truth: defaults take their units from the monthly build, and the
+    # monthly series the metrics use are re-spread from the (edited) table by expand_annual().
+    units = to_annual(build_monthly(units_y1, growth, price, cogs, opex_fixed, capex_y1, years, season_profile))["units"]
+else:
+    units = make_units(units_y1, growth, years)
 baseline_default = build_df(units, price, cogs, opex_fixed, capex_y1)
 optimistic_default = scenario(baseline_default, "optimistic")
 pessimistic_default = scenario(baseline_default, "pessimistic")
@@ -181,11 +299,57 @@ for key, df_default in [
     if key not in st.session_state or len(st.session_state[key]) != years:
         st.session_state[key] = df_default.copy()
 
-tabs = st.tabs(["Baseline", "Optimistic", "Pessimistic", "Summary"])
+SCENARIOS = [
+    ("Baseline", "df_base", baseline_default),
+    ("Optimistic", "df_opt", optimistic_default),
+    ("Pessimistic", "df_pes", pessimistic_default),
+]
+VIEWS = [label for label, _, _ in SCENARIOS] + ["Portfolio", "Sensitivity", "Risk-adjusted", "Summary"]
+
+# ------------------------
+# Shared result store
+# ------------------------
+def evaluate(df):
+    """Metrics + simulation for a scenario table, served from the session cache when unchanged."""
+    cache_key = frame_key(df, discount, n_sims, tolerance, time_budget, interval, seed, sampler,
+                          periods_per_year, season_profile, growth,
+                          path_model, path_vol, path_corr.tobytes(), reversion)
+    cached = fin_cache.get(cache_key)
+    if cached is None:
+        cached = (metrics(df, discount), success_prob(df, discount, n_sims, seed))
+        fin_cache.put(cache_key, cached)
+    return cached
 
 # ------------------------
 # Scenario tab component
 # ------------------------
+def goal_seek_metric(df, key):
+    """Required driver value for an NPV/IRR target, solved on the edited table; settings in a popover."""
+    slot = st.empty()
+    with st.popover("🎯 Goal seek", use_container_width=True):
+        seek_metric = st.radio("Target", ["NPV", "IRR"], horizontal=True, key=f"seek_metric_{key}")
+        if seek_metric == "NPV":
+            seek_target = st.number_input("NPV target (R)", value=0, step=100_000, key=f"seek_npv_{key}")
+        else:
+            seek_target = st.number_input("IRR target (%)", value=15.0, step=1.0, key=f"seek_irr_{key}") / 100
+        driver = st.selectbox("Solve for", SEEK_DRIVERS, format_func=SEEK_LABELS.get, key=f"seek_driver_{key}")
+        st.caption("Table columns are scaled by one factor across every year; the other columns stay as edited.")
+
+    shares = unit_shares(growth, season_profile) if monthly else None
+    x = goal_seek(df, driver, seek_metric, seek_target, discount, periods_per_year, shares)
+    target_text = f"NPV R{seek_target:,.0f}" if seek_metric == "NPV" else f"IRR {seek_target * 100:.1f}%"
+    label = f"{SEEK_LABELS[driver]} for {target_text}"
+    if x is None:
+        slot.metric(label, "—", help="Out of reach: the driver has no effect, would have to go negative, "
+                                     "or no discount rate works.")
+    elif driver == "discount":
+        slot.metric(label, f"{x * 100:.1f}%", f"{(x - discount) * 100:+.1f} pts", delta_color="off")
+    else:
+        year1 = float(df[TABLE_COLUMNS[driver]].iloc[0])
+        value = f"{year1 * x:,.2f}" if driver in ("price", "cogs") else f"{year1 * x:,.0f}"
+        slot.metric(label, value, f"{(x - 1) * 100:+.1f}% every year", delta_color="off",
+                    help="Year-1 value after scaling the whole column.")
+
 def scenario_tab(label, key, default_df):
     st.markdown(f"### {label} Scenario")
     c1, c2 = st.columns([1,1])
@@ -219,19 +383,102 @@ def scenario_tab(label, key, default_df):
     edited = recompute(edited)
     st.session_state[key] = edited.copy()
 
-    mets = metrics(edited, discount)
-    prob = success_prob(edited, discount, n_sims)
+    mets, sim = evaluate(edited)
+    prob = sim["success"]
 
-    c1, c2, c3, c4, c5 = st.columns(5)
+    c1, c2, c3, c4, c5, c6 = st.columns(6)
     c1.metric("NPV (R)", f"{mets['NPV']:,.0f}")
-    c2.metric("IRR (%)", f"{mets['IRR']*100:.1f}")
+    c2.metric("IRR (%)", irr_text(mets))
     c3.metric("Payback (yrs)", f"{mets['Payback']:.1f}" if mets['Payback'] else "—")
     c4.metric("Profitability Index", f"{mets['PI']:.2f}")
-    c5.metric("Success Prob. (%)", f"{prob:.1f}")
+    c5.metric("Success Prob. (%)", f"{prob:.1f}", help=f"Standard error ± {sim['success_se']:.2f} points")
+    with c6:
+        goal_seek_metric(edited, key)
+
+    st.caption(
+        f"Simulated NPV (R): P5 {sim['p5']:,.0f} | P50 {sim['p50']:,.0f} | P95 {sim['p95']:,.0f} | "
+        f"mean {sim['mean']:,.0f} ± {sim['std']:,.0f} | "
+        f"{SAMPLERS[sampler]}, {sim['n']:,} samples, success SE ± {sim['success_se']:.2f} pts"
+    )
+    irr_note(mets)
+    stop_reason = {
+        "tolerance": "interval reached the tolerance",
+        "time": "time budget used up — not reproducible; set the sample cap to "
+                f"{sim['n']:,} to repeat this run",
+        "max_samples": "sample cap reached",
+    }[sim["stopped"]]
+    st.caption(
+        f"95% interval for Success Prob.: {sim['ci_low']:.1f}–{sim['ci_high']:.1f}% "
+        f"(stopped after {sim['elapsed']:.2f}s: {stop_reason})"
+    )
+
+    with st.expander("🚀 Board-level run (all cores)"):
+        if path_model != "fixed":
+            st.caption("Board-level runs use the one-multiplier-per-run model.")
+        b1, b2 = st.columns([1, 2])
+        board_n = b1.selectbox("Samples", [5_000_000, 10_000_000, 25_000_000, 50_000_000],
+                               format_func=lambda v: f"{v:,}", key=f"board_n_{key}")
+        board_key = frame_key(edited, "board", discount, board_n, seed, sampler,
+                              periods_per_year, season_profile, growth)
+        board = fin_cache.get(board_key)
+        if b2.button("Run", key=f"board_run_{key}"):
+            with st.spinner("Running across all cores…"):
+                board = board_run(edited, discount, board_n, seed)
+            fin_cache.put(board_key, board)
+        if board is not None:
+            st.caption(
+                f"Success Prob. {board['success']:.2f}% ± {board['success_se']:.3f} pts | "
+                f"NPV P5 {board['p5']:,.0f} | P50 {board['p50']:,.0f} | P95 {board['p95']:,.0f} | "
+                f"mean {board['mean']:,.0f} ± {board['std']:,.0f} | "
+                f"{board['n']:,} samples in {board['tasks']} seeded tasks on {board['workers']} cores"
+            )
+
+    with st.expander("💰 Funding requirement"):
+        cash_on_hand = st.number_input("Cash on hand at start (R)", 0, 1_000_000_000, 0, step=100_000,
+                                       key=f"cash_on_hand_{key}")
+        funding_key = frame_key(edited, "funding", cash_on_hand, n_sims, seed, sampler, periods_per_year,
+                                season_profile, growth, path_model, path_vol, path_corr.tobytes(), reversion)
+        funding = fin_cache.get(funding_key)
+        if funding is None:
+            funding = funding_requirement(edited, cash_on_hand, seed)
+            fin_cache.put(funding_key, funding)
+        need, fs = funding
+        f1, f2, f3, f4 = st.columns(4)
+        f1.metric("Capital to raise P50 (R)", f"{fs['need_p50']:,.0f}")
+        f2.metric("Capital to raise P90 (R)", f"{fs['need_p90']:,.0f}")
+        f3.metric("Chance of cash-out (%)", f"{fs['cash_out_prob']:.1f}")
+        f4.metric("Cash-out month (P50)", f"{fs['cash_out_month_p50']:.0f}" if np.isfinite(fs["cash_out_month_p50"]) else "—")
+        with plt.rc_context(NEON_THEME):
+            fig, ax = plt.subplots(figsize=(7, 2.6))
+            ax.hist(need, bins=60, color="#3e6ce0")
+            for q, style in (("need_p50", "-"), ("need_p90", "--")):
+                ax.axvline(fs[q], color="#e8eeff", linestyle=style, linewidth=1)
+            ax.set_xlabel("Capital to raise (R): solid P50, dashed P90", fontsize=8)
+            ax.tick_params(labelsize=7)
+            ax.xaxis.set_major_formatter(lambda v, _: f"R{v/1_000_000:.1f}M")
+            st.pyplot(fig, use_container_width=True)
+            plt.close(fig)
+        st.caption(
+            f"Deepest point of cumulative cash beyond the R{cash_on_hand:,.0f} on hand, across {fs['n']:,} "
+            f"simulated paths; median trough in month {fs['trough_month_p50']:.0f}. "
+            "Raising the P90 amount covers 9 in 10 simulated outcomes."
+        )
+        # Shared with the Financing Options page.
+        st.session_state.setdefault("funding_need", {})[label] = {**fs, "cash_on_hand": cash_on_hand}
+
+    if monthly:
+        with st.expander("Monthly detail"):
+            p = period_flows(edited)
+            st.line_chart(pd.DataFrame(
+                {"Net Cashflow (R)": p["net"], "Cumulative (R)": np.cumsum(p["net"])},
+                index=pd.RangeIndex(1, len(p["net"]) + 1, name="Month")
+            ))
 
     with st.expander("Mentor Tips"):
         tips = []
-        if mets["IRR"] < 0.08:
+        if len(mets["IRR roots"]) > 1:
+            tips.append("Several IRRs — the cashflows change sign more than once; judge on NPV and PI instead.")
+        elif mets["IRR"] < 0.08:
             tips.append("IRR below 8% — tough sell to investors.")
         elif mets["IRR"] < 0.15:
             tips.append("IRR 8–15% — fair; suitable for grants/blended funds.")
@@ -254,30 +501,60 @@ def scenario_tab(label, key, default_df):
         else:
             tips.append(f"Profitability Index {pi:.2f} — strong; NPV is well above total CAPEX. Good signal to investors.")
 
-        tips.append(f"Success Probability {prob:.0f}% (based on {n_sims} simulations).")
+        tips.append(f"Success Probability {prob:.0f}% (based on {sim['n']:,} simulations).")
 
         for t in tips:
             st.markdown("- " + t)
 
     return edited, mets, prob
 
-with tabs[0]:
-    df_base, mets_base, prob_base = scenario_tab("Baseline", "df_base", baseline_default)
-with tabs[1]:
-    df_opt, mets_opt, prob_opt = scenario_tab("Optimistic", "df_opt", optimistic_default)
-with tabs[2]:
-    df_pes, mets_pes, prob_pes = scenario_tab("Pessimistic", "df_pes", pessimistic_default)
-
 # ------------------------
 # Summary
 # ------------------------
-with tabs[3]:
+def summary_tab():
     st.subheader("📊 Scenario Summary")
-    summary = pd.DataFrame([
-        ["Baseline", mets_base["NPV"], mets_base["IRR"]*100, mets_base["Payback"], mets_base["PI"], prob_base],
-        ["Optimistic", mets_opt["NPV"], mets_opt["IRR"]*100, mets_opt["Payback"], mets_opt["PI"], prob_opt],
-        ["Pessimistic", mets_pes["NPV"], mets_pes["IRR"]*100, mets_pes["Payback"], mets_pes["PI"], prob_pes]
-    ], columns=["Scenario", "NPV (R)", "IRR (%)", "Payback (yrs)", "Profitability Index", "Success Prob. (%)"])
+    st.markdown("#### Scenario set")
+    st.caption("Add any number of named scenarios as % changes to the Baseline table. "
+               "They are summarised below together with the three scenario tabs.")
+    if "scenario_set" not in st.session_state:
+        st.session_state["scenario_set"] = default_overrides()
+    overrides = st.data_editor(
+        st.session_state["scenario_set"],
+        num_rows="dynamic",
+        hide_index=True,
+        use_container_width=True,
+        column_config={c: st.column_config.NumberColumn(c, format="%+.1f") for c in OVERRIDE_COLUMNS[1:]},
+        key="scenario_set_editor"
+    )
+
+    tables = {label: recompute(st.session_state[key]) for label, key, _ in SCENARIOS}
+    # The tab scenarios reuse their tab results, so one seed gives one number everywhere.
+    evaluated = [evaluate(df) for df in tables.values()]
+    summary_key = frame_key(overrides, *(frame_key(df) for df in tables.values()), discount, n_sims, tolerance,
+                            interval, seed, sampler, periods_per_year, season_profile, growth,
+                            path_model, path_vol, path_corr.tobytes(), reversion)
+    cached = fin_cache.get(summary_key)
+    if cached is None:
+        # Tab tables plus every override of the Baseline: one (scenarios x years x line items) stack.
+        stack = stack_tables(list(tables.values()))
+        stack = np.concatenate([stack, apply_overrides(stack[0], overrides)])
+        flows = scenario_flows(stack, periods_per_year, unit_shares(growth, season_profile) if monthly else None)
+        success = np.array([sim["success"] for _, sim in evaluated])
+        draws, stopped = 0, "tolerance"
+        if len(stack) > len(tables):
+            extra = {k: v[len(tables):] for k, v in flows.items()}
+            rate = float(period_rate(discount, periods_per_year))
+            with st.spinner(f"Simulating {len(extra['revenue'])} scenarios…"):
+                sim = stack_success(extra["revenue"], extra["cogs"], extra["opex"] + extra["capex"], rate, n_sims,
+                                    rng=np.random.default_rng(seed), sampler=sampler, paths=path_settings(),
+                                    tolerance=tolerance, interval=interval)
+            success = np.concatenate([success, sim["success"]])
+            draws, stopped = sim["n"], sim["stopped"]
+        names = list(tables) + scenario_names(overrides)
+        summary = summary_frame(names, scenario_metrics(flows, discount, periods_per_year), success)
+        cached = (summary, draws, stopped)
+        fin_cache.put(summary_key, cached)
+    summary, draws, stopped = cached
 
     st.dataframe(
         summary.style.format({
@@ -286,43 +563,361 @@ with tabs[3]:
             "Payback (yrs)": "{:.1f}",
             "Profitability Index": "{:.2f}",
             "Success Prob. (%)": "{:.1f}"
-        }),
+        }, na_rep="—"),
         hide_index=True,
         use_container_width=True
     )
+    if summary["IRR (%)"].isna().any():
+        st.caption("IRR “—”: the cashflows change sign more than once and have several IRRs.")
+    if draws:
+        st.caption(f"{', '.join(tables)} show their tab results. Scenario-set rows share the same {draws:,} draws "
+                   "(common random numbers), stopping like the tabs once every row is within "
+                   f"± {tolerance:g} pts" + ("." if stopped == "tolerance" else " — sample cap reached first."))
+    else:
+        st.caption(f"{', '.join(tables)} show their tab results.")
+
+    # --- PDF export (built in a worker thread only when requested) ---
+    pdf_key = frame_key(summary, *(frame_key(df) for df in tables.values()))
+    status, payload = pdf_status(pdf_key)
+    if status == "failed":
+        # Kept by pdf_report until dismissed, so the full rerun that ends polling still shows it.
+        pdf_failure(pdf_key, summary, tables, payload)
+        return
+    polling = status == "running"
+    # While the job runs, only this fragment re-runs (every second) until the download is ready.
+    st.fragment(pdf_export, run_every=PDF_POLL_SECONDS if polling else None)(pdf_key, summary, tables, polling)
+
+PDF_POLL_SECONDS = 1.0
+
+def pdf_export(pdf_key, summary, tables, polling):
+    status, payload = pdf_status(pdf_key)
+    if status != "running" and polling:
+        st.rerun()      # full rerun stops the polling timer
+
+    if status == "ready":
+        st.download_button(
+            "⬇️ Download PDF Summary",
+            payload,
+            file_name="financial_projection_summary.pdf",
+            mime="application/pdf",
+            use_container_width=True
+        )
+    elif status == "running":
+        st.info("Preparing the PDF report in the background…")
+    elif status == "missing":
+        if st.button("📄 Prepare PDF Summary", use_container_width=True):
+            request_pdf(pdf_key, summary, tables)
+            st.rerun()
+
+def pdf_failure(pdf_key, summary, tables, error):
+    st.error(f"PDF generation failed: {error}")
+    c1, c2 = st.columns(2)
+    with c1:
+        if st.button("🔁 Retry PDF", use_container_width=True):
+            request_pdf(pdf_key, summary, tables)
+            st.rerun()
+    with c2:
+        if st.button("Dismiss", use_container_width=True):
+            dismiss_pdf(pdf_key)
+            st.rerun()
 
-    # --- PDF export ---
-    from reportlab.lib.pagesizes import A4
-    from reportlab.pdfgen import canvas
-    from reportlab.lib.units import cm
-
-    def make_pdf():
-        buf = io.BytesIO()
-        c = canvas.Canvas(buf, pagesize=A4)
-        width, height = A4
-        t = c.beginText(2*cm, height - 2*cm)
-        t.setFont("Helvetica", 10)
-        t.textLine(f"Financial Projection Summary — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-        t.textLine("")
-        for row in summary.itertuples(index=False):
-            t.textLine(
-                f"{row[0]}: NPV R{row[1]:,.0f} | IRR {row[2]:.1f}% | "
-                f"Payback {row[3]:.1f} yrs | Profitability Index {row[4]:.2f} | "
-                f"Success {row[5]:.1f}%"
-            )
-        c.drawText(t)
-        c.showPage()
-        c.save()
-        pdf = buf.getvalue()
-        buf.close()
-        return pdf
-
-    st.download_button(
-        "⬇️ Download PDF Summary",
-        make_pdf(),
-        file_name="financial_projection_summary.pdf",
-        mime="application/pdf",
+# ------------------------
+# Portfolio (multi-product)
+# ------------------------
+def portfolio_tab():
+    st.markdown("### Product Portfolio")
+    st.caption(
+        "One row per product line with its own units, growth, price and COGS curves. "
+        "Fixed OPEX and CAPEX from the sidebar are shared across the portfolio."
+    )
+
+    if "portfolio_products" not in st.session_state:
+        st.session_state["portfolio_products"] = pd.DataFrame([{
+            "Product": "Product A", "Units (Year 1)": units_y1, "Units Growth": growth,
+            "Price (R/u)": price, "Price Growth": 0.0, "COGS (R/u)": cogs, "COGS Growth": 0.0,
+        }], columns=PRODUCT_COLUMNS)
+
+    upload = st.file_uploader("Load product lines (CSV with the columns below)", type="csv", key="portfolio_csv")
+    # Load each uploaded file once, so later reruns keep the user's edits.
+    if upload is not None and upload.file_id != st.session_state.get("portfolio_csv_loaded"):
+        st.session_state["portfolio_csv_loaded"] = upload.file_id
+        st.session_state["portfolio_csv_error"] = None
+        try:
+            st.session_state["portfolio_products"] = read_products(upload)
+            st.session_state.pop("portfolio_editor", None)
+        except ValueError as e:
+            st.session_state["portfolio_csv_error"] = f"{upload.name}: {e}. Expected columns: {', '.join(PRODUCT_COLUMNS)}."
+    if upload is not None and st.session_state.get("portfolio_csv_error"):
+        st.error(st.session_state["portfolio_csv_error"])
+
+    products = st.data_editor(
+        st.session_state["portfolio_products"],
+        use_container_width=True,
+        num_rows="dynamic",
+        hide_index=True,
+        key="portfolio_editor"
+    ).dropna(subset=PRODUCT_COLUMNS[1:]).reset_index(drop=True)
+    if products.empty:
+        st.info("Add at least one product line.")
+        return
+
+    port = build_portfolio(products, years, opex_fixed, capex_y1, periods_per_year, season_profile)
+    mets = flow_metrics(port["net"], port["capex"], discount)
+
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Portfolio NPV (R)", f"{mets['NPV']:,.0f}")
+    c2.metric("IRR (%)", irr_text(mets))
+    c3.metric("Payback (yrs)", f"{mets['Payback']:.1f}" if mets['Payback'] else "—")
+    c4.metric("Profitability Index", f"{mets['PI']:.2f}")
+    irr_note(mets)
+
+    st.markdown("#### Portfolio totals")
+    st.dataframe(portfolio_frame(port, periods_per_year), hide_index=True, use_container_width=True)
+
+    # Only the product in view is turned into a DataFrame.
+    names = list(port["names"])
+    i = st.selectbox("Product in view", range(len(names)), format_func=lambda k: names[k], key="portfolio_view")
+    st.dataframe(product_frame(port, i, periods_per_year), hide_index=True, use_container_width=True)
+
+# ------------------------
+# Sensitivity
+# ------------------------
+# Same neon chart theme as the Market Study Guide.
+NEON_THEME = {
+    "figure.facecolor": "#0b111f",
+    "axes.facecolor": "#0b111f",
+    "axes.edgecolor": "#89b4f8",
+    "axes.labelcolor": "#c7d6f9",
+    "xtick.color": "#c7d6f9",
+    "ytick.color": "#c7d6f9",
+    "text.color": "#e8eeff",
+    "axes.grid": True,
+    "grid.color": "#4178e0",
+    "grid.alpha": 0.25,
+}
+
+def sensitivity_tab():
+    st.markdown("### Sensitivity Analysis")
+    st.caption("Based on the sidebar assumptions. Each driver is moved on its own while all others stay at baseline.")
+
+    st.markdown("#### Tornado (one driver at a time)")
+    levels = st.multiselect("Perturbation levels (±%)", [5, 10, 20, 30, 50], default=[10, 20], key="tornado_levels")
+    if not levels:
+        st.info("Pick at least one perturbation level.")
+        return
+    table = tornado(base_drivers(), years, periods_per_year, season_profile, levels=[l / 100 for l in levels])
+    base_npv = table.attrs["base_npv"]
+
+    widest = table[table["Change (±%)"] == max(levels)].iloc[::-1]
+    with plt.rc_context(NEON_THEME):
+        fig, ax = plt.subplots(figsize=(7, 0.45 * len(widest) + 1))
+        for i, r in enumerate(widest.itertuples(index=False)):
+            ax.barh(i, r[2] - base_npv, left=base_npv, color="#dc5a5a")
+            ax.barh(i, r[3] - base_npv, left=base_npv, color="#3e6ce0")
+        ax.axvline(base_npv, color="#e8eeff", linewidth=1)
+        ax.set_yticks(range(len(widest)), widest["Driver"], fontsize=8)
+        ax.set_xlabel(f"NPV (R) at −{max(levels)}% (red) / +{max(levels)}% (blue)", fontsize=8)
+        ax.tick_params(axis="x", labelsize=7)
+        ax.xaxis.set_major_formatter(lambda v, _: f"R{v/1_000_000:.1f}M")
+        st.pyplot(fig, use_container_width=True)
+        plt.close(fig)
+
+    st.dataframe(
+        table.style.format({"Change (±%)": "{:.0f}", "NPV at -": "{:,.0f}", "NPV at +": "{:,.0f}", "Swing (R)": "{:,.0f}"}),
+        hide_index=True,
+        use_container_width=True
+    )
+
+    st.markdown("#### Two-way heat map")
+    c1, c2, c3, c4 = st.columns(4)
+    x_driver = c1.selectbox("X driver", DRIVERS, index=DRIVERS.index("price"),
+                            format_func=DRIVER_LABELS.get, key="grid_x")
+    y_driver = c2.selectbox("Y driver", [d for d in DRIVERS if d != x_driver], index=0,
+                            format_func=DRIVER_LABELS.get, key="grid_y")
+    span = c3.slider("Range (±%)", 5, 100, 50, step=5, key="grid_span") / 100
+    res = c4.slider("Grid points per axis", 20, 300, 200, step=10, key="grid_res")
+    show_irr = st.checkbox("Show IRR surface instead of NPV", key="grid_irr")
+
+    drivers = base_drivers()
+    xs = driver_range(drivers[x_driver], span, res)
+    ys = driver_range(drivers[y_driver], span, res)
+    npv_grid = grid_npv(drivers, x_driver, xs, y_driver, ys, years, periods_per_year, season_profile)
+    surface = grid_irr(drivers, x_driver, xs, y_driver, ys, years, periods_per_year, season_profile) * 100 if show_irr else npv_grid
+
+    with plt.rc_context({**NEON_THEME, "axes.grid": False}):
+        fig, ax = plt.subplots(figsize=(7, 5))
+        mesh = ax.pcolormesh(xs, ys, surface, cmap="RdYlGn", shading="auto")
+        cbar = fig.colorbar(mesh, ax=ax)
+        cbar.set_label("IRR (%)" if show_irr else "NPV (R)", fontsize=8)
+        cbar.ax.tick_params(labelsize=7)
+        if npv_grid.min() < 0 < npv_grid.max():
+            cs = ax.contour(xs, ys, npv_grid, levels=[0], colors="#e8eeff", linewidths=1.5)
+            ax.clabel(cs, fmt={0: "NPV = 0"}, fontsize=7)
+        ax.plot(drivers[x_driver], drivers[y_driver], marker="o", color="#e8eeff")
+        ax.set_xlabel(DRIVER_LABELS[x_driver], fontsize=8)
+        ax.set_ylabel(DRIVER_LABELS[y_driver], fontsize=8)
+        ax.tick_params(labelsize=7)
+        st.pyplot(fig, use_container_width=True)
+        plt.close(fig)
+    st.caption("White line: break-even (NPV = 0). Dot: current assumptions.")
+
+    st.markdown("#### Global sensitivity (Sobol indices)")
+    st.caption("All drivers vary together, uniformly across the range below, so interactions "
+               "(e.g. growth × price) show up as Total effect minus First-order.")
+    s1, s2 = st.columns(2)
+    sobol_span = s1.slider("Range (±%)", 5, 100, 20, step=5, key="sobol_span") / 100
+    sobol_n = s2.selectbox("Base samples (N)", [1_000, 10_000, 100_000], index=1,
+                           format_func=lambda v: f"{v:,}", key="sobol_n")
+    sobol_key = frame_key(pd.DataFrame([base_drivers()]), "sobol", sobol_span, sobol_n, seed,
+                          years, periods_per_year, season_profile)
+    table = fin_cache.get(sobol_key)
+    if table is None:
+        with st.spinner(f"Evaluating {(len(DRIVERS) + 2) * sobol_n:,} driver sets…"):
+            table = sobol_indices(base_drivers(), years, periods_per_year, season_profile, span=sobol_span,
+                                  n=sobol_n, rng=np.random.default_rng(seed))
+        fin_cache.put(sobol_key, table)
+
+    ranked = table.iloc[::-1]
+    with plt.rc_context(NEON_THEME):
+        fig, ax = plt.subplots(figsize=(7, 0.45 * len(ranked) + 1))
+        pos = np.arange(len(ranked))
+        ax.barh(pos + 0.2, ranked["Total effect (ST)"], height=0.4, color="#3e6ce0", label="Total effect")
+        ax.barh(pos - 0.2, ranked["First-order (S1)"], height=0.4, color="#53d3a4", label="First-order")
+        ax.set_yticks(pos, ranked["Driver"], fontsize=8)
+        ax.set_xlabel("Share of NPV variance", fontsize=8)
+        ax.tick_params(axis="x", labelsize=7)
+        ax.legend(fontsize=7)
+        st.pyplot(fig, use_container_width=True)
+        plt.close(fig)
+    st.dataframe(
+        table.style.format({c: "{:.3f}" for c in table.columns if c != "Driver"}),
+        hide_index=True,
         use_container_width=True
     )
+    st.caption(f"Saltelli sampling on a scrambled Sobol design: {table.attrs['evaluations']:,} model evaluations.")
+
+# ------------------------
+# Risk-adjusted NPV (TRL stages)
+# ------------------------
+def rnpv_tab():
+    st.markdown("### Risk-adjusted NPV (rNPV)")
+    st.caption("The Baseline scenario's NPV is only earned if the technology clears every remaining TRL stage. "
+               "Stage costs are weighted by the chance of reaching them; everything is discounted from when it happens.")
+
+    answers = st.session_state.get("answers")
+    default_trl = calculate_trl(answers) if answers else 5
+    r1, r2 = st.columns([1, 3])
+    trl = r1.number_input("Current TRL", 0, 9, default_trl, step=1, key="rnpv_trl",
+                          help="Pre-filled from the TRL Calculator when you have completed it.")
+
+    if "trl_stages" not in st.session_state:
+        st.session_state["trl_stages"] = default_stages()
+    with r2.expander("Stage assumptions (editable)"):
+        stages = st.data_editor(
+            st.session_state["trl_stages"],
+            num_rows="fixed",
+            hide_index=True,
+            use_container_width=True,
+            disabled=["From TRL", "To TRL"],
+            key="trl_stages_editor"
+        )
+        st.download_button("⬇️ Save as trl_stages.json", json.dumps(stages_to_json(stages), indent=2),
+                           file_name="trl_stages.json", mime="application/json")
+
+    commercial_npv = metrics(recompute(st.session_state["df_base"]), discount)["NPV"]
+    res = expected_rnpv(stages, trl, commercial_npv, discount)
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("rNPV (R)", f"{res['rnpv'][0]:,.0f}")
+    c2.metric("Unrisked NPV at launch (R)", f"{commercial_npv:,.0f}")
+    c3.metric("P(reach market) (%)", f"{res['p_success'][0] * 100:.1f}")
+    c4.metric("Months to launch", f"{res['launch_months'][0]:.0f}")
+
+    breakdown = stage_breakdown(stages, trl, discount)
+    if len(breakdown):
+        st.dataframe(
+            breakdown.style.format({"P(start) (%)": "{:.1f}", "P(pass) (%)": "{:.1f}", "Start month": "{:.0f}",
+                                    "Cost PV (R)": "{:,.0f}", "Risked cost PV (R)": "{:,.0f}"}),
+            hide_index=True,
+            use_container_width=True
+        )
+
+    st.markdown("#### Portfolio of projects")
+    st.caption("Each row is a group of similar projects. Stage outcomes are drawn independently for every project.")
+    if "rnpv_portfolio" not in st.session_state:
+        st.session_state["rnpv_portfolio"] = pd.DataFrame({
+            "Projects": [100, 200, 100], "TRL": [3, 5, 7], "Commercial NPV (R)": [commercial_npv] * 3,
+        })
+    groups = st.data_editor(st.session_state["rnpv_portfolio"], num_rows="dynamic", hide_index=True,
+                            use_container_width=True, key="rnpv_portfolio_editor").dropna()
+    counts = groups["Projects"].to_numpy(dtype=int).clip(0)
+    if counts.sum() == 0:
+        st.info("Add at least one project.")
+        return
+    trls = np.repeat(groups["TRL"].to_numpy(dtype=float), counts)
+    npvs = np.repeat(groups["Commercial NPV (R)"].to_numpy(dtype=float), counts)
+
+    draws = 10_000
+    sim_key = frame_key(groups, stages.to_json(), "rnpv", discount, seed, draws)
+    sim = fin_cache.get(sim_key)
+    if sim is None:
+        sim = sample_rnpv(stages, trls, npvs, discount, draws, rng=np.random.default_rng(seed))
+        fin_cache.put(sim_key, sim)
+    total = sim["total"]
+    p5, p50, p95 = np.percentile(total, [5, 50, 95])
+    expected = expected_rnpv(stages, trls, npvs, discount)["rnpv"].sum()
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Expected portfolio rNPV (R)", f"{expected:,.0f}")
+    c2.metric("P5 / P95 (R)", f"{p5/1e6:,.1f}M / {p95/1e6:,.1f}M")
+    c3.metric("Chance portfolio loses money (%)", f"{(total < 0).mean() * 100:.1f}")
+    c4.metric("Projects reaching market", f"{sim['launched'].mean():.0f} of {counts.sum()}")
+
+    with plt.rc_context(NEON_THEME):
+        fig, ax = plt.subplots(figsize=(7, 2.6))
+        ax.hist(total, bins=60, color="#3e6ce0")
+        ax.axvline(expected, color="#e8eeff", linewidth=1)
+        ax.set_xlabel(f"Portfolio value (R) over {draws:,} simulated outcomes; line = expected", fontsize=8)
+        ax.tick_params(labelsize=7)
+        ax.xaxis.set_major_formatter(lambda v, _: f"R{v/1_000_000:.0f}M")
+        st.pyplot(fig, use_container_width=True)
+        plt.close(fig)
+
+def render_view(view):
+    if view == "Risk-adjusted":
+        rnpv_tab()
+        return
+    if view == "Summary":
+        summary_tab()
+        return
+    if view == "Portfolio":
+        portfolio_tab()
+        return
+    if view == "Sensitivity":
+        sensitivity_tab()
+        return
+    for label, key, default_df in SCENARIOS:
+        if label == view:
+            scenario_tab(label, key, default_df)
+
+# ------------------------
+# Views
+# ------------------------
+lazy_tabs = st.sidebar.checkbox(
+    "Compute active tab only", value=True,
+    help="Only the selected scenario is simulated on each interaction; the Summary fills in the rest on demand."
+)
+
+if lazy_tabs:
+    active_view = st.radio("View", VIEWS, horizontal=True, key="fin_view", label_visibility="collapsed")
+    render_view(active_view)
+else:
+    for tab, view in zip(st.tabs(VIEWS), VIEWS):
+        with tab:
+            render_view(view)
+
+cache_stats = fin_cache.stats()
+st.sidebar.caption(
+    f"Result cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['entries']} entries)"
+)
 
 st.markdown("</div>", unsafe_allow_html=True)
@@ -117,6 +117,62 @@ st.markdown(f"""
 
 st.markdown("---")
 
+# ----------------------------------------------------
+# CAPITAL REQUIREMENT (from Financial Projection)
+# ----------------------------------------------------
+# Typical ticket sizes (R) per stage — indicative ranges only.
+stage_tickets = {
+    "Ideation": (0, 500_000),
+    "Prototype / TRL 3–5": (250_000, 5_000_000),
+    "Pilot / TRL 6–7": (2_000_000, 20_000_000),
+    "Commercialisation / TRL 8–9": (10_000_000, 100_000_000),
+    "Scaling / Growth": (50_000_000, float("inf")),
+}
+
+# Instruments suited to the size of the raise, smallest band first.
+raise_bands = [
+    (500_000, ["Small / micro grants", "Founder-funded (low burn)", "Incubator / accelerator micro-funding"]),
+    (5_000_000, ["Proof-of-concept (PoC) grants", "Angel investors", "Early blended finance (grant + loan or soft equity)"]),
+    (20_000_000, ["Seed / sector-focused venture capital", "Concessional loans", "Corporate co-development funding"]),
+    (100_000_000, ["Series A venture funds", "Revenue-based finance", "Development finance institutions (DFIs)"]),
+    (float("inf"), ["Private equity / strategic investors", "Project finance", "Blended finance structures"]),
+]
+
+st.subheader("Capital Requirement")
+funding = st.session_state.get("funding_need", {})
+if not funding:
+    st.info("Open the 💰 Funding requirement panel on the Financial Projection page to size your raise.")
+else:
+    scenario = st.selectbox("Scenario", list(funding), key="funding_scenario")
+    fs = funding[scenario]
+    need_p90 = fs["need_p90"]
+    low, high = stage_tickets[stage]
+    instruments = next(items for cap, items in raise_bands if need_p90 <= cap)
+    cash_out = (f"month {fs['cash_out_month_p50']:.0f} (P50)"
+                if fs["cash_out_prob"] > 0 else "not reached in the simulation")
+
+    if need_p90 > high:
+        fit = "exceeds typical tickets at this stage — plan a staged raise or blend several sources."
+    elif need_p90 < low:
+        fit = "is below typical tickets at this stage — smaller, faster instruments may suffice."
+    else:
+        fit = "sits within typical tickets at this stage."
+
+    instruments_html = "<ul>" + "".join([f"<li>{i}</li>" for i in instruments]) + "</ul>"
+    st.markdown(f"""
+<div class="im-tile">
+    <h3>💰 Capital to raise ({scenario})</h3>
+    <p><b>P50:</b> R{fs['need_p50']:,.0f} &nbsp;|&nbsp; <b>P90:</b> R{need_p90:,.0f}
+       (after R{fs.get('cash_on_hand', 0):,.0f} cash on hand)</p>
+    <p>Chance of running out of cash: {fs['cash_out_prob']:.0f}% — cash-out {cash_out}.</p>
+    <p>Your P90 need {fit}</p>
+    <h4>Instruments sized for this raise</h4>
+    {instruments_html}
+</div>
+""", unsafe_allow_html=True)
+
+st.markdown("---")
+
 # ----------------------------------------------------
 # REFLECTION TILE
 # ----------------------------------------------------
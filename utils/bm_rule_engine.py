@@ -1,4 +1,9 @@
 import json
+import os
+from itertools import repeat
+
+import numpy as np
+
 
 def load_rules(path="data/bm_rule_weights.json"):
     with open(path) as f:
@@ -34,7 +39,14 @@ def normalize_rule_weights(rules):
 def compute_rule_score(selected_answers, normalized_rules, question_importance=1.0):
     """
     Computes the deterministic (explainable) rules engine score.
+
+    `normalized_rules` may be the dict from normalize_rule_weights() or a
+    CompiledRules from load_compiled(); the compiled form scores with one
+    sparse product instead of walking the rule bank.
     """
+    if isinstance(normalized_rules, CompiledRules):
+        return normalized_rules.scores(selected_answers, question_importance)
+
     # Initialize model scores
     all_models = set()
     for qid in normalized_rules:
@@ -55,3 +67,264 @@ def compute_rule_score(selected_answers, normalized_rules, question_importance=1
 
     return scores
 
+
+# ============================================================
+# ---------- COMPILED RULES (sparse) ----------
+# ============================================================
+
+COMPILED_SUFFIX = ".compiled.npz"
+
+# Compiled rule banks shared by every session in the process, keyed by source path.
+_COMPILED = {}
+
+
+class CompiledRules:
+    """
+    Normalized rules as a sparse (answer options x models) CSR matrix.
+
+    Answer options are rows, keyed by (question id, answer key); model IDs
+    are interned to integer columns. A profile is a one-hot row selection,
+    so its score vector is one sparse product.
+
+    Measured cost of a full-profile score_vector() (benchmarks/rule_scoring.py):
+    ~20 us for the current 45 x 55 bank, ~0.8 ms for 3000 questions x 3000
+    models, most of it the per-answer dict lookup that maps answers to rows.
+    """
+
+    def __init__(self, options, model_ids, indptr, indices, data):
+        from scipy.sparse import csr_matrix
+
+        self.options = [tuple(o) for o in options]
+        self.option_index = {o: i for i, o in enumerate(self.options)}
+        self.question_index = {}
+        for i, (qid, ans) in enumerate(self.options):
+            self.question_index.setdefault(qid, {})[ans] = i
+        self.model_ids = list(model_ids)
+        self.model_index = {m: j for j, m in enumerate(self.model_ids)}
+        self.matrix = csr_matrix((data, indices, indptr), shape=(len(self.options), len(self.model_ids)))
+        # (models x options) copy: a profile's scores are one sparse product with its 0/1 indicator.
+        self._by_model = self.matrix.T.tocsr()
+
+    @classmethod
+    def from_normalized(cls, normalized_rules):
+        options = [(qid, ans) for qid, answers in normalized_rules.items() for ans in answers]
+        model_ids = sorted({bm for answers in normalized_rules.values() for w in answers.values() for bm in w})
+        model_index = {m: j for j, m in enumerate(model_ids)}
+
+        indptr, indices, data = [0], [], []
+        for qid, ans in options:
+            weights = normalized_rules[qid][ans]
+            indices.extend(model_index[bm] for bm in weights)
+            data.extend(weights.values())
+            indptr.append(len(indices))
+        return cls(options, model_ids, np.asarray(indptr, dtype=np.int64),
+                   np.asarray(indices, dtype=np.int32), np.asarray(data, dtype=np.float64))
+
+    def rows(self, selected_answers):
+        """Row indices of the chosen answer options (unknown questions/answers are skipped)."""
+        rows = np.fromiter(map(self.option_index.get, selected_answers.items(), repeat(-1)),
+                           dtype=np.int64, count=len(selected_answers))
+        return rows[rows >= 0]
+
+    def one_hot(self, selected_answers):
+        """Sparse (1 x options) indicator vector of a profile."""
+        from scipy.sparse import csr_matrix
+
+        rows = self.rows(selected_answers)
+        return csr_matrix((np.ones(rows.size), rows, [0, rows.size]), shape=(1, len(self.options)))
+
+    def score_vector(self, selected_answers, question_importance=1.0):
+        """
+        Score of every model (in model_ids order) for one profile.
+
+        Equal to one_hot(...) @ matrix, computed as the transposed matrix
+        times a dense 0/1 vector over the options (no sparse objects built
+        per call).
+        """
+        indicator = np.zeros(len(self.options))
+        indicator[self.rows(selected_answers)] = 1.0
+        return (self._by_model @ indicator) * question_importance
+
+    def scores(self, selected_answers, question_importance=1.0):
+        """Same {model id: score} mapping as compute_rule_score()."""
+        return dict(zip(self.model_ids, self.score_vector(selected_answers, question_importance).tolist()))
+
+    def save(self, path, fingerprint):
+        m = self.matrix
+        np.savez(
+            path,
+            options=np.asarray(self.options, dtype=str).reshape(-1, 2),
+            model_ids=np.asarray(self.model_ids, dtype=str),
+            indptr=m.indptr, indices=m.indices, data=m.data,
+            fingerprint=np.asarray(fingerprint),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path, allow_pickle=False) as z:
+            compiled = cls(z["options"].tolist(), z["model_ids"].tolist(), z["indptr"], z["indices"], z["data"])
+            return compiled, z["fingerprint"].tolist()
+
+
+def _fingerprint(path):
+    st = os.stat(path)
+    return [st.st_mtime_ns, st.st_size]
+
+
+def load_compiled(path="data/bm_rule_weights.json"):
+    """
+    Compiled rule bank for `path`, built once and reused.
+
+    Kept in memory for every session in the process and written next to
+    the JSON (COMPILED_SUFFIX) for later processes; the artifact is rebuilt
+    when the JSON's mtime or size changes.
+    """
+    fingerprint = _fingerprint(path)
+    cached = _COMPILED.get(path)
+    if cached is not None and cached[1] == fingerprint:
+        return cached[0]
+
+    artifact = os.path.splitext(path)[0] + COMPILED_SUFFIX
+    compiled = None
+    if os.path.exists(artifact):
+        try:
+            loaded, stored = CompiledRules.load(artifact)
+            if stored == fingerprint:
+                compiled = loaded
+        except (OSError, ValueError, KeyError):
+            compiled = None
+
+    if compiled is None:
+        compiled = CompiledRules.from_normalized(normalize_rule_weights(load_rules(path)))
+        try:
+            compiled.save(artifact, fingerprint)
+        except OSError:
+            pass  # read-only deployments still get the in-process cache
+
+    _COMPILED[path] = (compiled, fingerprint)
+    return compiled
+
+
+# ============================================================
+# ---------- INCREMENTAL RESCORING ----------
+# ============================================================
+
+class IncrementalScorer:
+    """
+    Running score vector for one questionnaire session.
+
+    Changing an answer subtracts the old option's row and adds the new
+    one, touching only the models those two rows list. Top-k is kept from
+    a small tracked candidate set plus a bound, the best (score, index)
+    rank any untracked model can have; a full O(models) rebuild happens
+    only when that bound could displace the k-th model, so ties at the
+    bound (e.g. the many zero scores of a fresh profile) stay cheap.
+    Works on any CompiledRules, including the tag matrix from
+    utils.cohort.tag_compiled().
+    """
+
+    def __init__(self, compiled, k=3, question_importance=1.0, slack=4):
+        self.compiled = compiled
+        self.k = k
+        self.question_importance = question_importance
+        self.capacity = max(k, k * slack)
+        self.answers = {}
+        self.scores = np.zeros(len(compiled.model_ids))
+        self._rebuild()
+
+    # ---------- answers ----------
+    def set_answer(self, qid, ans):
+        """Select `ans` for question `qid` (unknown options just clear the question)."""
+        old = self.answers.pop(qid, None)
+        if old == ans:
+            self.answers[qid] = ans
+            return
+        touched = []
+        if old is not None:
+            touched.append(self._apply(self.compiled.option_index.get((qid, old)), -1.0))
+        row = self.compiled.option_index.get((qid, ans))
+        if row is not None:
+            self.answers[qid] = ans
+            touched.append(self._apply(row, 1.0))
+        if touched:
+            self._update_top(np.concatenate(touched))
+
+    def clear_answer(self, qid):
+        old = self.answers.pop(qid, None)
+        if old is not None:
+            self._update_top(self._apply(self.compiled.option_index.get((qid, old)), -1.0))
+
+    def reset(self, selected_answers=None):
+        """Start over from `selected_answers` with one full scoring pass (also clears float drift)."""
+        selected_answers = selected_answers or {}
+        self.answers = {q: a for q, a in selected_answers.items() if (q, a) in self.compiled.option_index}
+        self.scores = self.compiled.score_vector(self.answers, self.question_importance)
+        self._rebuild()
+
+    # ---------- results ----------
+    def top(self, k=None):
+        """[(model id, score)] of the best k models, best first (ties by model order)."""
+        k = min(k or self.k, len(self.scores))
+        if k > self.capacity:
+            self.capacity = k
+            self._rebuild()
+        ranked = self._ranked()[:k]
+        ids = self.compiled.model_ids
+        return [(ids[j], float(self.scores[j])) for j in ranked]
+
+    def score_dict(self):
+        """Same {model id: score} mapping as compute_rule_score()."""
+        return dict(zip(self.compiled.model_ids, self.scores.tolist()))
+
+    # ---------- internals ----------
+    def _apply(self, row, sign):
+        if row is None:
+            return np.empty(0, dtype=np.int64)
+        m = self.compiled.matrix
+        lo, hi = m.indptr[row], m.indptr[row + 1]
+        idx = m.indices[lo:hi]
+        self.scores[idx] += sign * self.question_importance * m.data[lo:hi]
+        return idx
+
+    def _ranked(self):
+        tracked = np.fromiter(self._tracked, dtype=np.int64, count=len(self._tracked))
+        return tracked[np.lexsort((tracked, -self.scores[tracked]))]
+
+    def _beats_bound(self, j):
+        """True when model j ranks ahead of the best untracked model (higher score, ties by lower index)."""
+        s = self.scores[j]
+        return s > self._bound or (s == self._bound and j < self._bound_idx)
+
+    def _rebuild(self):
+        n = len(self.scores)
+        keep = min(self.capacity, n)
+        if keep < n:
+            # Best `keep` models by (score desc, index asc), so ties are broken as in _ranked().
+            cut = np.partition(-self.scores, keep - 1)[keep - 1]
+            better = np.flatnonzero(-self.scores < cut)
+            tied = np.flatnonzero(-self.scores == cut)[:keep - better.size]
+            self._tracked = set(better.tolist()) | set(tied.tolist())
+            rest = np.ones(n, dtype=bool)
+            rest[list(self._tracked)] = False
+            self._bound = float(self.scores[rest].max())
+            self._bound_idx = int(np.flatnonzero(rest & (self.scores == self._bound))[0])
+        else:
+            self._tracked = set(range(n))
+            self._bound, self._bound_idx = -np.inf, n
+
+    def _update_top(self, touched):
+        for j in set(touched.tolist()) - self._tracked:
+            if self._beats_bound(j):
+                self._tracked.add(j)
+        if len(self._tracked) > self.capacity:
+            ranked = self._ranked()
+            for j in ranked[self.capacity:].tolist():
+                self._tracked.discard(j)
+                if not self._beats_bound(j):
+                    continue
+                self._bound, self._bound_idx = float(self.scores[j]), j
+        ranked = self._ranked()
+        k = min(self.k, len(self.scores))
+        # Untracked models rank no better than (bound, bound_idx); the k-th must rank ahead of it.
+        if len(ranked) < k or not self._beats_bound(int(ranked[k - 1])):
+            self._rebuild()
@@ -0,0 +1,198 @@
+"""
+Batch scoring of applicant cohorts against the business-model rule bank.
+
+    python -m utils.cohort profiles.csv -k 3 -o results.csv
+
+Profiles come from a CSV (one column per question id, cells holding the
+answer key, optional `id` column) or JSONL (one object per line, either
+flat like the CSV or {"id": ..., "answers": {...}}). Input is read in
+chunks; each chunk becomes a sparse (profiles x options) one-hot matrix,
+is scored with one product against the compiled matrix and reduced to
+the top-k models per profile with argpartition.
+"""
+from __future__ import annotations
+import argparse
+import os
+from typing import Dict, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.bm_rule_engine import CompiledRules, load_compiled, load_rules
+from utils.model_logic import load_models
+
+
+RULES_PATH = "data/bm_rule_weights.json"
+SCORE_METHODS = {
+    "rules": "Rule-bank model weights (bm_rule_engine.compute_rule_score)",
+    "tags": "Answer tags overlapping model tags (model_logic.score_models)",
+}
+RESULT_COLUMNS = ["profile_id", "rank", "model_id", "score"]
+# Dense score cells held per chunk (profiles x models), ~64 MB in float64.
+SCORE_BUDGET = 8_000_000
+
+_TAG_COMPILED: Dict[Tuple, CompiledRules] = {}
+
+
+# ============================================================
+# ---------- SCORING MATRICES ----------
+# ============================================================
+
+def tag_compiled(rules_path: str = RULES_PATH) -> CompiledRules:
+    """
+    (answer options x models) matrix of tag scores.
+
+    Entry (o, m) sums option o's tag weights over the tags model m carries,
+    so a profile's row sum equals model_logic.score_models() on the tags
+    accumulated from its answers.
+    """
+    from scipy.sparse import csr_matrix
+
+    models = load_models()
+    key = (rules_path, os.stat(rules_path).st_mtime_ns, len(models))
+    if key in _TAG_COMPILED:
+        return _TAG_COMPILED[key]
+
+    rules = load_rules(rules_path)
+    options = [(qid, ans) for qid, answers in rules.items() for ans in answers]
+    tags = sorted({t for answers in rules.values() for d in answers.values() for t in d.get("tags", {})}
+                  | {t for m in models for t in m.get("tags", [])})
+    tag_index = {t: i for i, t in enumerate(tags)}
+
+    rows, cols, vals = [], [], []
+    for r, (qid, ans) in enumerate(options):
+        for t, w in rules[qid][ans].get("tags", {}).items():
+            rows.append(r)
+            cols.append(tag_index[t])
+            vals.append(float(w))
+    option_tags = csr_matrix((vals, (rows, cols)), shape=(len(options), len(tags)))
+
+    model_ids = [m["id"] for m in models]
+    pairs = [(tag_index[t], j) for j, m in enumerate(models) for t in set(m.get("tags", []))]
+    t_idx, m_idx = (np.array(x, dtype=np.int64) for x in zip(*pairs)) if pairs else (np.empty(0, int),) * 2
+    tag_models = csr_matrix((np.ones(len(pairs)), (t_idx, m_idx)), shape=(len(tags), len(models)))
+
+    product = (option_tags @ tag_models).tocsr()
+    product.sort_indices()
+    compiled = CompiledRules(options, model_ids, product.indptr, product.indices, product.data)
+    _TAG_COMPILED[key] = compiled
+    return compiled
+
+
+def one_hot(frame: pd.DataFrame, compiled: CompiledRules):
+    """Sparse (profiles x options) indicator matrix; unknown questions/answers are ignored."""
+    from scipy.sparse import csr_matrix
+
+    rows, cols = [], []
+    for qid in frame.columns.intersection(list(compiled.question_index)):
+        codes = frame[qid].map(compiled.question_index[qid]).to_numpy(dtype=float)
+        hit = np.flatnonzero(~np.isnan(codes))
+        rows.append(hit)
+        cols.append(codes[hit].astype(np.int64))
+    r = np.concatenate(rows) if rows else np.empty(0, dtype=np.int64)
+    c = np.concatenate(cols) if cols else np.empty(0, dtype=np.int64)
+    return csr_matrix((np.ones(r.size), (r, c)), shape=(len(frame), len(compiled.options)))
+
+
+def top_k(scores: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and values of the k best scores per row, best first (ties by column)."""
+    k = min(k, scores.shape[1])
+    if k < scores.shape[1]:
+        # Everything above the k-th best value, then the lowest columns among those equal to it.
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+        above = scores > kth
+        at = scores == kth
+        keep = above | (at & (np.cumsum(at, axis=1) <= k - above.sum(axis=1, keepdims=True)))
+        idx = np.nonzero(keep)[1].reshape(len(scores), k)
+    else:
+        idx = np.broadcast_to(np.arange(k), scores.shape).copy()
+    vals = np.take_along_axis(scores, idx, axis=1)
+    order = np.lexsort((idx, -vals))
+    return np.take_along_axis(idx, order, axis=1), np.take_along_axis(vals, order, axis=1)
+
+
+# ============================================================
+# ---------- STREAMED INPUT ----------
+# ============================================================
+
+def read_profiles(path: str, chunk_size: int) -> Iterator[pd.DataFrame]:
+    """Answer profiles in chunks of `chunk_size` rows, as string columns."""
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        for chunk in pd.read_json(path, lines=True, chunksize=chunk_size, dtype=False):
+            if "answers" in chunk.columns:
+                answers = pd.DataFrame(chunk["answers"].tolist(), index=chunk.index)
+                chunk = pd.concat([chunk.drop(columns="answers"), answers], axis=1)
+            yield chunk.astype(object).where(chunk.notna(), None)
+    else:
+        yield from pd.read_csv(path, chunksize=chunk_size, dtype=str, keep_default_na=False, na_values=[""])
+
+
+def score_cohort(
+    path: str,
+    k: int = 3,
+    method: str = "rules",
+    chunk_size: int = 10_000,
+    question_importance: float = 1.0,
+    rules_path: str = RULES_PATH,
+    id_column: str = "id",
+) -> Iterator[pd.DataFrame]:
+    """
+    Top-k models for every profile in a CSV/JSONL cohort, one DataFrame per chunk.
+
+    Rows are (profile_id, rank, model_id, score) in long format. Profiles
+    without an `id_column` are numbered by their position in the file.
+    """
+    if method not in SCORE_METHODS:
+        raise ValueError(f"Unknown scoring method: {method}")
+    compiled = load_compiled(rules_path) if method == "rules" else tag_compiled(rules_path)
+    n_models = len(compiled.model_ids)
+    model_ids = np.asarray(compiled.model_ids, dtype=object)
+    rows_per_block = max(1, SCORE_BUDGET // max(1, n_models))
+
+    seen = 0
+    for chunk in read_profiles(path, chunk_size):
+        ids = (chunk[id_column].astype(str).to_numpy() if id_column in chunk.columns
+               else np.arange(seen, seen + len(chunk)).astype(str))
+        seen += len(chunk)
+        x = one_hot(chunk, compiled)
+        for start in range(0, len(chunk), rows_per_block):
+            block = slice(start, start + rows_per_block)
+            scores = (x[block] @ compiled.matrix).toarray() * question_importance
+            idx, vals = top_k(scores, k)
+            yield pd.DataFrame({
+                "profile_id": np.repeat(ids[block], idx.shape[1]),
+                "rank": np.tile(np.arange(1, idx.shape[1] + 1), idx.shape[0]),
+                "model_id": model_ids[idx.ravel()],
+                "score": vals.ravel(),
+            }, columns=RESULT_COLUMNS)
+
+
+def score_cohort_to_csv(path: str, out_path: str, **kwargs) -> int:
+    """Stream score_cohort() results to a CSV; returns the number of rows written."""
+    written = 0
+    for i, frame in enumerate(score_cohort(path, **kwargs)):
+        frame.to_csv(out_path, mode="w" if i == 0 else "a", header=i == 0, index=False)
+        written += len(frame)
+    if written == 0:
+        pd.DataFrame(columns=RESULT_COLUMNS).to_csv(out_path, index=False)
+    return written
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Score a cohort of answer profiles against the business-model rule bank.")
+    parser.add_argument("input", help="CSV or JSONL of answer profiles")
+    parser.add_argument("-o", "--output", default="cohort_scores.csv", help="CSV to write (default: %(default)s)")
+    parser.add_argument("-k", "--top", type=int, default=3, help="models per profile (default: %(default)s)")
+    parser.add_argument("--method", choices=list(SCORE_METHODS), default="rules")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--importance", type=float, default=1.0, help="question importance multiplier")
+    parser.add_argument("--rules", default=RULES_PATH)
+    parser.add_argument("--id-column", default="id")
+    args = parser.parse_args(argv)
+    n = score_cohort_to_csv(args.input, args.output, k=args.top, method=args.method, chunk_size=args.chunk_size,
+                            question_importance=args.importance, rules_path=args.rules, id_column=args.id_column)
+    print(f"Wrote {n:,} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -19,3 +19,6 @@ def load_archetypes():
 
 def load_secondary_questions():
     return load_json("data/secondary_questions.json")
+
+def load_trl_stages():
+    return load_json("data/trl_stages.json")
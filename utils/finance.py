@@ -1,54 +1,358 @@
 
+from functools import lru_cache
 from typing import List
 
-def npv(rate: float, cashflows: List[float]) -> float:
-    return sum(cf / ((1 + rate) ** t) for t, cf in enumerate(cashflows))
+import numpy as np
 
-def irr(cashflows: List[float], guess: float = 0.1, tol: float = 1e-6, max_iter: int = 100) -> float:
-    rate = guess
+
+# ============================================================
+# ---------- TIMING CONVENTIONS ----------
+# ============================================================
+
+# Time (in periods) at which cashflow index 0 is received:
+#   "t0"  - first flow is today (undiscounted), flow t at time t
+#   "mid" - flows arrive mid-period, flow t at time t + 0.5
+#   "end" - flows arrive at period end, flow t at time t + 1
+TIMING_OFFSETS = {"t0": 0.0, "mid": 0.5, "end": 1.0}
+
+
+def discount_factors(rate, periods: int, timing: str = "t0", dtype=None) -> np.ndarray:
+    """
+    1 / (1 + r)^(t + offset) for t = 0..periods-1.
+
+    `rate` may be a scalar or an array; its shape is prepended to the
+    result, so K rates give a (K x periods) matrix.
+    """
+    r = np.asarray(rate, dtype=dtype or float)
+    t = np.arange(periods, dtype=r.dtype) + r.dtype.type(TIMING_OFFSETS[timing])
+    return (1 + r[..., None]) ** -t
+
+
+def _scalar(x):
+    return float(x) if np.ndim(x) == 0 else x
+
+
+# ============================================================
+# ---------- NPV ----------
+# ============================================================
+
+def npv(rate, cashflows, timing: str = "t0"):
+    """
+    Net present value along the last axis of `cashflows`.
+
+    Scalar rate + 1-D flows gives a float; batched rates and/or 2-D flows
+    broadcast to an array of NPVs.
+    """
+    cf = np.asarray(cashflows, dtype=float)
+    if cf.ndim == 1 and np.ndim(rate) == 0:
+        # One vector at one rate: skip discount_factors() broadcasting, which dominates short horizons.
+        offset = TIMING_OFFSETS[timing]
+        return float(cf @ (1.0 + float(rate)) ** -np.arange(offset, offset + cf.shape[0]))
+    dfs = discount_factors(rate, cf.shape[-1], timing)
+    return np.einsum("...t,...t->...", cf, dfs)
+
+# IRR solver status codes (one per cashflow row).
+IRR_CONVERGED = 0
+IRR_NO_ROOT = 1
+IRR_MULTIPLE = 2
+IRR_NOT_CONVERGED = 3
+
+# Rate grid used to bracket roots before refining: dense near zero, coarse up to 1000%.
+IRR_GRID = np.concatenate([np.linspace(-0.99, 1.0, 200, endpoint=False), np.linspace(1.0, 10.0, 46)])
+_GRID_MID = 0.5 * (IRR_GRID[:-1] + IRR_GRID[1:])
+
+# When cashflows have several IRRs, the root nearest this rate is reported.
+IRR_GUESS = 0.1
+
+
+@lru_cache(maxsize=32)
+def _grid_factors(periods: int) -> np.ndarray:
+    """Discount factors of IRR_GRID for a given horizon (cached, read-only)."""
+    with np.errstate(over="ignore", invalid="ignore"):
+        dfs = discount_factors(IRR_GRID, periods)
+    dfs.setflags(write=False)
+    return dfs
+
+
+def _npv_and_slope(cashflows: np.ndarray, rates: np.ndarray):
+    """Row-wise NPV (t=0 convention) and dNPV/dr at one rate per row."""
+    t = np.arange(cashflows.shape[1])
+    v = np.power(1 + rates[:, None], -t[None, :])
+    f = (cashflows * v).sum(axis=1)
+    df = -(cashflows * t * v).sum(axis=1) / (1 + rates)
+    return f, df
+
+
+def irr_batch(cashflows, tol: float = 1e-9, max_iter: int = 100, guess=IRR_GUESS):
+    """
+    Solve the IRR of every row of a 2-D cashflow array at once.
+
+    Roots are bracketed on IRR_GRID with one matrix product, then refined by
+    Newton steps that fall back to bisection whenever a step leaves the bracket.
+    Returns (rates, status); rates is NaN where no root exists. Rows with more
+    than one sign change of NPV on the grid are flagged IRR_MULTIPLE and report
+    the root nearest `guess` (scalar or one per row, e.g. the discount rate);
+    irr_roots() lists them all.
+    """
+    cf = np.atleast_2d(np.asarray(cashflows, dtype=float))
+    n = cf.shape[0]
+    rates = np.full(n, np.nan)
+    status = np.full(n, IRR_NO_ROOT, dtype=np.int8)
+    if n == 0 or cf.shape[1] < 2:
+        return rates, status
+
+    with np.errstate(over="ignore", invalid="ignore"):
+        grid_npv = cf @ _grid_factors(cf.shape[1]).T                      # rows x grid
+
+    sign = np.sign(grid_npv)
+    crossing = (sign[:, :-1] * sign[:, 1:]) < 0
+    exact = sign == 0
+    n_roots = crossing.sum(axis=1) + exact.sum(axis=1)
+    has_root = n_roots > 0
+    status[n_roots > 1] = IRR_MULTIPLE
+
+    # Of several bracketed roots, refine the one nearest the guess; roots
+    # landing exactly on a grid point need no refinement.
+    guess = np.broadcast_to(np.asarray(guess, dtype=float), (n,))
+    d_cross = np.where(crossing, np.abs(_GRID_MID[None, :] - guess[:, None]), np.inf)
+    d_exact = np.where(exact, np.abs(IRR_GRID[None, :] - guess[:, None]), np.inf)
+    best_cross = d_cross.argmin(axis=1)
+    best_exact = d_exact.argmin(axis=1)
+    r = np.arange(n)
+    on_grid = has_root & (d_exact[r, best_exact] <= d_cross[r, best_cross])
+    rates[on_grid] = IRR_GRID[best_exact[on_grid]]
+
+    rows = np.flatnonzero(has_root & ~on_grid)
+    if rows.size:
+        idx = best_cross[rows]
+        lo, hi = IRR_GRID[idx], IRR_GRID[idx + 1]
+        f_lo, f_hi = grid_npv[rows, idx], grid_npv[rows, idx + 1]
+        x = lo - f_lo * (hi - lo) / (f_hi - f_lo)           # secant start inside bracket
+        scale = np.abs(cf[rows]).sum(axis=1)
+        done = np.zeros(rows.size, dtype=bool)
+
+        for _ in range(max_iter):
+            active = ~done
+            if not active.any():
+                break
+            a = np.flatnonzero(active)
+            f, df = _npv_and_slope(cf[rows[a]], x[a])
+
+            conv = (np.abs(f) <= tol * scale[a]) | (hi[a] - lo[a] <= tol)
+            done[a[conv]] = True
+
+            same = np.sign(f) == np.sign(f_lo[a])
+            lo[a] = np.where(same, x[a], lo[a])
+            f_lo[a] = np.where(same, f, f_lo[a])
+            hi[a] = np.where(same, hi[a], x[a])
+
+            with np.errstate(divide="ignore", invalid="ignore"):
+                step = x[a] - f / df
+            inside = np.isfinite(step) & (step > lo[a]) & (step < hi[a])
+            x[a] = np.where(conv, x[a], np.where(inside, step, 0.5 * (lo[a] + hi[a])))
+
+        rates[rows] = x
+        status[rows[~done]] = IRR_NOT_CONVERGED
+        status[rows[done & (status[rows] == IRR_NO_ROOT)]] = IRR_CONVERGED
+
+    status[on_grid & (status == IRR_NO_ROOT)] = IRR_CONVERGED
+    return rates, status
+
+
+def _grid_roots(cf: np.ndarray):
+    """NPV of one vector on IRR_GRID plus its exact grid roots and sign-change brackets."""
+    with np.errstate(over="ignore", invalid="ignore"):
+        grid_npv = _grid_factors(cf.size) @ cf
+    sign = np.sign(grid_npv)
+    return grid_npv, np.flatnonzero(sign == 0), np.flatnonzero(sign[:-1] * sign[1:] < 0)
+
+
+def _refine(cf: np.ndarray, grid_npv: np.ndarray, j: int, tol: float, max_iter: int) -> float:
+    """Safeguarded Newton on the bracket [IRR_GRID[j], IRR_GRID[j + 1]]."""
+    lo, hi, f_lo = IRR_GRID[j], IRR_GRID[j + 1], grid_npv[j]
+    x = lo - f_lo * (hi - lo) / (grid_npv[j + 1] - f_lo)
+    t = np.arange(cf.size)
+    ct = cf * t
+    scale = np.abs(cf).sum()
     for _ in range(max_iter):
-        npv_val = 0.0
-        d_npv = 0.0
-        for t, cf in enumerate(cashflows):
-            denom = (1 + rate) ** t
-            npv_val += cf / denom
-            if t > 0:
-                d_npv += -t * cf / ((1 + rate) ** (t + 1))
-        if abs(npv_val) < tol:
-            return rate
-        if d_npv == 0:
+        v = (1 + x) ** -t
+        f = cf @ v
+        if abs(f) <= tol * scale or hi - lo <= tol:
             break
-        rate -= npv_val / d_npv
-        if rate <= -0.9999:
-            rate = -0.99
-    return rate
-
-def payback_period(cashflows: List[float]) -> float:
-    cum = 0.0
-    for i, cf in enumerate(cashflows):
-        cum += cf
-        if cum >= 0:
-            prev_cum = cum - cf
-            if cf != 0:
-                return i - prev_cum / cf
-            return float(i)
-    return float('inf')
-
-def build_projection(years:int, revenue:list, opex:list, capex:list, tax_rate:float=0.28, depreciation_years:int=5):
-    depreciation = [0.0]*years
-    if years>0 and sum(capex)>0:
-        total_capex = sum(capex)
-        per_year = total_capex / max(1,depreciation_years)
-        for y in range(min(years,depreciation_years)):
-            depreciation[y] = per_year
-    ebit = []
-    tax = []
-    net_cf = []
-    for y in range(years):
-        e = revenue[y] - opex[y] - depreciation[y]
-        ebit.append(e)
-        t = max(0.0, e)*tax_rate
-        tax.append(t)
-        net = (revenue[y] - opex[y]) - t - capex[y]
-        net_cf.append(net)
-    return {"depreciation": depreciation, "ebit": ebit, "tax": tax, "net_cf": net_cf}
+        if np.sign(f) == np.sign(f_lo):
+            lo, f_lo = x, f
+        else:
+            hi = x
+        df = -(ct @ v) / (1 + x)
+        step = x - f / df if df else lo - 1
+        x = step if lo < step < hi else 0.5 * (lo + hi)
+    return float(x)
+
+
+def irr(cashflows: List[float], guess: float = IRR_GUESS, tol: float = 1e-9, max_iter: int = 100) -> float:
+    """
+    IRR of a single cashflow vector; NaN when it has no IRR.
+
+    Arguments keep their original order, so irr(flows, 0.1) still passes
+    the guess. NaN replaces the last Newton iterate the original returned
+    when it failed, which was not a root.
+
+    Same bracket + safeguarded Newton as irr_batch, run on scalars so short
+    vectors don't pay for the batch bookkeeping. With several roots, the
+    one nearest `guess` is returned.
+    """
+    cf = np.asarray(cashflows, dtype=float)
+    if cf.ndim != 1:
+        return float(irr_batch(cf, tol=tol, max_iter=max_iter, guess=guess)[0][0])
+    if cf.size < 2:
+        return float("nan")
+
+    grid_npv, exact, cross = _grid_roots(cf)
+    if not exact.size and not cross.size:
+        return float("nan")
+    d_exact = np.abs(IRR_GRID[exact] - guess).min(initial=np.inf)
+    d_cross = np.abs(_GRID_MID[cross] - guess)
+    if exact.size and (not cross.size or d_exact <= d_cross.min()):
+        return float(IRR_GRID[exact[np.abs(IRR_GRID[exact] - guess).argmin()]])
+    return _refine(cf, grid_npv, int(cross[d_cross.argmin()]), tol, max_iter)
+
+
+def irr_roots(cashflows, tol: float = 1e-9, max_iter: int = 100) -> np.ndarray:
+    """Every IRR of one cashflow vector that IRR_GRID brackets, ascending (empty when none)."""
+    cf = np.asarray(cashflows, dtype=float)
+    if cf.size < 2:
+        return np.empty(0)
+    grid_npv, exact, cross = _grid_roots(cf)
+    roots = [IRR_GRID[i] for i in exact] + [_refine(cf, grid_npv, int(j), tol, max_iter) for j in cross]
+    return np.sort(np.asarray(roots, dtype=float))
+
+# ============================================================
+# ---------- PAYBACK ----------
+# ============================================================
+
+def payback_period(cashflows, timing: str = "t0"):
+    """
+    Time until cumulative cashflow turns non-negative, interpolated within
+    the period it happens; inf where it never does. Works along the last
+    axis, so 2-D input gives one payback per row. With "t0" the first flow
+    is the upfront investment, so recovery is searched from period 1 on.
+    """
+    cf = np.asarray(cashflows, dtype=float)
+    # The bare ufunc, not np.cumsum(): on short vectors the wrapper costs more than the sum.
+    cum = np.add.accumulate(cf, axis=-1)
+    reached = cum >= 0.0
+    start = 1 if timing == "t0" else 0
+    if cf.ndim == 1:
+        if reached.size <= start:
+            return float("inf")
+        i = int(reached[start:].argmax()) + start
+        if not reached.item(i):
+            return float("inf")
+        if i == 0:
+            return 0.0
+        step = cf.item(i)
+        return i - 1 + TIMING_OFFSETS[timing] + (abs(cum.item(i - 1)) / step if step else 0.0)
+    reached[..., :start] = False
+    hit = reached.any(axis=-1)
+    i = reached.argmax(axis=-1)
+
+    prev = np.take_along_axis(cum, np.maximum(i - 1, 0)[..., None], axis=-1)[..., 0]
+    step = np.take_along_axis(cf, i[..., None], axis=-1)[..., 0]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        frac = np.where((i > 0) & (step != 0), np.abs(prev) / step, 0.0)
+    t = np.where(i > 0, i - 1 + TIMING_OFFSETS[timing] + frac, 0.0)
+    return _scalar(np.where(hit, t, np.inf))
+
+
+# ============================================================
+# ---------- PROJECTION (DEPRECIATION + TAX) ----------
+# ============================================================
+
+def depreciation_kernel(method: str = "straight_line", life: int = 5, factor: float = 2.0, schedule=None) -> np.ndarray:
+    """
+    Fraction of a CAPEX tranche written off in each year after it is spent.
+
+    "straight_line": 1/life per year. "declining_balance": factor/life of
+    the remaining book value per year, with the balance written off in the
+    last year of `life`. "custom": the given `schedule`, used as-is.
+    """
+    if method == "custom":
+        return np.asarray(schedule, dtype=float)
+    life = max(1, int(life))
+    if method == "straight_line":
+        return np.full(life, 1.0 / life)
+    if method == "declining_balance":
+        d = min(1.0, factor / life)
+        k = d * (1 - d) ** np.arange(life)
+        k[-1] = (1 - d) ** (life - 1)
+        return k
+    raise ValueError(f"Unknown depreciation method: {method}")
+
+
+def depreciate(capex, kernel) -> np.ndarray:
+    """Convolve CAPEX tranches (last axis) with a depreciation kernel, truncated to the horizon."""
+    capex = np.asarray(capex, dtype=float)
+    kernel = np.asarray(kernel, dtype=float)
+    periods = capex.shape[-1]
+    dep = np.zeros_like(capex)
+    for lag, w in enumerate(kernel[:periods]):
+        if w:
+            dep[..., lag:] += w * capex[..., :periods - lag]
+    return dep
+
+
+def taxable_income(ebit, carry_forward: bool = True) -> np.ndarray:
+    """
+    Income that attracts tax each period (last axis).
+
+    With carry-forward, assessed losses offset later profits: cumulative
+    taxable income is the running maximum of cumulative EBIT (floored at 0),
+    so each period's taxable income is the step in that running maximum.
+    """
+    ebit = np.asarray(ebit, dtype=float)
+    if not carry_forward:
+        return np.maximum(0.0, ebit)
+    taxed = np.maximum.accumulate(np.maximum(0.0, np.cumsum(ebit, axis=-1)), axis=-1)
+    return np.diff(taxed, axis=-1, prepend=0.0)
+
+
+def build_projection(
+    years: int,
+    revenue,
+    opex,
+    capex,
+    tax_rate: float = 0.28,
+    depreciation_years: int = 5,
+    method: str = "straight_line",
+    schedule=None,
+    declining_factor: float = 2.0,
+    carry_forward: bool = True,
+):
+    """
+    Depreciation, EBIT, tax and net cashflow for one or many scenarios.
+
+    revenue/opex/capex are (..., years) arrays (extra leading axes are
+    scenario batches). Each year's CAPEX is depreciated from the year it is
+    spent using the chosen kernel; losses carry forward unless disabled.
+    """
+    revenue = np.asarray(revenue, dtype=float)[..., :years]
+    opex = np.asarray(opex, dtype=float)[..., :years]
+    capex = np.asarray(capex, dtype=float)[..., :years]
+    revenue, opex, capex = np.broadcast_arrays(revenue, opex, capex)
+
+    kernel = depreciation_kernel(method, depreciation_years, declining_factor, schedule)
+    depreciation = depreciate(capex, kernel)
+    ebit = revenue - opex - depreciation
+    taxable = taxable_income(ebit, carry_forward)
+    tax = taxable * tax_rate
+    net_cf = (revenue - opex) - tax - capex
+    # Losses not yet absorbed: income taxed so far minus income earned so far.
+    loss_pool = np.cumsum(taxable, axis=-1) - np.cumsum(ebit, axis=-1)
+    return {
+        "depreciation": depreciation,
+        "ebit": ebit,
+        "taxable_income": taxable,
+        "tax": tax,
+        "net_cf": net_cf,
+        "assessed_loss": loss_pool if carry_forward else np.zeros_like(ebit),
+    }
@@ -0,0 +1,121 @@
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from utils.finance import discount_factors
+from utils.projection import expand_annual, period_rate
+
+
+# Editable table columns; NPV (and NPV at a target IRR) is linear in a multiplier on any of them.
+TABLE_COLUMNS = {
+    "units": "Units",
+    "price": "Price (R/u)",
+    "cogs": "COGS (R/u)",
+    "opex": "OPEX (R)",
+    "capex": "CAPEX (R)",
+}
+SEEK_DRIVERS = (*TABLE_COLUMNS, "discount")
+SEEK_LABELS = {
+    "units": "Units",
+    "price": "Price",
+    "cogs": "COGS per unit",
+    "opex": "OPEX",
+    "capex": "CAPEX",
+    "discount": "Discount rate",
+}
+
+# The discount rate is solved by bracketing on a grid + bisection within this range.
+DISCOUNT_RANGE = (-0.95, 5.0)
+GRID_POINTS = 400
+BISECT_STEPS = 60
+
+
+# ============================================================
+# ---------- OBJECTIVES ----------
+# ============================================================
+
+def period_items(table: pd.DataFrame, shares: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+    """Per-period line items of a scenario table: the years themselves, or months spread by `shares`."""
+    cols = {d: table[c].to_numpy(dtype=float) for d, c in TABLE_COLUMNS.items()}
+    if shares is not None:
+        return expand_annual(cols["units"], cols["price"], cols["cogs"], cols["opex"], cols["capex"], shares)
+    revenue = cols["units"] * cols["price"]
+    cogs = cols["units"] * cols["cogs"]
+    return {"units": cols["units"], "revenue": revenue, "cogs": cogs, "opex": cols["opex"],
+            "capex": cols["capex"], "net": revenue - cogs - cols["opex"] - cols["capex"]}
+
+
+def _objective(net: np.ndarray, capex0, metric: str, target: float, rate, periods_per_year: int) -> np.ndarray:
+    """
+    Residual of stacked net-flow rows against the NPV or IRR target.
+
+    NPV discounts operating flows at period ends (as metrics()); IRR hits
+    the target exactly when the IRR cashflows, first-period CAPEX moved to
+    t=0, have zero NPV at the target rate.
+    """
+    if metric == "NPV":
+        return net @ discount_factors(rate, net.shape[-1], "end").T - target
+    dfs = discount_factors(period_rate(target, periods_per_year), net.shape[-1], "t0")
+    return -np.asarray(capex0, dtype=float) + net[..., 1:] @ dfs[1:]
+
+
+# ============================================================
+# ---------- SOLVER ----------
+# ============================================================
+
+def goal_seek(
+    table: pd.DataFrame,
+    driver: str,
+    metric: str = "NPV",
+    target: float = 0.0,
+    discount: float = 0.1,
+    periods_per_year: int = 1,
+    shares: np.ndarray | None = None,
+) -> float | None:
+    """
+    Value of `driver` that makes the table's NPV or IRR hit `target`, or None.
+
+    For a table column the answer is the multiplier on every year of that
+    column, solved exactly from two evaluations. The discount rate is
+    bracketed on a grid and refined by bisection. None means the target is
+    out of reach: the driver has no effect, the column would have to turn
+    negative, or no rate in DISCOUNT_RANGE works (IRR ignores the rate).
+    """
+    if driver not in SEEK_DRIVERS:
+        raise ValueError(f"Unknown goal-seek driver: {driver}")
+    p = period_items(table, shares)
+    net, capex0 = p["net"], p["capex"][0] if len(p["capex"]) else 0.0
+    rate = float(period_rate(discount, periods_per_year))
+
+    if driver in TABLE_COLUMNS:
+        # Doubling a column adds its own contribution to every period's net flow once more.
+        delta = {"units": p["revenue"] - p["cogs"], "price": p["revenue"], "cogs": -p["cogs"],
+                 "opex": -p["opex"], "capex": -p["capex"]}[driver]
+        f = _objective(np.stack([net, net + delta]), [capex0, capex0 * (2 if driver == "capex" else 1)],
+                       metric, target, rate, periods_per_year)
+        slope = f[1] - f[0]
+        if slope == 0:
+            return None
+        scale = 1 - f[0] / slope
+        return float(scale) if scale >= 0 else None
+
+    if metric == "IRR":
+        return None
+    grid = np.linspace(*DISCOUNT_RANGE, GRID_POINTS)
+    f = _objective(net, capex0, metric, target, period_rate(grid, periods_per_year), periods_per_year)
+    idx = np.flatnonzero(np.sign(f[:-1]) * np.sign(f[1:]) <= 0)
+    if idx.size == 0:
+        return None
+    # Of several crossings, take the one nearest the current rate.
+    j = idx[np.argmin(np.abs(grid[idx] - discount))]
+    lo, hi, f_lo = grid[j], grid[j + 1], f[j]
+    for _ in range(BISECT_STEPS):
+        mid = 0.5 * (lo + hi)
+        f_mid = _objective(net, capex0, metric, target, period_rate(mid, periods_per_year), periods_per_year)
+        if np.sign(f_mid) == np.sign(f_lo):
+            lo, f_lo = mid, f_mid
+        else:
+            hi = mid
+    return float(0.5 * (lo + hi))
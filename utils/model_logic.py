@@ -1,8 +1,11 @@
 from __future__ import annotations
+import heapq
 import json, os
 from collections import Counter
 from typing import Dict, List, Tuple, Any
 
+import numpy as np
+
 
 # ============================================================
 # ---------- DATA LOADING ----------
@@ -132,34 +135,76 @@ def trl_gate_score_adjustments(tag_weights: Counter, trl_level: int | None) -> C
 # ---------- MODEL SCORING (yours) ----------
 # ============================================================
 
+def build_tag_index(models: List[Dict[str, Any]]) -> Dict[str, List[int]]:
+    """Inverted index: tag -> catalog positions of the models carrying it."""
+    index: Dict[str, List[int]] = {}
+    for i, m in enumerate(models):
+        for t in set(m.get("tags", [])):
+            index.setdefault(t, []).append(i)
+    return index
+
+
+# Index per catalog list, keyed by id() and kept alongside the list it describes.
+_TAG_INDEX: Dict[int, Tuple[List[Dict[str, Any]], int, Dict[str, List[int]]]] = {}
+_TAG_INDEX_SLOTS = 4
+
+
+def tag_index(models: List[Dict[str, Any]], refresh: bool = False) -> Dict[str, List[int]]:
+    """Cached build_tag_index(); pass refresh=True after editing model tags in place."""
+    cached = _TAG_INDEX.get(id(models))
+    if refresh or cached is None or cached[0] is not models or cached[1] != len(models):
+        if len(_TAG_INDEX) >= _TAG_INDEX_SLOTS:
+            _TAG_INDEX.pop(next(iter(_TAG_INDEX)))
+        cached = (models, len(models), build_tag_index(models))
+        _TAG_INDEX[id(models)] = cached
+    return cached[2]
+
+
 def score_models(
     tag_weights: Counter,
     models: List[Dict[str, Any]],
     top_k: int = 3
 ) -> List[Dict[str, Any]]:
-    """Score by summing weights of overlapping tags."""
-    results: List[Dict[str, Any]] = []
-
-    for m in models:
-        mtags = set(m.get("tags", []))
+    """
+    Score by summing weights of overlapping tags.
 
-        overlap = {t: w for t, w in tag_weights.items()
-                   if t in mtags and w > 0}
+    Only models sharing a non-zero weighted tag are visited, through the
+    inverted tag index; every other model scores 0 and keeps its catalog
+    position, so the ranking matches a full scan with a stable sort. Top-k
+    comes from a bounded heap.
+    """
+    index = tag_index(models)
 
-        penalty_overlap = {t: w for t, w in tag_weights.items()
-                           if t in mtags and w < 0}
+    # Overlapping (tag, weight) pairs per model, in tag_weights order.
+    hits: Dict[int, List[Tuple[str, Any]]] = {}
+    for t, w in tag_weights.items():
+        if w == 0:
+            continue
+        for i in index.get(t, ()):
+            hits.setdefault(i, []).append((t, w))
 
+    candidates = []
+    for i, pairs in hits.items():
+        overlap = {t: w for t, w in pairs if w > 0}
+        penalty_overlap = {t: w for t, w in pairs if w < 0}
         score = sum(overlap.values()) + sum(penalty_overlap.values())
+        candidates.append((score, i, overlap, penalty_overlap))
 
-        results.append({
-            "model": m,
-            "score": score,
-            "matched": dict(sorted(overlap.items(), key=lambda x: -x[1])),
-            "penalties": dict(sorted(penalty_overlap.items(), key=lambda x: x[1]))
-        })
+    # Models without overlap score 0; the first top_k of them (catalog order) are enough.
+    zeros = []
+    for i in range(len(models)):
+        if len(zeros) >= top_k:
+            break
+        if i not in hits:
+            zeros.append((0, i, {}, {}))
 
-    results.sort(key=lambda x: x["score"], reverse=True)
-    return results[:top_k]
+    best = heapq.nsmallest(top_k, candidates + zeros, key=lambda c: (-c[0], c[1]))
+    return [{
+        "model": models[i],
+        "score": score,
+        "matched": dict(sorted(overlap.items(), key=lambda x: -x[1])),
+        "penalties": dict(sorted(penalty_overlap.items(), key=lambda x: x[1]))
+    } for score, i, overlap, penalty_overlap in best]
 
 
 
@@ -176,20 +221,189 @@ def model_similarity(m1: Dict[str, Any], m2: Dict[str, Any]) -> float:
     return len(t1 & t2) / len(t1 | t2)
 
 
+# Catalogs up to this size get a full pairwise similarity matrix; larger ones use MinHash/LSH.
+SIMILARITY_MATRIX_MAX = 2000
+MINHASH_PERMUTATIONS = 128
+# LSH bands are chosen so a pair exactly at the threshold becomes a candidate with this probability.
+LSH_RECALL = 0.999
+# Below this threshold LSH cannot prune much; use the exact vectorised scan instead.
+LSH_MIN_THRESHOLD = 0.1
+
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint16)
+_MERSENNE = (1 << 31) - 1
+
+
+class SimilarityIndex:
+    """
+    Bit-packed tag sets of a catalog for fast Jaccard queries.
+
+    Each model's tag set is one row of packed bits; intersections are
+    popcounts of ANDed rows. Small catalogs precompute the whole pairwise
+    matrix on first use. Large catalogs get MinHash signatures and LSH
+    band tables, so a query only verifies the candidates that share a
+    band.
+    """
+
+    def __init__(self, models: List[Dict[str, Any]]):
+        self.models = models
+        self.ids = [m["id"] for m in models]
+        tag_sets = [set(m.get("tags", [])) for m in models]
+        self.vocab = {t: i for i, t in enumerate(sorted({t for ts in tag_sets for t in ts}))}
+        self.sizes = np.array([len(ts) for ts in tag_sets], dtype=np.int64)
+        dense = np.zeros((len(models), max(1, len(self.vocab))), dtype=bool)
+        for i, ts in enumerate(tag_sets):
+            dense[i, [self.vocab[t] for t in ts]] = True
+        self.bits = np.packbits(dense, axis=1)
+        self._matrix = None
+        self._signatures = None
+        self._tables: Dict[int, List[Dict[bytes, List[int]]]] = {}
+
+    # ---------- exact ----------
+    def query_bits(self, tags) -> Tuple[np.ndarray, int]:
+        """Packed bits of a tag collection plus its set size (unknown tags count towards the union)."""
+        ts = set(tags)
+        row = np.zeros(self.bits.shape[1] * 8, dtype=bool)
+        row[[self.vocab[t] for t in ts if t in self.vocab]] = True
+        return np.packbits(row), len(ts)
+
+    def similarities(self, tags, positions=None) -> np.ndarray:
+        """Jaccard of `tags` against every model (or just `positions`), same arithmetic as model_similarity()."""
+        q, q_size = self.query_bits(tags)
+        bits = self.bits if positions is None else self.bits[positions]
+        sizes = self.sizes if positions is None else self.sizes[positions]
+        inter = _POPCOUNT[bits & q].sum(axis=1, dtype=np.int64)
+        union = q_size + sizes - inter
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sim = inter / union
+        sim[(sizes == 0) | (q_size == 0)] = 0.0
+        return sim
+
+    def matrix(self) -> np.ndarray:
+        """Pairwise Jaccard matrix, built once (row blocks keep the popcount buffer small)."""
+        if self._matrix is None:
+            n = len(self.ids)
+            out = np.zeros((n, n))
+            step = max(1, 4_000_000 // max(1, n * self.bits.shape[1]))
+            for start in range(0, n, step):
+                block = self.bits[start:start + step]
+                inter = _POPCOUNT[block[:, None, :] & self.bits[None, :, :]].sum(axis=2, dtype=np.int64)
+                union = self.sizes[start:start + step, None] + self.sizes[None, :] - inter
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    out[start:start + step] = np.where(union > 0, inter / union, 0.0)
+            out[self.sizes == 0, :] = 0.0
+            out[:, self.sizes == 0] = 0.0
+            self._matrix = out
+        return self._matrix
+
+    # ---------- MinHash / LSH ----------
+    def _hash_params(self):
+        rng = np.random.default_rng(0)
+        a = rng.integers(1, _MERSENNE, MINHASH_PERMUTATIONS, dtype=np.int64)
+        b = rng.integers(0, _MERSENNE, MINHASH_PERMUTATIONS, dtype=np.int64)
+        return a, b
+
+    def _minhash(self, tag_ids: np.ndarray, a, b) -> np.ndarray:
+        if tag_ids.size == 0:
+            return np.full(MINHASH_PERMUTATIONS, _MERSENNE, dtype=np.int64)
+        return ((tag_ids[:, None] * a + b) % _MERSENNE).min(axis=0)
+
+    def signatures(self) -> np.ndarray:
+        """(models x permutations) MinHash signatures, one universal hash per permutation."""
+        if self._signatures is None:
+            a, b = self._hash_params()
+            dense = np.unpackbits(self.bits, axis=1)[:, :len(self.vocab)]
+            hashed = (np.arange(len(self.vocab), dtype=np.int64)[:, None] * a + b) % _MERSENNE   # tags x perms
+            sig = np.full((len(self.ids), MINHASH_PERMUTATIONS), _MERSENNE, dtype=np.int64)
+            for t in range(len(self.vocab)):
+                rows = np.flatnonzero(dense[:, t])
+                sig[rows] = np.minimum(sig[rows], hashed[t])
+            self._signatures = sig
+        return self._signatures
+
+    @staticmethod
+    def band_rows(threshold: float) -> int:
+        """Largest rows-per-band whose banding still catches a pair at `threshold` with LSH_RECALL."""
+        best = 1
+        for r in range(1, MINHASH_PERMUTATIONS + 1):
+            bands = MINHASH_PERMUTATIONS // r
+            if 1 - (1 - threshold ** r) ** bands >= LSH_RECALL:
+                best = r
+        return best
+
+    def tables(self, r: int) -> List[Dict[bytes, List[int]]]:
+        if r not in self._tables:
+            sig = self.signatures()
+            tables = []
+            for band in range(MINHASH_PERMUTATIONS // r):
+                table: Dict[bytes, List[int]] = {}
+                keys = np.ascontiguousarray(sig[:, band * r:(band + 1) * r])
+                for i, key in enumerate(keys):
+                    table.setdefault(key.tobytes(), []).append(i)
+                tables.append(table)
+            self._tables[r] = tables
+        return self._tables[r]
+
+    def candidates(self, tags, threshold: float) -> np.ndarray:
+        """Catalog positions sharing at least one LSH band with `tags`."""
+        a, b = self._hash_params()
+        ids = np.array([self.vocab[t] for t in set(tags) if t in self.vocab], dtype=np.int64)
+        sig = self._minhash(ids, a, b)
+        r = self.band_rows(threshold)
+        found = set()
+        for band, table in enumerate(self.tables(r)):
+            found.update(table.get(np.ascontiguousarray(sig[band * r:(band + 1) * r]).tobytes(), ()))
+        return np.array(sorted(found), dtype=np.int64)
+
+
+_SIM_INDEX: Dict[int, Tuple[List[Dict[str, Any]], int, SimilarityIndex]] = {}
+
+
+def similarity_index(models: List[Dict[str, Any]], refresh: bool = False) -> SimilarityIndex:
+    """Cached SimilarityIndex per catalog list; pass refresh=True after editing model tags in place."""
+    cached = _SIM_INDEX.get(id(models))
+    if refresh or cached is None or cached[0] is not models or cached[1] != len(models):
+        if len(_SIM_INDEX) >= _TAG_INDEX_SLOTS:
+            _SIM_INDEX.pop(next(iter(_SIM_INDEX)))
+        cached = (models, len(models), SimilarityIndex(models))
+        _SIM_INDEX[id(models)] = cached
+    return cached[2]
+
+
 def find_adjacent_models(
     top_model: Dict[str, Any],
     all_models: List[Dict[str, Any]],
     threshold: float = 0.35
 ) -> List[Dict[str, Any]]:
-    """Find similar models above the threshold."""
-    adj = []
-    for m in all_models:
-        if m["id"] == top_model["id"]:
-            continue
-        sim = model_similarity(top_model, m)
-        if sim >= threshold:
-            adj.append({"model": m, "similarity": round(sim, 2)})
+    """
+    Find similar models above the threshold.
 
+    Similarities come from the cached bit-packed index: a precomputed
+    matrix row for small catalogs, otherwise exact Jaccard on the MinHash/
+    LSH candidates only. Every reported similarity is exact and compared
+    to `threshold` unrounded, as before.
+    """
+    index = similarity_index(all_models)
+    tags = top_model.get("tags", [])
+    n = len(all_models)
+
+    positions = None
+    if n <= SIMILARITY_MATRIX_MAX:
+        pos = next((i for i, m in enumerate(all_models) if m is top_model), None)
+        sims = index.matrix()[pos] if pos is not None else index.similarities(tags)
+    elif threshold >= LSH_MIN_THRESHOLD:
+        positions = index.candidates(tags, threshold)
+        sims = index.similarities(tags, positions)
+    else:
+        sims = index.similarities(tags)
+    if positions is None:
+        positions = np.arange(n)
+
+    keep = sims >= threshold
+    adj = [
+        {"model": all_models[i], "similarity": round(float(sim), 2)}
+        for i, sim in zip(positions[keep].tolist(), sims[keep].tolist())
+        if index.ids[i] != top_model["id"]
+    ]
     return sorted(adj, key=lambda x: -x["similarity"])
 
 
@@ -0,0 +1,168 @@
+from __future__ import annotations
+import multiprocessing as mp
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict
+
+import numpy as np
+
+from utils.finance import discount_factors
+from utils.simulation import DRIVER_RANGES, draw_drivers, npv_samples, sim_chunk
+
+
+# Samples per task. Work is cut into tasks independently of the worker
+# count, and each task owns one spawned seed stream, so results are
+# identical for any number of workers.
+TASK_SIZE = 1_000_000
+HIST_BINS = 4096
+# Default worker cap (os.cpu_count() reports the host's cores inside a container).
+MAX_WORKERS = 4
+# Block working memory shared by all workers; each evaluates its samples in chunks of budget / workers.
+PARALLEL_CHUNK_BYTES = 256 * 1024 * 1024
+
+# Per-worker view of the shared cashflow block (set by _attach).
+_SHARED: Dict[str, object] = {}
+
+
+# ============================================================
+# ---------- SHARED INPUTS ----------
+# ============================================================
+
+def _attach(name: str, shape):
+    """Pool initializer: map the shared (2 x periods) revenue/cost block once per worker."""
+    shm = shared_memory.SharedMemory(name=name)
+    _SHARED["shm"] = shm
+    _SHARED["flows"] = np.ndarray(shape, dtype=np.float64, buffer=shm.buf)
+
+
+def npv_bounds(revenue: np.ndarray, cost: np.ndarray, discount: float, steps: int = 65):
+    """Envelope of attainable NPVs over the driver ranges (fixes the histogram edges up front)."""
+    (a_lo, a_hi), (b_lo, b_hi), (r_lo, r_hi) = DRIVER_RANGES
+    dfs = discount_factors(discount * np.linspace(r_lo, r_hi, steps), len(revenue), "end")
+    pv_rev, pv_cost = dfs @ revenue, dfs @ cost
+    corners = np.stack([a * pv_rev - b * pv_cost for a in (a_lo, a_hi) for b in (b_lo, b_hi)])
+    lo, hi = float(corners.min()), float(corners.max())
+    pad = max(1.0, (hi - lo) * 0.01)
+    return lo - pad, hi + pad
+
+
+# ============================================================
+# ---------- WORKER TASK ----------
+# ============================================================
+
+def _run_task(seed: np.random.SeedSequence, size: int, discount: float, edges: np.ndarray, sampler: str, chunk: int):
+    """Simulate one task in blocks of `chunk` samples; return its count, successes, Welford moments and histogram."""
+    revenue, cost = _SHARED["flows"]
+    scale = max(float(np.abs(revenue).max(initial=0.0)), float(np.abs(cost).max(initial=0.0)), 1.0)
+    rng = np.random.default_rng(seed)
+    drivers = draw_drivers(rng, size, np.float32, sampler) if sampler != "random" else None
+
+    n, mean, m2, successes = 0, 0.0, 0.0, 0
+    hist = np.zeros(len(edges) - 1, dtype=np.int64)
+    for start in range(0, size, chunk):
+        k = min(chunk, size - start)
+        d = drivers[start:start + k] if drivers is not None else draw_drivers(rng, k, np.float32)
+        npvs = npv_samples(revenue / scale, cost / scale, discount, d).astype(np.float64) * scale
+        successes += int(np.count_nonzero(npvs > 0))
+        hist += np.histogram(np.clip(npvs, edges[0], edges[-1]), bins=edges)[0]
+        n, mean, m2 = _merge_moments(n, mean, m2, k, float(npvs.mean()), float(((npvs - npvs.mean()) ** 2).sum()))
+    return n, successes, mean, m2, hist
+
+
+def default_workers() -> int:
+    """Process count for parallel_success: the machine's cores, capped at MAX_WORKERS."""
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+def _merge_moments(n_a, mean_a, m2_a, n_b, mean_b, m2_b):
+    """Chan et al. pairwise merge of (count, mean, sum of squared deviations)."""
+    n = n_a + n_b
+    if n == 0:
+        return 0, 0.0, 0.0
+    delta = mean_b - mean_a
+    return n, mean_a + delta * n_b / n, m2_a + m2_b + delta**2 * n_a * n_b / n
+
+
+def _hist_quantiles(hist: np.ndarray, edges: np.ndarray, qs) -> np.ndarray:
+    """Quantiles from a histogram by linear interpolation within bins."""
+    cdf = np.concatenate([[0], np.cumsum(hist)]) / max(1, hist.sum())
+    return np.interp(qs, cdf, edges)
+
+
+# ============================================================
+# ---------- DRIVER ----------
+# ============================================================
+
+def parallel_success(
+    revenue,
+    cost,
+    discount: float,
+    n: int,
+    seed: int = 0,
+    workers: int | None = None,
+    sampler: str = "random",
+) -> Dict[str, object]:
+    """
+    Multi-process Monte Carlo for very large sample counts.
+
+    Cashflows live in one shared-memory block mapped by every worker. Each
+    task draws from its own SeedSequence.spawn() child stream, and partial
+    moments/histograms are merged in task order. Same seed gives the same
+    answer for any worker count. Workers default to the machine's cores
+    capped at MAX_WORKERS, and each evaluates its task in blocks sized so
+    all of them together stay within PARALLEL_CHUNK_BYTES. For the
+    single-process path use simulation.success_distribution /
+    stream_success.
+    """
+    revenue = np.asarray(revenue, dtype=np.float64)
+    cost = np.asarray(cost, dtype=np.float64)
+    lo, hi = npv_bounds(revenue, cost, discount)
+    edges = np.linspace(lo, hi, HIST_BINS + 1)
+
+    sizes = [min(TASK_SIZE, n - s) for s in range(0, n, TASK_SIZE)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = max(1, min(workers or default_workers(), len(sizes)))
+    chunk = sim_chunk(len(revenue), budget=PARALLEL_CHUNK_BYTES // workers)
+
+    flows = np.stack([revenue, cost])
+    shm = shared_memory.SharedMemory(create=True, size=max(1, flows.nbytes))
+    try:
+        np.ndarray(flows.shape, dtype=np.float64, buffer=shm.buf)[:] = flows
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            initializer=_attach,
+            initargs=(shm.name, flows.shape),
+        ) as pool:
+            parts = list(pool.map(
+                _run_task, seeds, sizes, [discount] * len(sizes), [edges] * len(sizes), [sampler] * len(sizes),
+                [chunk] * len(sizes)
+            ))
+    finally:
+        shm.close()
+        shm.unlink()
+
+    total, mean, m2, successes = 0, 0.0, 0.0, 0
+    hist = np.zeros(HIST_BINS, dtype=np.int64)
+    for k, s, mu, sq, h in parts:
+        total, mean, m2 = _merge_moments(total, mean, m2, k, mu, sq)
+        successes += s
+        hist += h
+
+    p = successes / total if total else 0.0
+    p5, p50, p95 = _hist_quantiles(hist, edges, [0.05, 0.5, 0.95])
+    return {
+        "success": p * 100,
+        "success_se": float(np.sqrt(p * (1 - p) / total)) * 100 if total else float("nan"),
+        "mean": mean,
+        "std": float(np.sqrt(m2 / total)) if total else float("nan"),
+        "p5": float(p5),
+        "p50": float(p50),
+        "p95": float(p95),
+        "n": total,
+        "workers": workers,
+        "tasks": len(sizes),
+        "hist": hist,
+        "edges": edges,
+    }
@@ -0,0 +1,194 @@
+from __future__ import annotations
+import io
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict
+
+import pandas as pd
+
+from utils.result_cache import ResultCache
+
+
+# Generated PDFs by content hash, jobs still being built, and failures not yet dismissed.
+_PDF_CACHE = ResultCache(max_entries=16)
+_JOBS: Dict[str, Future] = {}
+_FAILED: Dict[str, BaseException] = {}
+_JOBS_LOCK = threading.Lock()
+_EXECUTOR = ThreadPoolExecutor(max_workers=2, thread_name_prefix="pdf-report")
+
+YEAR_COLUMNS = ["Year", "Units", "Revenue (R)", "COGS (R)", "OPEX (R)", "CAPEX (R)", "Net Cashflow (R)"]
+SERIES_COLOURS = ["#2563eb", "#16a34a", "#dc2626", "#9333ea", "#ea580c", "#0891b2"]
+
+
+# ============================================================
+# ---------- FORMATTING ----------
+# ============================================================
+
+def _fmt(value, spec: str) -> str:
+    if value is None or pd.isna(value):
+        return "—"
+    return format(value, spec)
+
+
+# ============================================================
+# ---------- VECTOR CHARTS ----------
+# ============================================================
+
+def _npv_chart(summary: pd.DataFrame):
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.graphics.charts.barcharts import VerticalBarChart
+    from reportlab.lib import colors
+
+    d = Drawing(460, 200)
+    d.add(String(0, 188, "NPV by scenario (R)", fontName="Helvetica-Bold", fontSize=10))
+    chart = VerticalBarChart()
+    chart.x, chart.y, chart.width, chart.height = 60, 20, 380, 150
+    chart.data = [[float(v) for v in summary["NPV (R)"]]]
+    chart.categoryAxis.categoryNames = [str(s) for s in summary["Scenario"]]
+    chart.valueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    chart.bars[0].fillColor = colors.HexColor(SERIES_COLOURS[0])
+    d.add(chart)
+    return d
+
+
+def _cashflow_chart(tables: Dict[str, pd.DataFrame]):
+    from reportlab.graphics.shapes import Drawing, String
+    from reportlab.graphics.charts.lineplots import LinePlot
+    from reportlab.graphics.charts.legends import Legend
+    from reportlab.lib import colors
+
+    d = Drawing(460, 220)
+    d.add(String(0, 208, "Net cashflow per year (R)", fontName="Helvetica-Bold", fontSize=10))
+    plot = LinePlot()
+    plot.x, plot.y, plot.width, plot.height = 60, 40, 380, 150
+    plot.data = [
+        list(zip(df["Year"].astype(float), df["Net Cashflow (R)"].astype(float)))
+        for df in tables.values()
+    ]
+    plot.yValueAxis.labelTextFormat = lambda v: f"{v:,.0f}"
+    plot.xValueAxis.labelTextFormat = "%d"
+    for i in range(len(plot.data)):
+        plot.lines[i].strokeColor = colors.HexColor(SERIES_COLOURS[i % len(SERIES_COLOURS)])
+        plot.lines[i].strokeWidth = 1.5
+    d.add(plot)
+
+    legend = Legend()
+    legend.x, legend.y = 60, 12
+    legend.alignment = "right"
+    legend.columnMaximum = 1
+    legend.colorNamePairs = [
+        (colors.HexColor(SERIES_COLOURS[i % len(SERIES_COLOURS)]), name)
+        for i, name in enumerate(tables)
+    ]
+    d.add(legend)
+    return d
+
+
+# ============================================================
+# ---------- REPORT ----------
+# ============================================================
+
+def build_financial_pdf(summary: pd.DataFrame, tables: Dict[str, pd.DataFrame]) -> bytes:
+    """Multi-page PDF: scenario summary + charts, then one per-year table per scenario."""
+    from reportlab.lib import colors
+    from reportlab.lib.pagesizes import A4, landscape
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.lib.units import cm
+    from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate, Spacer, Table, TableStyle
+
+    styles = getSampleStyleSheet()
+    table_style = TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1e293b")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.white),
+        ("FONTNAME", (0, 0), (-1, 0), "Helvetica-Bold"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("ALIGN", (1, 0), (-1, -1), "RIGHT"),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.white, colors.HexColor("#f1f5f9")]),
+        ("GRID", (0, 0), (-1, -1), 0.25, colors.HexColor("#cbd5e1")),
+    ])
+
+    story = [
+        Paragraph("Financial Projection Summary", styles["Title"]),
+        Paragraph(datetime.now().strftime("Generated %Y-%m-%d %H:%M"), styles["Normal"]),
+        Spacer(1, 0.5*cm),
+    ]
+
+    rows = [list(summary.columns)]
+    for r in summary.itertuples(index=False):
+        rows.append([
+            r[0], _fmt(r[1], ",.0f"), _fmt(r[2], ".1f"), _fmt(r[3], ".1f"), _fmt(r[4], ".2f"), _fmt(r[5], ".1f")
+        ])
+    story.append(Table(rows, style=table_style, hAlign="LEFT"))
+    if summary["IRR (%)"].isna().any():
+        story.append(Paragraph("IRR “—”: the cashflows change sign more than once and have several IRRs.",
+                               styles["Italic"]))
+    story += [Spacer(1, 0.8*cm), _npv_chart(summary)]
+    if tables:
+        story += [Spacer(1, 0.5*cm), _cashflow_chart(tables)]
+
+    for name, df in tables.items():
+        cols = [c for c in YEAR_COLUMNS if c in df.columns]
+        rows = [cols]
+        for r in df[cols].itertuples(index=False):
+            rows.append([_fmt(v, "d" if c == "Year" else ",.0f") for c, v in zip(cols, r)])
+        story += [
+            PageBreak(),
+            Paragraph(f"{name} scenario — per-year projection", styles["Heading2"]),
+            Spacer(1, 0.3*cm),
+            Table(rows, style=table_style, repeatRows=1, hAlign="LEFT"),
+        ]
+
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=landscape(A4), leftMargin=1.5*cm, rightMargin=1.5*cm,
+                            topMargin=1.5*cm, bottomMargin=1.5*cm, title="Financial Projection Summary")
+    doc.build(story)
+    return buf.getvalue()
+
+
+# ============================================================
+# ---------- BACKGROUND JOBS ----------
+# ============================================================
+
+def request_pdf(key: str, summary: pd.DataFrame, tables: Dict[str, pd.DataFrame]) -> None:
+    """Start building the PDF for `key` in a worker thread unless it is cached or in flight (clears a failure)."""
+    if _PDF_CACHE.get(key) is not None:
+        return
+    with _JOBS_LOCK:
+        _FAILED.pop(key, None)
+        if key in _JOBS:
+            return
+        _JOBS[key] = _EXECUTOR.submit(build_financial_pdf, summary.copy(), {k: v.copy() for k, v in tables.items()})
+
+
+def pdf_status(key: str):
+    """
+    Return ("ready", bytes), ("running", None), ("failed", error) or ("missing", None).
+
+    A failure keeps being reported until dismiss_pdf() or a new request_pdf() for the key.
+    """
+    pdf = _PDF_CACHE.get(key)
+    if pdf is not None:
+        return "ready", pdf
+    with _JOBS_LOCK:
+        if key in _FAILED:
+            return "failed", _FAILED[key]
+        job = _JOBS.get(key)
+        if job is None:
+            return "missing", None
+        if not job.done():
+            return "running", None
+        del _JOBS[key]
+        err = job.exception()
+        if err is not None:
+            _FAILED[key] = err
+            return "failed", err
+    pdf = job.result()
+    _PDF_CACHE.put(key, pdf)
+    return "ready", pdf
+
+
+def dismiss_pdf(key: str) -> None:
+    """Forget a failed job so the page offers the export button again."""
+    with _JOBS_LOCK:
+        _FAILED.pop(key, None)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.projection import MONTHS, period_rate, seasonality
+
+
+PRODUCT_COLUMNS = ["Product", "Units (Year 1)", "Units Growth", "Price (R/u)", "Price Growth", "COGS (R/u)", "COGS Growth"]
+
+
+# ============================================================
+# ---------- CSV INPUT ----------
+# ============================================================
+
+def read_products(source) -> pd.DataFrame:
+    """Product lines from a CSV file; ValueError naming the problem when it can't be used."""
+    try:
+        df = pd.read_csv(source)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Could not read the CSV: {e}") from None
+    df.columns = df.columns.astype(str).str.strip()
+    missing = [c for c in PRODUCT_COLUMNS if c not in df.columns]
+    if missing:
+        raise ValueError("Missing column(s): " + ", ".join(missing))
+
+    df = df[PRODUCT_COLUMNS].copy()
+    numeric = PRODUCT_COLUMNS[1:]
+    values = df[numeric].apply(pd.to_numeric, errors="coerce")
+    bad = [c for c in numeric if (values[c].isna() & df[c].notna()).any()]
+    if bad:
+        raise ValueError("Non-numeric values in: " + ", ".join(bad))
+    df[numeric] = values
+    df["Product"] = df["Product"].astype(str)
+    return df
+
+
+# ============================================================
+# ---------- PORTFOLIO ENGINE ----------
+# ============================================================
+
+def _curve(start, growth, periods: int, periods_per_year: int) -> np.ndarray:
+    """(products x periods) compounding curves start * (1 + g_period)^t."""
+    g = period_rate(growth, periods_per_year)[:, None]
+    t = np.arange(periods)[None, :]
+    return np.asarray(start, dtype=float)[:, None] * (1 + g) ** t
+
+
+def build_portfolio(
+    products: pd.DataFrame,
+    years: int,
+    opex: float,
+    capex_y1: float,
+    periods_per_year: int = 1,
+    profile: str | Sequence[float] = "Flat",
+) -> Dict[str, np.ndarray]:
+    """
+    N product lines x T periods as 2-D arrays with shared OPEX/CAPEX.
+
+    `products` holds one row per product line (see PRODUCT_COLUMNS). Year-1
+    units are spread across the first year's periods; price and COGS
+    compound per period from their Year-1 values.
+    """
+    periods = years * periods_per_year
+    units_y1 = products["Units (Year 1)"].to_numpy(dtype=float)
+    units = _curve(np.ones_like(units_y1), products["Units Growth"].to_numpy(dtype=float), periods, periods_per_year)
+    if periods_per_year == MONTHS:
+        units *= np.tile(seasonality(profile), years)[None, :]
+    if periods:
+        units *= (units_y1 / units[:, :periods_per_year].sum(axis=1))[:, None]   # Year 1 totals match input
+    price = _curve(products["Price (R/u)"].to_numpy(dtype=float),
+                   products["Price Growth"].to_numpy(dtype=float), periods, periods_per_year)
+    cogs = _curve(products["COGS (R/u)"].to_numpy(dtype=float),
+                  products["COGS Growth"].to_numpy(dtype=float), periods, periods_per_year)
+
+    opex_p = np.full(periods, opex / periods_per_year)
+    capex_p = np.zeros(periods)
+    if periods:
+        capex_p[0] = capex_y1
+
+    revenue = units * price
+    cogs_total = units * cogs
+    # Contribution of every product collapses to the portfolio line in one reduction.
+    margin = np.einsum("nt,nt->t", units, price - cogs)
+    return {
+        "names": products["Product"].astype(str).to_numpy(),
+        "units": units,
+        "revenue": revenue,
+        "cogs": cogs_total,
+        "opex": opex_p,
+        "capex": capex_p,
+        "net": margin - opex_p - capex_p,
+    }
+
+
+# ============================================================
+# ---------- TABLE VIEWS ----------
+# ============================================================
+
+def _to_years(arr: np.ndarray, periods_per_year: int) -> np.ndarray:
+    return arr.reshape(*arr.shape[:-1], -1, periods_per_year).sum(axis=-1)
+
+
+def portfolio_frame(portfolio: Dict[str, np.ndarray], periods_per_year: int = 1) -> pd.DataFrame:
+    """Annual portfolio totals in the scenario-table column layout."""
+    revenue = _to_years(portfolio["revenue"].sum(axis=0), periods_per_year)
+    cogs = _to_years(portfolio["cogs"].sum(axis=0), periods_per_year)
+    opex = _to_years(portfolio["opex"], periods_per_year)
+    capex = _to_years(portfolio["capex"], periods_per_year)
+    return pd.DataFrame({
+        "Year": np.arange(1, len(revenue) + 1),
+        "Units": _to_years(portfolio["units"].sum(axis=0), periods_per_year),
+        "Revenue (R)": revenue,
+        "COGS (R)": cogs,
+        "OPEX (R)": opex,
+        "CAPEX (R)": capex,
+        "Net Cashflow (R)": _to_years(portfolio["net"], periods_per_year),
+    })
+
+
+def product_frame(portfolio: Dict[str, np.ndarray], i: int, periods_per_year: int = 1) -> pd.DataFrame:
+    """Annual table for a single product line (materialised only for the product in view)."""
+    units = _to_years(portfolio["units"][i], periods_per_year)
+    revenue = _to_years(portfolio["revenue"][i], periods_per_year)
+    cogs = _to_years(portfolio["cogs"][i], periods_per_year)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg_price = np.where(units > 0, revenue / units, 0.0)
+        avg_cogs = np.where(units > 0, cogs / units, 0.0)
+    return pd.DataFrame({
+        "Year": np.arange(1, len(units) + 1),
+        "Units": units,
+        "Price (R/u)": avg_price,
+        "COGS (R/u)": avg_cogs,
+        "Revenue (R)": revenue,
+        "COGS (R)": cogs,
+        "Gross Margin (R)": revenue - cogs,
+    })
@@ -0,0 +1,117 @@
+from __future__ import annotations
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+
+MONTHS = 12
+
+# Relative monthly demand (Jan..Dec); normalised to mean 1 when applied.
+SEASONALITY_PROFILES: Dict[str, List[float]] = {
+    "Flat": [1.0] * 12,
+    "Summer peak (Southern Hemisphere)": [1.3, 1.25, 1.1, 0.95, 0.85, 0.75, 0.75, 0.8, 0.9, 1.0, 1.1, 1.25],
+    "Winter peak (Southern Hemisphere)": [0.75, 0.8, 0.9, 1.05, 1.2, 1.3, 1.3, 1.2, 1.05, 0.9, 0.8, 0.75],
+    "Year-end retail": [0.8, 0.8, 0.9, 0.9, 0.95, 0.95, 0.95, 1.0, 1.0, 1.1, 1.25, 1.4],
+}
+
+LINE_ITEMS = ["units", "revenue", "cogs", "opex", "capex", "net"]
+
+
+# ============================================================
+# ---------- RATES & PROFILES ----------
+# ============================================================
+
+def period_rate(annual_rate, periods_per_year: int = 1):
+    """Compound-equivalent rate per period."""
+    return (1 + np.asarray(annual_rate, dtype=float)) ** (1.0 / periods_per_year) - 1
+
+
+def seasonality(profile: str | Sequence[float]) -> np.ndarray:
+    """12-month seasonality weights with mean 1."""
+    w = np.asarray(SEASONALITY_PROFILES[profile] if isinstance(profile, str) else profile, dtype=float)
+    return w / w.mean()
+
+
+def unit_shares(growth: float, profile: str | Sequence[float] = "Flat") -> np.ndarray:
+    """Share of a year's units sold in each month (same for every year under constant growth)."""
+    g_m = period_rate(growth, MONTHS)
+    w = (1 + g_m) ** np.arange(MONTHS) * seasonality(profile)
+    return w / w.sum()
+
+
+# ============================================================
+# ---------- MONTHLY ENGINE ----------
+# ============================================================
+
+def build_monthly(
+    units_y1: float,
+    growth: float,
+    price: float,
+    cogs: float,
+    opex: float,
+    capex_y1: float,
+    years: int,
+    profile: str | Sequence[float] = "Flat",
+) -> Dict[str, np.ndarray]:
+    """Monthly line items over `years` built with array ops (growth via cumulative product)."""
+    n = years * MONTHS
+    g_m = period_rate(growth, MONTHS)
+    growth_path = np.cumprod(np.full(n, 1 + g_m)) / (1 + g_m)          # (1+g_m)^t, t = 0..n-1
+    season = np.tile(seasonality(profile), years)
+    units = growth_path * season
+    units *= units_y1 / units[:MONTHS].sum()                          # Year 1 total matches input
+
+    capex = np.zeros(n)
+    if n:
+        capex[0] = capex_y1
+    revenue = units * price
+    cogs_total = units * cogs
+    opex_m = np.full(n, opex / MONTHS)
+    return {
+        "units": units,
+        "revenue": revenue,
+        "cogs": cogs_total,
+        "opex": opex_m,
+        "capex": capex,
+        "net": revenue - cogs_total - opex_m - capex,
+    }
+
+
+def to_annual(monthly: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Sum every monthly line item into annual totals with one reshape per item."""
+    return {k: v.reshape(-1, MONTHS).sum(axis=1) for k, v in monthly.items()}
+
+
+def expand_annual(
+    units,
+    price,
+    cogs,
+    opex,
+    capex,
+    shares: np.ndarray,
+) -> Dict[str, np.ndarray]:
+    """
+    Spread an (edited) annual table back to months.
+
+    Units follow `shares` within each year, OPEX is spread evenly and each
+    year's CAPEX lands in its first month.
+    """
+    years = len(units)
+    units_m = (np.asarray(units, dtype=float)[:, None] * shares[None, :]).ravel()
+    price_m = np.repeat(np.asarray(price, dtype=float), MONTHS)
+    cogs_m = np.repeat(np.asarray(cogs, dtype=float), MONTHS)
+    opex_m = np.repeat(np.asarray(opex, dtype=float) / MONTHS, MONTHS)
+    capex_m = np.zeros((years, MONTHS))
+    capex_m[:, 0] = capex
+    capex_m = capex_m.ravel()
+
+    revenue = units_m * price_m
+    cogs_total = units_m * cogs_m
+    return {
+        "units": units_m,
+        "revenue": revenue,
+        "cogs": cogs_total,
+        "opex": opex_m,
+        "capex": capex_m,
+        "net": revenue - cogs_total - opex_m - capex_m,
+    }
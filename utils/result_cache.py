@@ -0,0 +1,139 @@
+from __future__ import annotations
+import hashlib
+import itertools
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Any, Dict, Hashable
+
+import numpy as np
+import pandas as pd
+
+
+# Memory budget shared by every ResultCache in the process (all sessions).
+GLOBAL_MAX_BYTES = 64 * 1024 * 1024
+
+
+# ============================================================
+# ---------- CONTENT KEYS ----------
+# ============================================================
+
+def frame_key(df: pd.DataFrame, *params: Any) -> str:
+    """Hash a DataFrame's column arrays plus any extra parameters."""
+    h = hashlib.blake2b(digest_size=16)
+    for col in df.columns:
+        h.update(str(col).encode())
+        arr = np.ascontiguousarray(df[col].to_numpy())
+        if arr.dtype == object:
+            h.update(repr(arr.tolist()).encode())
+        else:
+            h.update(arr.dtype.str.encode())
+            h.update(arr.tobytes())
+    h.update(repr(params).encode())
+    return h.hexdigest()
+
+
+def _sizeof(value: Any) -> int:
+    """Rough in-memory size of a cached result."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_sizeof(k) + _sizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(_sizeof(v) for v in value)
+    return sys.getsizeof(value)
+
+
+# ============================================================
+# ---------- LRU CACHE ----------
+# ============================================================
+
+class ResultCache:
+    """
+    Per-session LRU cache of computed results.
+
+    Each instance holds at most `max_entries` items; all instances together
+    stay under GLOBAL_MAX_BYTES, evicting the least recently used entry
+    across every live cache when the budget is exceeded.
+    """
+
+    _lock = threading.RLock()
+    _instances: "weakref.WeakSet[ResultCache]" = weakref.WeakSet()
+    _tick = itertools.count()
+    _total_bytes = 0
+
+    def __init__(self, max_entries: int = 32):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, list]" = OrderedDict()   # key -> [value, size, tick]
+        with ResultCache._lock:
+            ResultCache._instances.add(self)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __del__(self):
+        with ResultCache._lock:
+            ResultCache._total_bytes -= sum(e[1] for e in self._entries.values())
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with ResultCache._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            entry[2] = next(ResultCache._tick)
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        size = _sizeof(value)
+        with ResultCache._lock:
+            if key in self._entries:
+                self._evict(self, key)
+            self._entries[key] = [value, size, next(ResultCache._tick)]
+            ResultCache._total_bytes += size
+
+            while len(self._entries) > self.max_entries:
+                self._evict(self, next(iter(self._entries)))
+            while ResultCache._total_bytes > GLOBAL_MAX_BYTES and self._evict_global_oldest():
+                pass
+
+    def clear(self) -> None:
+        with ResultCache._lock:
+            for key in list(self._entries):
+                self._evict(self, key)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self._entries),
+            "global_bytes": ResultCache._total_bytes,
+        }
+
+    @staticmethod
+    def _evict(cache: "ResultCache", key: Hashable) -> None:
+        _, size, _ = cache._entries.pop(key)
+        ResultCache._total_bytes -= size
+
+    @classmethod
+    def _evict_global_oldest(cls) -> bool:
+        oldest = None
+        for cache in list(cls._instances):
+            if cache._entries:
+                key = next(iter(cache._entries))
+                tick = cache._entries[key][2]
+                if oldest is None or tick < oldest[0]:
+                    oldest = (tick, cache, key)
+        if oldest is None:
+            return False
+        cls._evict(oldest[1], oldest[2])
+        return True
@@ -0,0 +1,141 @@
+from __future__ import annotations
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from utils.data_loader import load_trl_stages
+
+
+STAGE_COLUMNS = ["From TRL", "To TRL", "Stage", "Success probability", "Duration (months)", "Cost (R)"]
+_JSON_FIELDS = ["from_trl", "to_trl", "name", "probability", "duration_months", "cost"]
+
+# Upper bound on (samples x projects x stages) outcome draws per chunk.
+SAMPLE_CHUNK = 20_000_000
+
+
+# ============================================================
+# ---------- STAGE DATA ----------
+# ============================================================
+
+def default_stages() -> pd.DataFrame:
+    """Stage-transition assumptions from data/trl_stages.json as an editable table."""
+    rows = load_trl_stages()["stages"]
+    return pd.DataFrame([[r[f] for f in _JSON_FIELDS] for r in rows], columns=STAGE_COLUMNS)
+
+
+def stages_to_json(stages: pd.DataFrame) -> Dict:
+    """Inverse of default_stages(), for saving edited assumptions in the data file format."""
+    rows = stages[STAGE_COLUMNS].itertuples(index=False)
+    return {"stages": [{f: v.item() if hasattr(v, "item") else v for f, v in zip(_JSON_FIELDS, r)} for r in rows]}
+
+
+def _schedule(stages: pd.DataFrame, trl, discount: float) -> Dict[str, np.ndarray]:
+    """
+    Per-project (projects x stages) schedule for projects at TRLs `trl`.
+
+    A stage remains when its From TRL is at or above the project's TRL.
+    Start months are the summed durations of earlier remaining stages;
+    the launch month is the total of all of them.
+    """
+    s = stages.sort_values("From TRL", kind="stable")
+    frm = s["From TRL"].to_numpy(dtype=float)
+    p = np.clip(s["Success probability"].to_numpy(dtype=float), 0.0, 1.0)
+    dur = s["Duration (months)"].to_numpy(dtype=float)
+    cost = s["Cost (R)"].to_numpy(dtype=float)
+
+    trl = np.atleast_1d(np.asarray(trl, dtype=float))
+    remaining = frm[None, :] >= trl[:, None]                        # projects x stages
+    months = np.where(remaining, dur, 0.0)
+    start = np.cumsum(months, axis=1) - months
+    launch = months.sum(axis=1)
+    p_eff = np.where(remaining, p, 1.0)
+    # P(stage is started): product of the earlier stages' probabilities (exclusive cumprod, safe for p = 0).
+    reach = np.concatenate([np.ones((len(trl), 1)), np.cumprod(p_eff[:, :-1], axis=1)], axis=1)
+    return {
+        "names": s["Stage"].astype(str).to_numpy(),
+        "remaining": remaining,
+        "p": p_eff,
+        "start": start,
+        "reach": reach,
+        "cost_pv": np.where(remaining, cost, 0.0) * (1 + discount) ** (-start / 12),
+        "launch_df": (1 + discount) ** (-launch / 12),
+        "launch": launch,
+        "p_success": p_eff.prod(axis=1),
+    }
+
+
+# ============================================================
+# ---------- EXPECTED VALUE ----------
+# ============================================================
+
+def expected_rnpv(stages: pd.DataFrame, trl, commercial_npv, discount: float) -> Dict[str, np.ndarray]:
+    """
+    Risk-adjusted NPV of projects at `trl` whose launch-date NPV is `commercial_npv`.
+
+    Each remaining stage's cost is weighted by the probability of starting
+    it and discounted from its start month. The commercial NPV is weighted
+    by the probability of clearing every stage and discounted from launch.
+    """
+    sch = _schedule(stages, trl, discount)
+    commercial_npv = np.broadcast_to(np.asarray(commercial_npv, dtype=float), sch["launch"].shape)
+    risked_cost = (sch["reach"] * sch["cost_pv"]).sum(axis=1)
+    return {
+        "rnpv": sch["p_success"] * sch["launch_df"] * commercial_npv - risked_cost,
+        "p_success": sch["p_success"],
+        "risked_cost": risked_cost,
+        "launch_months": sch["launch"],
+    }
+
+
+def stage_breakdown(stages: pd.DataFrame, trl: int, discount: float) -> pd.DataFrame:
+    """Remaining stages for one project: odds of starting, timing and risked cost."""
+    sch = _schedule(stages, trl, discount)
+    keep = sch["remaining"][0]
+    return pd.DataFrame({
+        "Stage": sch["names"][keep],
+        "P(start) (%)": sch["reach"][0, keep] * 100,
+        "P(pass) (%)": sch["p"][0, keep] * 100,
+        "Start month": sch["start"][0, keep],
+        "Cost PV (R)": sch["cost_pv"][0, keep],
+        "Risked cost PV (R)": (sch["reach"] * sch["cost_pv"])[0, keep],
+    })
+
+
+# ============================================================
+# ---------- OUTCOME SAMPLING ----------
+# ============================================================
+
+def sample_rnpv(
+    stages: pd.DataFrame,
+    trl,
+    commercial_npv,
+    discount: float,
+    n: int,
+    rng: np.random.Generator | None = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Simulated portfolio value over `n` draws of every project's stage outcomes.
+
+    One uniform per (sample, project, stage) decides pass/fail; a logical
+    AND accumulated along the stage axis stops spending at the first
+    failure. Returns per-sample portfolio totals and projects launched.
+    """
+    rng = rng or np.random.default_rng()
+    sch = _schedule(stages, trl, discount)
+    projects, k = sch["p"].shape
+    commercial_pv = np.broadcast_to(np.asarray(commercial_npv, dtype=float), (projects,)) * sch["launch_df"]
+
+    total = np.empty(n)
+    launched = np.empty(n, dtype=np.int64)
+    step = max(1, SAMPLE_CHUNK // max(1, projects * k))
+    for start in range(0, n, step):
+        size = min(step, n - start)
+        passed = rng.random((size, projects, k), dtype=np.float32) < sch["p"].astype(np.float32)
+        cleared = np.logical_and.accumulate(passed, axis=2)
+        started = np.concatenate([np.ones((size, projects, 1), dtype=bool), cleared[..., :-1]], axis=2)
+        success = cleared[..., -1]
+        sl = slice(start, start + size)
+        total[sl] = success @ commercial_pv - np.einsum("spk,pk->s", started, sch["cost_pv"])
+        launched[sl] = success.sum(axis=1)
+    return {"total": total, "launched": launched}
@@ -0,0 +1,111 @@
+from __future__ import annotations
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.finance import IRR_MULTIPLE, irr_batch, npv, payback_period
+from utils.projection import MONTHS, period_rate
+
+
+# Editable inputs of a scenario table, in tensor order along the last axis.
+LINE_ITEMS = ["Units", "Price (R/u)", "COGS (R/u)", "OPEX (R)", "CAPEX (R)"]
+# A named scenario is a % change applied to each line item of the baseline table.
+OVERRIDE_COLUMNS = ["Scenario", "Units (%)", "Price (%)", "COGS (%)", "OPEX (%)", "CAPEX (%)"]
+SUMMARY_COLUMNS = ["Scenario", "NPV (R)", "IRR (%)", "Payback (yrs)", "Profitability Index", "Success Prob. (%)"]
+
+
+def default_overrides() -> pd.DataFrame:
+    """Starter rows for the user-defined scenario set."""
+    return pd.DataFrame(
+        [["Volume shortfall", -25.0, 0.0, 0.0, 0.0, 0.0],
+         ["Cost overrun", 0.0, 0.0, 10.0, 15.0, 30.0]],
+        columns=OVERRIDE_COLUMNS,
+    )
+
+
+# ============================================================
+# ---------- STACKING ----------
+# ============================================================
+
+def stack_tables(tables: Sequence[pd.DataFrame]) -> np.ndarray:
+    """(scenarios x years x line items) tensor from full scenario tables."""
+    return np.stack([t[LINE_ITEMS].to_numpy(dtype=float) for t in tables])
+
+
+def apply_overrides(base: np.ndarray, overrides: pd.DataFrame) -> np.ndarray:
+    """Broadcast a (years x line items) baseline against every override row."""
+    pct = overrides[OVERRIDE_COLUMNS[1:]].fillna(0.0).to_numpy(dtype=float)
+    return base[None, :, :] * (1 + pct / 100)[:, None, :]
+
+
+def scenario_names(overrides: pd.DataFrame) -> list:
+    """Override names, with blanks filled in as 'Scenario i'."""
+    names = overrides["Scenario"].fillna("").astype(str).str.strip()
+    return [n or f"Scenario {i + 1}" for i, n in enumerate(names)]
+
+
+def scenario_flows(stack: np.ndarray, periods_per_year: int = 1, shares: np.ndarray | None = None) -> Dict[str, np.ndarray]:
+    """
+    Per-period line items for every scenario, each (scenarios x periods).
+
+    Monthly mode spreads units by `shares` (see projection.unit_shares),
+    OPEX evenly and each year's CAPEX into its first month, like
+    projection.expand_annual but for the whole stack.
+    """
+    units, price, cogs, opex, capex = np.moveaxis(stack, -1, 0)          # each scenarios x years
+    if periods_per_year == MONTHS:
+        s, y = units.shape
+        units = (units[..., None] * shares).reshape(s, -1)
+        price, cogs = np.repeat(price, MONTHS, axis=1), np.repeat(cogs, MONTHS, axis=1)
+        opex = np.repeat(opex / MONTHS, MONTHS, axis=1)
+        capex_m = np.zeros((s, y, MONTHS))
+        capex_m[..., 0] = capex
+        capex = capex_m.reshape(s, -1)
+    revenue = units * price
+    cogs_total = units * cogs
+    return {
+        "revenue": revenue,
+        "cogs": cogs_total,
+        "opex": opex,
+        "capex": capex,
+        "net": revenue - cogs_total - opex - capex,
+    }
+
+
+# ============================================================
+# ---------- METRICS ----------
+# ============================================================
+
+def scenario_metrics(flows: Dict[str, np.ndarray], discount: float, periods_per_year: int = 1) -> Dict[str, np.ndarray]:
+    """
+    NPV, annualised IRR, payback (years) and PI for every scenario, same conventions as the tabs.
+
+    IRR is NaN where the cashflows have several IRRs (shown as "—").
+    """
+    net, capex = flows["net"], flows["capex"]
+    rate = period_rate(discount, periods_per_year)
+    npv_val = npv(rate, net, timing="end")
+    # First-period CAPEX moves to t=0 for IRR and payback only.
+    irr_flows = np.concatenate([-capex[:, :1], net[:, 1:]], axis=1)
+    rates, status = irr_batch(irr_flows, guess=rate)
+    pb = payback_period(irr_flows, timing="t0")
+    annual = np.where(np.isfinite(rates), (1 + rates) ** periods_per_year - 1, 0.0)
+    return {
+        "NPV": npv_val,
+        "IRR": np.where(status == IRR_MULTIPLE, np.nan, annual),
+        "Payback": np.where(np.isfinite(pb), pb / periods_per_year, np.nan),
+        "PI": npv_val / np.maximum(1, capex.sum(axis=1)),
+    }
+
+
+def summary_frame(names: Sequence[str], mets: Dict[str, np.ndarray], success: np.ndarray) -> pd.DataFrame:
+    """Scenario summary table built column-wise from the stacked results."""
+    return pd.DataFrame({
+        "Scenario": list(names),
+        "NPV (R)": mets["NPV"],
+        "IRR (%)": mets["IRR"] * 100,
+        "Payback (yrs)": mets["Payback"],
+        "Profitability Index": mets["PI"],
+        "Success Prob. (%)": success,
+    }, columns=SUMMARY_COLUMNS)
@@ -0,0 +1,334 @@
+from __future__ import annotations
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Sequence
+
+import numpy as np
+import pandas as pd
+
+from utils.finance import IRR_GRID, discount_factors, irr_batch
+from utils.projection import MONTHS, period_rate, seasonality
+
+
+# Model drivers taken from the sidebar assumptions, in display order.
+DRIVERS = ["units", "growth", "price", "cogs", "opex", "capex", "discount"]
+DRIVER_LABELS = {
+    "units": "Units (Year 1)",
+    "growth": "Units growth",
+    "price": "Price per unit",
+    "cogs": "COGS per unit",
+    "opex": "Fixed OPEX",
+    "capex": "CAPEX (Year 1)",
+    "discount": "Discount rate",
+}
+
+# Working memory for pointwise_npv chunks, shared by all worker threads.
+POINTWISE_BUDGET = 256 * 1024**2
+# Live (sets x periods) float64 arrays per chunk: the unit path with its temporaries and the discount vectors.
+POINTWISE_ARRAYS = 6
+MAX_WORKERS = 4
+# Working memory for one grid_irr row block.
+IRR_BLOCK_BUDGET = 64 * 1024**2
+# Live float64 arrays per grid cell: (periods) cashflow copies and Newton temporaries, (IRR grid) bracketing arrays.
+IRR_PERIOD_ARRAYS = 8
+IRR_GRID_ARRAYS = 5
+
+
+# ============================================================
+# ---------- BATCHED DRIVER MODEL ----------
+# ============================================================
+
+def batch_flows(
+    params: Dict[str, np.ndarray],
+    years: int,
+    periods_per_year: int = 1,
+    profile: str | Sequence[float] = "Flat",
+) -> np.ndarray:
+    """
+    Net cashflows for any stack of driver sets, shape params-shape + (periods,).
+
+    Every entry of `params` (except "discount") broadcasts against the
+    others, so a 1-D stack of K driver sets gives (K x T) and a 2-D grid
+    gives (A x B x T). Mirrors make_units/build_df (and build_monthly in
+    monthly mode) without building any DataFrames.
+    """
+    p = {k: np.asarray(params[k], dtype=float) for k in ("units", "growth", "price", "cogs", "opex", "capex")}
+    shape = np.broadcast_shapes(*(v.shape for v in p.values()))
+    periods = years * periods_per_year
+
+    g = period_rate(p["growth"], periods_per_year)[..., None]
+    path = (1 + g) ** np.arange(periods)
+    if periods_per_year == MONTHS:
+        path = path * np.tile(seasonality(profile), years)
+    year1 = path[..., :periods_per_year].sum(axis=-1, keepdims=True)
+    units = p["units"][..., None] * path / year1
+
+    flows = units * (p["price"] - p["cogs"])[..., None] - (p["opex"] / periods_per_year)[..., None]
+    flows = np.broadcast_to(flows, shape + (periods,)).copy()
+    flows[..., 0] -= np.broadcast_to(p["capex"], shape)
+    return flows
+
+
+def discount_vector(rate, periods: int, periods_per_year: int = 1) -> np.ndarray:
+    """1 / (1 + r_period)^t for t = 1..periods (end-of-period convention)."""
+    return discount_factors(period_rate(rate, periods_per_year), periods, "end")
+
+
+def _unit_path(growth: np.ndarray, years: int, periods_per_year: int, profile) -> np.ndarray:
+    """(len(growth) x periods) unit paths, each normalised to Year-1 total = 1."""
+    g = period_rate(growth, periods_per_year)[:, None]
+    path = (1 + g) ** np.arange(years * periods_per_year)
+    if periods_per_year == MONTHS:
+        path = path * np.tile(seasonality(profile), years)
+    return path / path[:, :periods_per_year].sum(axis=1, keepdims=True)
+
+
+def batch_npv(params: Dict[str, np.ndarray], years: int, periods_per_year: int = 1, profile="Flat") -> np.ndarray:
+    """
+    NPV of every stacked driver set (any broadcastable shape).
+
+    NPV is linear in units, price, COGS, OPEX and CAPEX, so only the unit
+    path's present value depends on (growth, discount). That factor comes
+    from one (unique growths x periods) @ (periods x unique rates) product;
+    no per-set cashflow arrays are built.
+    """
+    p = {k: np.asarray(params[k], dtype=float) for k in DRIVERS}
+    periods = years * periods_per_year
+
+    g_vals, g_idx = np.unique(p["growth"], return_inverse=True)
+    r_vals, r_idx = np.unique(p["discount"], return_inverse=True)
+    dfs = discount_vector(r_vals, periods, periods_per_year)           # rates x periods
+    unit_pv = _unit_path(g_vals, years, periods_per_year, profile) @ dfs.T
+    annuity = dfs.sum(axis=1) / periods_per_year
+    first = dfs[:, 0]
+
+    g_idx = g_idx.reshape(p["growth"].shape)
+    r_idx = r_idx.reshape(p["discount"].shape)
+    return (
+        p["units"] * (p["price"] - p["cogs"]) * unit_pv[g_idx, r_idx]
+        - p["opex"] * annuity[r_idx]
+        - p["capex"] * first[r_idx]
+    )
+
+
+def default_workers() -> int:
+    """Thread count for pointwise_npv: the machine's cores, capped at MAX_WORKERS."""
+    return max(1, min(MAX_WORKERS, os.cpu_count() or 1))
+
+
+def pointwise_chunk(periods: int, workers: int = 1) -> int:
+    """Driver sets per chunk so that `workers` concurrent chunks stay within POINTWISE_BUDGET."""
+    return max(1, POINTWISE_BUDGET // (max(1, workers) * periods * 8 * POINTWISE_ARRAYS))
+
+
+def pointwise_npv(
+    params: Dict[str, np.ndarray],
+    years: int,
+    periods_per_year: int = 1,
+    profile="Flat",
+    chunk: int | None = None,
+    workers: int = 1,
+) -> np.ndarray:
+    """
+    NPV of a 1-D stack of driver sets where growth and discount vary per set.
+
+    batch_npv factorises over unique (growth, rate) pairs, which stops
+    paying off once every set has its own values (random samples). Here
+    each set's unit path is paired with its own discount vector, in
+    chunks of `chunk` sets (by default sized from POINTWISE_BUDGET, the
+    horizon and the worker count), optionally spread over `workers`
+    threads (NumPy releases the GIL in these kernels).
+    """
+    p = {k: np.broadcast_to(np.asarray(params[k], dtype=float), np.shape(params["units"])).ravel()
+         for k in DRIVERS}
+    periods = years * periods_per_year
+    chunk = chunk or pointwise_chunk(periods, workers)
+    out = np.empty(p["units"].size)
+
+    def run(start: int):
+        sl = slice(start, start + chunk)
+        dfs = discount_vector(p["discount"][sl], periods, periods_per_year)
+        unit_pv = np.einsum("nt,nt->n", _unit_path(p["growth"][sl], years, periods_per_year, profile), dfs)
+        out[sl] = (p["units"][sl] * (p["price"][sl] - p["cogs"][sl]) * unit_pv
+                   - p["opex"][sl] * dfs.sum(axis=1) / periods_per_year
+                   - p["capex"][sl] * dfs[:, 0])
+
+    starts = range(0, out.size, chunk)
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(run, starts))
+    else:
+        for start in starts:
+            run(start)
+    return out.reshape(np.shape(params["units"]))
+
+
+# ============================================================
+# ---------- TORNADO ----------
+# ============================================================
+
+def tornado(
+    base: Dict[str, float],
+    years: int,
+    periods_per_year: int = 1,
+    profile="Flat",
+    levels: Sequence[float] = (0.10,),
+    drivers: Sequence[str] = DRIVERS,
+) -> pd.DataFrame:
+    """
+    One-at-a-time sensitivity for every driver at every +/- level.
+
+    All (drivers x levels x 2) perturbed driver sets plus the base case are
+    stacked into one batch and evaluated in a single pass. Returns one row
+    per driver and level, ranked by NPV swing.
+    """
+    levels = np.asarray(levels, dtype=float)
+    k = len(drivers) * len(levels) * 2
+    stack = {d: np.full(k + 1, float(base[d])) for d in DRIVERS}
+    row = 1
+    for d in drivers:
+        for lvl in levels:
+            stack[d][row] *= 1 - lvl
+            stack[d][row + 1] *= 1 + lvl
+            row += 2
+
+    npvs = batch_npv(stack, years, periods_per_year, profile)
+    base_npv = npvs[0]
+    low, high = npvs[1::2], npvs[2::2]
+    out = pd.DataFrame({
+        "Driver": np.repeat([DRIVER_LABELS.get(d, d) for d in drivers], len(levels)),
+        "Change (±%)": np.tile(levels * 100, len(drivers)),
+        "NPV at -": low,
+        "NPV at +": high,
+    })
+    out["Swing (R)"] = (out["NPV at +"] - out["NPV at -"]).abs()
+    out.attrs["base_npv"] = float(base_npv)
+    return out.sort_values("Swing (R)", ascending=False, kind="stable").reset_index(drop=True)
+
+
+# ============================================================
+# ---------- TWO-WAY GRID ----------
+# ============================================================
+
+def driver_range(base_value: float, span: float, n: int) -> np.ndarray:
+    """n values across base * (1 -/+ span); rates at zero get 0..span instead."""
+    if base_value == 0:
+        return np.linspace(0.0, span, n)
+    return np.linspace(base_value * (1 - span), base_value * (1 + span), n)
+
+
+def _grid_params(base, x_driver, x_values, y_driver, y_values) -> Dict[str, np.ndarray]:
+    params = {d: np.asarray(float(base[d])) for d in DRIVERS}
+    params[x_driver] = np.asarray(x_values, dtype=float)[None, :]
+    params[y_driver] = np.asarray(y_values, dtype=float)[:, None]
+    return params
+
+
+def grid_npv(base, x_driver, x_values, y_driver, y_values, years, periods_per_year=1, profile="Flat") -> np.ndarray:
+    """(len(y_values) x len(x_values)) NPV surface for two drivers, by broadcasting."""
+    params = _grid_params(base, x_driver, x_values, y_driver, y_values)
+    npv = batch_npv(params, years, periods_per_year, profile)
+    return np.broadcast_to(npv, (len(y_values), len(x_values)))
+
+
+def irr_block_rows(periods: int, columns: int) -> int:
+    """Grid rows per grid_irr block so that one block stays within IRR_BLOCK_BUDGET."""
+    per_cell = 8 * (IRR_PERIOD_ARRAYS * periods + IRR_GRID_ARRAYS * len(IRR_GRID))
+    return max(1, IRR_BLOCK_BUDGET // (per_cell * max(1, columns)))
+
+
+def grid_irr(base, x_driver, x_values, y_driver, y_values, years, periods_per_year=1, profile="Flat",
+             block_rows: int | None = None) -> np.ndarray:
+    """
+    Annualised IRR surface for two drivers (NaN where there is no IRR).
+
+    Uses the page's convention of moving first-period CAPEX to t=0; where
+    a cell has several IRRs, the one nearest its discount rate is shown.
+    Rows of the grid are solved in blocks (irr_block_rows by default), so
+    memory is bounded whatever the resolution and horizon.
+    """
+    y_values = np.asarray(y_values, dtype=float)
+    periods = years * periods_per_year
+    block_rows = block_rows or irr_block_rows(periods, len(x_values))
+    out = np.empty((len(y_values), len(x_values)))
+    for start in range(0, len(y_values), block_rows):
+        ys = y_values[start:start + block_rows]
+        params = _grid_params(base, x_driver, x_values, y_driver, ys)
+        shape = (len(ys), len(x_values))
+        flows = np.broadcast_to(batch_flows(params, years, periods_per_year, profile), shape + (periods,))
+        capex = np.broadcast_to(params["capex"], shape)
+        irr_flows = np.concatenate([-capex[..., None], flows[..., 1:]], axis=-1).reshape(-1, periods)
+        guess = period_rate(np.broadcast_to(params["discount"], shape).ravel(), periods_per_year)
+        rates, _ = irr_batch(irr_flows, guess=guess)
+        out[start:start + len(ys)] = ((1 + rates) ** periods_per_year - 1).reshape(shape)
+    return out
+
+
+# ============================================================
+# ---------- GLOBAL SENSITIVITY (SOBOL INDICES) ----------
+# ============================================================
+
+def saltelli_matrices(rng: np.random.Generator, n: int, k: int, sampler: str = "sobol"):
+    """Independent (n x k) unit-cube matrices A and B from one 2k-dimensional design."""
+    from utils.simulation import uniform_samples
+
+    u = uniform_samples(rng, n, 2 * k, sampler, np.float64)
+    return u[:, :k], u[:, k:]
+
+
+def sobol_indices(
+    base: Dict[str, float],
+    years: int,
+    periods_per_year: int = 1,
+    profile="Flat",
+    span: float = 0.2,
+    n: int = 10_000,
+    drivers: Sequence[str] = DRIVERS,
+    rng: np.random.Generator | None = None,
+    sampler: str = "sobol",
+    workers: int | None = None,
+) -> pd.DataFrame:
+    """
+    First-order and total-effect Sobol indices of NPV for every driver.
+
+    Drivers are uniform over base * (1 -/+ span) (see driver_range).
+    Saltelli sampling stacks A, B and the k matrices AB_i (A with column i
+    from B) into one (k + 2) x n batch evaluated by pointwise_npv.
+    First-order indices use the Saltelli (2010) estimator, total effects
+    Jansen's. Total minus first order is the driver's share in
+    interactions. `workers` defaults to default_workers().
+    """
+    rng = rng or np.random.default_rng()
+    workers = workers or default_workers()
+    k = len(drivers)
+    A, B = saltelli_matrices(rng, n, k, sampler)
+    lo = np.array([driver_range(float(base[d]), span, 2)[0] for d in drivers])
+    hi = np.array([driver_range(float(base[d]), span, 2)[1] for d in drivers])
+
+    # (k + 2, n, k): A, B, then AB_i for every driver i.
+    stack = np.broadcast_to(A, (k + 2, n, k)).copy()
+    stack[1] = B
+    idx = np.arange(k)
+    stack[2 + idx, :, idx] = B.T
+    values = lo + stack * (hi - lo)
+
+    params = {d: np.full((k + 2, n), float(base[d])) for d in DRIVERS}
+    for j, d in enumerate(drivers):
+        params[d] = values[..., j]
+    f = pointwise_npv(params, years, periods_per_year, profile, workers=workers)
+
+    f_a, f_b, f_ab = f[0], f[1], f[2:]
+    var = np.var(np.concatenate([f_a, f_b]))
+    if var == 0:
+        first = total = np.zeros(k)
+    else:
+        first = np.mean(f_b * (f_ab - f_a), axis=1) / var
+        total = 0.5 * np.mean((f_a - f_ab) ** 2, axis=1) / var
+    out = pd.DataFrame({
+        "Driver": [DRIVER_LABELS.get(d, d) for d in drivers],
+        "First-order (S1)": first,
+        "Total effect (ST)": total,
+    })
+    out["Interactions (ST - S1)"] = out["Total effect (ST)"] - out["First-order (S1)"]
+    out.attrs.update({"variance": float(var), "evaluations": int(f.size)})
+    return out.sort_values("Total effect (ST)", ascending=False, kind="stable").reset_index(drop=True)
@@ -0,0 +1,601 @@
+from __future__ import annotations
+import time
+from typing import Dict, Tuple
+
+import numpy as np
+
+from utils.finance import discount_factors
+
+
+# ============================================================
+# ---------- DRIVER RANGES ----------
+# ============================================================
+
+# Uniform multiplier ranges applied to (revenue, cost, discount rate).
+DRIVER_RANGES: Tuple[Tuple[float, float], ...] = (
+    (0.80, 1.20),   # revenue
+    (0.85, 1.15),   # cost
+    (0.90, 1.10),   # discount rate
+)
+
+# Most samples evaluated per block (reached on short, annual horizons).
+CHUNK_SIZE = 250_000
+# Working memory per block: the (samples x periods) discount matrix and its power temporary.
+SIM_CHUNK_BYTES = 64 * 1024 * 1024
+SIM_ARRAYS = 2
+
+# Sampling strategies for the driver multipliers.
+SAMPLERS = {
+    "random": "Pseudo-random",
+    "lhs": "Latin hypercube",
+    "sobol": "Sobol (scrambled)",
+}
+# Independent randomisations of a QMC design, used for the standard error.
+QMC_REPLICATES = 8
+
+
+# ============================================================
+# ---------- SAMPLING ----------
+# ============================================================
+
+def uniform_samples(rng: np.random.Generator, n: int, d: int, sampler: str = "random", dtype=np.float32) -> np.ndarray:
+    """(n x d) points in [0, 1): pseudo-random, Latin hypercube or scrambled Sobol."""
+    if sampler == "random":
+        return rng.random((n, d), dtype=dtype)
+    from scipy.stats import qmc
+
+    if sampler == "lhs":
+        u = qmc.LatinHypercube(d=d, seed=rng).random(n)
+    elif sampler == "sobol":
+        u = qmc.Sobol(d=d, scramble=True, seed=rng).random_base2(max(0, int(np.ceil(np.log2(max(n, 1))))))[:n]
+    else:
+        raise ValueError(f"Unknown sampler: {sampler}")
+    return u.astype(dtype)
+
+
+def replicate_sizes(n: int, sampler: str):
+    """(replicates, samples per replicate); Sobol replicates are rounded up to a power of two."""
+    if sampler == "random":
+        return 1, n
+    per = int(np.ceil(n / QMC_REPLICATES))
+    if sampler == "sobol":
+        per = 1 << int(np.ceil(np.log2(max(per, 1))))
+    return QMC_REPLICATES, per
+
+
+# ============================================================
+# ---------- BATCHED MONTE CARLO ----------
+# ============================================================
+
+def sim_chunk(periods: int, dtype=np.float32, budget: int | None = None) -> int:
+    """Samples per block (at most CHUNK_SIZE) so the (samples x periods) arrays fit `budget` bytes (SIM_CHUNK_BYTES)."""
+    per_sample = max(1, periods) * np.dtype(dtype).itemsize * SIM_ARRAYS
+    return int(max(1, min(CHUNK_SIZE, (budget or SIM_CHUNK_BYTES) // per_sample)))
+
+
+def draw_drivers(rng: np.random.Generator, n: int, dtype=np.float32, sampler: str = "random") -> np.ndarray:
+    """Draw an (n x drivers) matrix of multipliers in one call."""
+    lo = np.array([r[0] for r in DRIVER_RANGES], dtype=dtype)
+    hi = np.array([r[1] for r in DRIVER_RANGES], dtype=dtype)
+    u = uniform_samples(rng, n, len(DRIVER_RANGES), sampler, dtype)
+    return lo + u * (hi - lo)
+
+
+def npv_samples(
+    revenue: np.ndarray,
+    cost: np.ndarray,
+    discount: float,
+    drivers: np.ndarray,
+) -> np.ndarray:
+    """NPV of every sampled driver row with a single matrix product."""
+    dtype = drivers.dtype
+    flows = np.stack([revenue, cost], axis=1).astype(dtype)   # periods x 2
+    dfs = discount_factors(discount * drivers[:, 2], len(revenue), "end", dtype=dtype)
+    pv = dfs @ flows                                           # samples x 2
+    return drivers[:, 0] * pv[:, 0] - drivers[:, 1] * pv[:, 1]
+
+
+def simulate_npv(
+    revenue,
+    cost,
+    discount: float,
+    n: int,
+    rng: np.random.Generator | None = None,
+    dtype=np.float32,
+    sampler: str = "random",
+) -> np.ndarray:
+    """
+    Simulated NPVs as a (replicates x samples) array.
+
+    Pseudo-random sampling gives a single replicate of n samples; QMC
+    samplers split n over QMC_REPLICATES independently scrambled designs.
+    """
+    rng = rng or np.random.default_rng()
+    revenue = np.asarray(revenue, dtype=np.float64)
+    cost = np.asarray(cost, dtype=np.float64)
+
+    # Scale flows to ~unit size so float32 keeps its precision on large Rand values.
+    scale = max(float(np.abs(revenue).max(initial=0.0)), float(np.abs(cost).max(initial=0.0)), 1.0)
+    rev_s, cost_s = revenue / scale, cost / scale
+
+    reps, per = replicate_sizes(n, sampler)
+    step = sim_chunk(len(revenue), dtype)
+    out = np.empty((reps, per), dtype=np.float64)
+    for r in range(reps):
+        if sampler == "random":
+            for start in range(0, per, step):
+                size = min(step, per - start)
+                drivers = draw_drivers(rng, size, dtype)
+                out[r, start:start + size] = npv_samples(rev_s, cost_s, discount, drivers)
+            continue
+        # A QMC design must be drawn whole; only its evaluation is chunked.
+        drivers = draw_drivers(rng, per, dtype, sampler)
+        for start in range(0, per, step):
+            out[r, start:start + step] = npv_samples(rev_s, cost_s, discount, drivers[start:start + step])
+    return out * scale
+
+
+def summarize(npvs: np.ndarray) -> Dict[str, float]:
+    """
+    Success percentage, NPV distribution statistics and standard errors.
+
+    A 2-D (replicates x samples) input takes its standard errors from the
+    spread between replicates; a single replicate uses the binomial / CLT
+    formulas.
+    """
+    if npvs.size == 0:
+        nan = float("nan")
+        return {"success": 0.0, "success_se": nan, "mean": nan, "mean_se": nan, "std": nan,
+                "p5": nan, "p50": nan, "p95": nan, "n": 0}
+    reps = np.atleast_2d(npvs)
+    flat = reps.ravel()
+    p5, p50, p95 = np.percentile(flat, [5, 50, 95])
+    success = float(np.count_nonzero(flat > 0)) / flat.size
+    if reps.shape[0] > 1:
+        success_se = float((reps > 0).mean(axis=1).std(ddof=1) / np.sqrt(reps.shape[0]))
+        mean_se = float(reps.mean(axis=1).std(ddof=1) / np.sqrt(reps.shape[0]))
+    else:
+        success_se = float(np.sqrt(success * (1 - success) / flat.size))
+        mean_se = float(flat.std() / np.sqrt(flat.size))
+    return {
+        "success": success * 100,
+        "success_se": success_se * 100,
+        "mean": float(flat.mean()),
+        "mean_se": mean_se,
+        "std": float(flat.std()),
+        "p5": float(p5),
+        "p50": float(p50),
+        "p95": float(p95),
+        "n": int(flat.size),
+    }
+
+
+def success_distribution(
+    revenue, cost, discount: float, n: int, rng=None, dtype=np.float32, sampler: str = "random"
+) -> Dict[str, float]:
+    """Run the batched simulation and return success % plus NPV percentiles and standard errors."""
+    return summarize(simulate_npv(revenue, cost, discount, n, rng=rng, dtype=dtype, sampler=sampler))
+
+
+# ============================================================
+# ---------- STREAMING WITH EARLY STOP ----------
+# ============================================================
+
+def binomial_interval(successes: int, n: int, method: str = "wilson", confidence: float = 0.95):
+    """Confidence interval (as fractions) for a success probability: Wilson or Clopper-Pearson."""
+    if n == 0:
+        return 0.0, 1.0
+    from scipy import stats
+
+    alpha = 1 - confidence
+    if method == "clopper-pearson":
+        lo = stats.beta.ppf(alpha / 2, successes, n - successes + 1) if successes > 0 else 0.0
+        hi = stats.beta.ppf(1 - alpha / 2, successes + 1, n - successes) if successes < n else 1.0
+        return float(lo), float(hi)
+    z = stats.norm.ppf(1 - alpha / 2)
+    p = successes / n
+    denom = 1 + z**2 / n
+    centre = (p + z**2 / (2 * n)) / denom
+    half = z * np.sqrt(p * (1 - p) / n + z**2 / (4 * n**2)) / denom
+    return float(centre - half), float(centre + half)
+
+
+def replicate_interval(rates, confidence: float = 0.95):
+    """Student-t interval (as fractions) for a success probability from independent replicate rates."""
+    rates = np.asarray(rates, dtype=float)
+    if rates.size < 2:
+        return 0.0, 1.0
+    from scipy import stats
+
+    half = stats.t.ppf(1 - (1 - confidence) / 2, rates.size - 1) * rates.std(ddof=1) / np.sqrt(rates.size)
+    p = float(rates.mean())
+    return max(0.0, p - half), min(1.0, p + half)
+
+
+def stream_success(
+    revenue,
+    cost,
+    discount: float,
+    max_samples: int,
+    tolerance: float = 0.5,
+    time_budget: float | None = None,
+    chunk: int = 10_000,
+    rng: np.random.Generator | None = None,
+    sampler: str = "random",
+    interval: str = "wilson",
+    on_progress=None,
+    dtype=np.float32,
+    simulate=None,
+) -> Dict[str, float]:
+    """
+    Simulate in chunks until the success-% interval is narrow enough.
+
+    Stops when the interval half-width (percentage points) is at most
+    `tolerance` or at `max_samples`, so the same seed always gives the
+    same result. Pseudo-random runs use the binomial `interval`; LHS and
+    Sobol runs use the spread between their independently scrambled
+    replicates (replicate_interval), which is what makes them stop early. An optional `time_budget` (seconds) also stops the run,
+    but then the sample count depends on machine speed; such results are
+    marked "reproducible": False. After every chunk `on_progress(done,
+    max_samples, success_pct, lo_pct, hi_pct)` is called.
+    `simulate(size, rng)` replaces the default multiplier model (e.g. a
+    partial of simulate_path_npv). Returns summarize() output plus the
+    interval and the reason for stopping.
+    """
+    rng = rng or np.random.default_rng()
+    if sampler == "sobol":
+        chunk = 1 << int(np.ceil(np.log2(max(chunk, 1))))
+    started = time.perf_counter()
+    chunks, rates, successes, done, stopped = [], [], 0, 0, "max_samples"
+    lo = hi = 0.0
+
+    while done < max_samples:
+        # (replicates x samples): a custom simulate() chunk is one replicate.
+        if simulate is not None:
+            reps = np.atleast_2d(simulate(chunk, rng))
+        else:
+            reps = simulate_npv(revenue, cost, discount, chunk, rng=rng, dtype=dtype, sampler=sampler)
+        chunks.append(reps)
+        successes += int(np.count_nonzero(reps > 0))
+        done += reps.size
+        if sampler == "random":
+            lo, hi = binomial_interval(successes, done, interval)
+        else:
+            rates.extend((reps > 0).mean(axis=1))
+            lo, hi = replicate_interval(rates)
+        if on_progress is not None:
+            on_progress(done, max_samples, successes / done * 100, lo * 100, hi * 100)
+        if (hi - lo) / 2 * 100 <= tolerance:
+            stopped = "tolerance"
+            break
+        if time_budget is not None and time.perf_counter() - started >= time_budget:
+            stopped = "time"
+            break
+
+    out = summarize(np.concatenate(chunks))
+    out.update({"ci_low": lo * 100, "ci_high": hi * 100, "stopped": stopped,
+                "reproducible": stopped != "time", "elapsed": time.perf_counter() - started})
+    return out
+
+
+# ============================================================
+# ---------- CORRELATED DRIVER PATHS ----------
+# ============================================================
+
+# Per-period stochastic drivers, in tensor order along the last axis.
+PATH_DRIVERS = ("units", "price", "cost")
+PATH_MODELS = {
+    "fixed": "One multiplier per run",
+    "random_walk": "Random walk",
+    "mean_reverting": "Mean-reverting",
+}
+# Working memory per path chunk, every per-sample array included; keeps a run well inside a 2 GB container.
+PATH_CHUNK_BYTES = 256 * 1024 * 1024
+# Shock-tensor-sized arrays alive at a chunk's peak: the tensor and its correlated copy, the float64
+# AR(1) filter input and output (mean-reverting) or float64 uniforms (QMC), and the NPV temporaries.
+PATH_TENSOR_COPIES = 7
+# Bytes per cell while scipy draws a QMC design: its float64 points plus integer/permutation scratch.
+QMC_CELL_BYTES = 32
+
+
+def cholesky_factor(corr) -> np.ndarray:
+    """Lower Cholesky factor of a driver correlation matrix (ValueError if not a valid correlation matrix)."""
+    corr = np.asarray(corr, dtype=np.float64)
+    if corr.ndim != 2 or corr.shape[0] != corr.shape[1] or not np.allclose(corr, corr.T) \
+            or not np.allclose(np.diag(corr), 1.0):
+        raise ValueError("Correlation matrix must be square, symmetric and have a unit diagonal.")
+    try:
+        return np.linalg.cholesky(corr)
+    except np.linalg.LinAlgError:
+        raise ValueError("Correlation matrix is not positive definite.") from None
+
+
+def driver_paths(
+    rng: np.random.Generator,
+    n: int,
+    periods: int,
+    corr,
+    vol,
+    model: str = "random_walk",
+    reversion: float = 1.0,
+    periods_per_year: int = 1,
+    dtype=np.float32,
+    sampler: str = "random",
+    uniforms: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    (n x periods x drivers) tensor of multiplicative driver paths, mean 1.
+
+    Shocks are correlated through the Cholesky factor of `corr` and scaled
+    by the annual volatilities `vol`. A random walk accumulates the log
+    shocks; the mean-reverting model is an AR(1) in logs that pulls back
+    at speed `reversion` per year. Each path is drift-corrected so every
+    period's expected multiplier is 1. `uniforms` (n x periods*drivers)
+    replaces the draw, e.g. a row slice of one QMC design.
+    """
+    chol = cholesky_factor(corr).astype(dtype)
+    d = chol.shape[0]
+    sigma = np.asarray(vol, dtype=np.float64) / np.sqrt(periods_per_year)      # per-period vol
+
+    if uniforms is None and sampler == "random":
+        z = rng.standard_normal((n, periods, d), dtype=dtype)
+    else:
+        from scipy.special import ndtri
+
+        u = uniform_samples(rng, n, periods * d, sampler, np.float64) if uniforms is None \
+            else np.asarray(uniforms, dtype=np.float64).copy()
+        np.clip(u, 1e-12, 1 - 1e-12, out=u)
+        z = ndtri(u, out=u).astype(dtype).reshape(n, periods, d)
+        del u
+    z = z @ chol.T
+    z *= sigma.astype(dtype)
+
+    t = np.arange(1, periods + 1)
+    if model == "random_walk":
+        np.cumsum(z, axis=1, out=z)
+        var = np.outer(t, sigma**2)
+    elif model == "mean_reverting":
+        from scipy.signal import lfilter
+
+        phi = float(np.exp(-reversion / periods_per_year))
+        z = lfilter([1.0], [1.0, -phi], z, axis=1).astype(dtype, copy=False)
+        var = np.outer((1 - phi ** (2 * t)) / (1 - phi**2) if phi < 1 else t, sigma**2)
+    else:
+        raise ValueError(f"Unknown path model: {model}")
+    z -= (0.5 * var).astype(dtype)
+    return np.exp(z, out=z)
+
+
+def path_npv_samples(revenue, cogs, fixed, discount: float, paths: np.ndarray) -> np.ndarray:
+    """NPV of every path: revenue scales with units x price, COGS with units x cost; fixed costs stay put."""
+    dtype = paths.dtype
+    dfs = discount_factors(discount, paths.shape[1], "end", dtype=dtype)
+    units, price, cost = paths[..., 0], paths[..., 1], paths[..., 2]
+    flows = units * (price * revenue.astype(dtype) - cost * cogs.astype(dtype))
+    return flows @ dfs - float(np.dot(fixed, dfs))
+
+
+def path_chunk(periods: int, drivers: int = len(PATH_DRIVERS), dtype=np.float32, budget: int | None = None) -> int:
+    """Samples per chunk so all of a chunk's arrays stay within `budget` bytes (PATH_CHUNK_BYTES)."""
+    per_sample = max(1, periods) * drivers * np.dtype(dtype).itemsize * PATH_TENSOR_COPIES
+    return int(max(1, (budget or PATH_CHUNK_BYTES) // per_sample))
+
+
+def simulate_path_npv(
+    revenue,
+    cogs,
+    fixed,
+    discount: float,
+    n: int,
+    corr,
+    vol,
+    model: str = "random_walk",
+    reversion: float = 1.0,
+    periods_per_year: int = 1,
+    rng: np.random.Generator | None = None,
+    dtype=np.float32,
+    sampler: str = "random",
+) -> np.ndarray:
+    """
+    Simulated NPVs (1-D) under correlated per-period driver paths.
+
+    The path tensor is generated and reduced chunk by chunk (see
+    path_chunk), so memory is bounded whatever the sample count. A QMC
+    design is drawn whole and transformed in row slices.
+    """
+    rng = rng or np.random.default_rng()
+    revenue = np.asarray(revenue, dtype=np.float64)
+    cogs = np.asarray(cogs, dtype=np.float64)
+    fixed = np.asarray(fixed, dtype=np.float64)
+    scale = max(float(np.abs(revenue).max(initial=0.0)), float(np.abs(cogs).max(initial=0.0)),
+                float(np.abs(fixed).max(initial=0.0)), 1.0)
+    rev_s, cogs_s, fixed_s = revenue / scale, cogs / scale, fixed / scale
+
+    periods = len(revenue)
+    d = len(PATH_DRIVERS)
+    design, budget = None, PATH_CHUNK_BYTES
+    if sampler != "random":
+        # A QMC design must be drawn whole; it is kept in `dtype` and transformed chunk by chunk in
+        # the rest of the budget. Designs too large to draw within it fall back to pseudo-random.
+        rows = 1 << int(np.ceil(np.log2(max(n, 1)))) if sampler == "sobol" else n    # Sobol draws 2^m points
+        if rows * periods * d * QMC_CELL_BYTES <= PATH_CHUNK_BYTES:
+            design = uniform_samples(rng, n, periods * d, sampler, dtype)
+            budget = PATH_CHUNK_BYTES - design.nbytes
+    step = path_chunk(periods, d, dtype, budget)
+    out = np.empty(n, dtype=np.float64)
+    for start in range(0, n, step):
+        size = min(step, n - start)
+        u = design[start:start + size] if design is not None else None
+        paths = driver_paths(rng, size, periods, corr, vol, model, reversion, periods_per_year, dtype, uniforms=u)
+        out[start:start + size] = path_npv_samples(rev_s, cogs_s, fixed_s, discount, paths)
+        del paths
+    return out * scale
+
+
+# ============================================================
+# ---------- SCENARIO STACKS ----------
+# ============================================================
+
+def stack_success(
+    revenue,
+    cogs,
+    fixed,
+    discount: float,
+    n: int,
+    rng: np.random.Generator | None = None,
+    dtype=np.float32,
+    sampler: str = "random",
+    paths: Dict | None = None,
+    tolerance: float | None = None,
+    interval: str = "wilson",
+    chunk: int = 10_000,
+) -> Dict[str, np.ndarray]:
+    """
+    Success % and NPV moments for a whole (scenarios x periods) stack at once.
+
+    Every scenario sees the same draws (common random numbers), so one
+    discount matrix per chunk serves all of them and differences between
+    scenarios are not masked by sampling noise. With `paths` (keyword
+    arguments for driver_paths) the per-period driver model is used
+    instead of one multiplier per run. With `tolerance`, draws come in
+    chunks of `chunk` and stop once the widest success interval (as in
+    stream_success) is within that many points; `n` is then the cap.
+    Returns arrays with one entry per scenario.
+    """
+    rng = rng or np.random.default_rng()
+    revenue, cogs, fixed = (np.atleast_2d(np.asarray(x, dtype=np.float64)) for x in (revenue, cogs, fixed))
+    scale = max(float(np.abs(x).max(initial=0.0)) for x in (revenue, cogs, fixed))
+    scale = max(scale, 1.0)
+    rev_s, cogs_s, fixed_s = (x.astype(dtype) / dtype(scale) for x in (revenue, cogs, fixed))
+    scenarios, periods = revenue.shape
+
+    wins = np.zeros(scenarios)
+    total = np.zeros(scenarios)
+    total_sq = np.zeros(scenarios)
+    step = sim_chunk(periods, dtype) if paths is None else path_chunk(periods, dtype=dtype)
+    if tolerance is not None:
+        if sampler == "sobol":
+            chunk = 1 << int(np.ceil(np.log2(max(chunk, 1))))
+        step = min(step, chunk)
+    rates, done, stopped = [], 0, "max_samples"
+    lo, hi = np.zeros(scenarios), np.ones(scenarios)
+    while done < n:
+        size = min(step, n - done)
+        if paths is None:
+            drivers = draw_drivers(rng, size, dtype, sampler)
+            dfs = discount_factors(discount * drivers[:, 2], periods, "end", dtype=dtype)
+            npvs = drivers[:, :1] * (dfs @ rev_s.T) - drivers[:, 1:2] * (dfs @ (cogs_s + fixed_s).T)
+        else:
+            p = driver_paths(rng, size, periods, dtype=dtype, sampler=sampler, **paths)
+            dfs = discount_factors(discount, periods, "end", dtype=dtype)
+            volume = p[..., 0] * dfs
+            npvs = (volume * p[..., 1]) @ rev_s.T - (volume * p[..., 2]) @ cogs_s.T - fixed_s @ dfs
+        npvs = npvs.astype(np.float64)                          # samples x scenarios
+        wins += np.count_nonzero(npvs > 0, axis=0)
+        total += npvs.sum(axis=0)
+        total_sq += np.square(npvs).sum(axis=0)
+        done += size
+        if tolerance is None:
+            continue
+
+        # Pseudo-random: binomial interval per scenario; QMC: each chunk is one scrambled replicate.
+        if sampler == "random":
+            bounds = [binomial_interval(int(w), done, interval) for w in wins]
+        else:
+            rates.append((npvs > 0).mean(axis=0))
+            bounds = [replicate_interval(r) for r in np.transpose(rates)]
+        lo, hi = (np.array(b) for b in zip(*bounds))
+        if (hi - lo).max() / 2 * 100 <= tolerance:
+            stopped = "tolerance"
+            break
+
+    p = wins / max(done, 1)
+    mean = total / max(done, 1)
+    out = {
+        "success": p * 100,
+        "success_se": np.sqrt(p * (1 - p) / max(done, 1)) * 100,
+        "mean": mean * scale,
+        "std": np.sqrt(np.maximum(total_sq / max(done, 1) - mean**2, 0.0)) * scale,
+        "n": done,
+    }
+    if tolerance is not None:
+        out.update({"ci_low": lo * 100, "ci_high": hi * 100, "stopped": stopped})
+    return out
+
+
+# ============================================================
+# ---------- FUNDING REQUIREMENT ----------
+# ============================================================
+
+# Sample cap for the funding distribution: percentiles settle well before this.
+FUNDING_SAMPLES = 50_000
+
+
+def funding_need(
+    revenue,
+    cogs,
+    fixed,
+    n: int,
+    cash_on_hand: float = 0.0,
+    rng: np.random.Generator | None = None,
+    dtype=np.float32,
+    sampler: str = "random",
+    paths: Dict | None = None,
+) -> Dict[str, np.ndarray]:
+    """
+    Peak funding requirement and cash-out period of every simulated path.
+
+    Each chunk builds a (samples x periods) cash tensor, under either the
+    one-multiplier model or the per-period path model (`paths`, keyword
+    arguments for driver_paths). A cumulative sum along the period axis
+    gives the cash position. The capital to raise is the depth of its
+    trough beyond `cash_on_hand` (0 when cash on hand covers it), and
+    cash-out is the first period where `cash_on_hand` plus cumulative cash
+    drops below zero. Periods are 1-based, and cash-out is NaN when it
+    never happens.
+    """
+    rng = rng or np.random.default_rng()
+    revenue, cogs, fixed = (np.asarray(x, dtype=np.float64) for x in (revenue, cogs, fixed))
+    scale = max(max(float(np.abs(x).max(initial=0.0)) for x in (revenue, cogs, fixed)), 1.0)
+    rev_s, cogs_s, fixed_s = (x.astype(dtype) / dtype(scale) for x in (revenue, cogs, fixed))
+    floor = dtype(-cash_on_hand / scale)
+    periods = len(revenue)
+
+    need = np.empty(n)
+    trough = np.empty(n)
+    cash_out = np.empty(n)
+    step = path_chunk(periods, dtype=dtype)
+    for start in range(0, n, step):
+        size = min(step, n - start)
+        if paths is None:
+            drivers = draw_drivers(rng, size, dtype, sampler)
+            cash = drivers[:, :1] * rev_s - drivers[:, 1:2] * (cogs_s + fixed_s)
+        else:
+            p = driver_paths(rng, size, periods, dtype=dtype, sampler=sampler, **paths)
+            cash = p[..., 0] * (p[..., 1] * rev_s - p[..., 2] * cogs_s) - fixed_s
+        cum = np.cumsum(cash, axis=1)
+        sl = slice(start, start + size)
+        low = cum.argmin(axis=1)
+        need[sl] = np.maximum(0.0, -cum[np.arange(size), low].astype(np.float64) * scale - cash_on_hand)
+        trough[sl] = low + 1
+        below = cum < floor
+        cash_out[sl] = np.where(below.any(axis=1), below.argmax(axis=1) + 1, np.nan)
+    return {"need": need, "trough": trough, "cash_out": cash_out}
+
+
+def funding_summary(result: Dict[str, np.ndarray], periods_per_year: int = 1) -> Dict[str, float]:
+    """P50/P90 capital need, trough month and cash-out odds/timing (months from start)."""
+    months = 12 / periods_per_year
+    need, cash_out = result["need"], result["cash_out"]
+    hit = np.isfinite(cash_out)
+    out_months = cash_out[hit] * months
+    return {
+        "need_p50": float(np.percentile(need, 50)),
+        "need_p90": float(np.percentile(need, 90)),
+        "need_mean": float(need.mean()),
+        "trough_month_p50": float(np.percentile(result["trough"], 50) * months),
+        "cash_out_prob": float(hit.mean() * 100),
+        "cash_out_month_p50": float(np.percentile(out_months, 50)) if hit.any() else float("nan"),
+        "cash_out_month_p10": float(np.percentile(out_months, 10)) if hit.any() else float("nan"),
+        "n": int(need.size),
+    }
@@ -0,0 +1,115 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+from utils.bm_rule_engine import (
+    COMPILED_SUFFIX, CompiledRules, IncrementalScorer, compute_rule_score, load_compiled, load_rules,
+    normalize_rule_weights,
+)
+
+
+@pytest.fixture(scope="module")
+def rules():
+    return normalize_rule_weights(load_rules())
+
+
+@pytest.fixture(scope="module")
+def compiled(rules):
+    return CompiledRules.from_normalized(rules)
+
+
+def _questions(compiled):
+    questions = {}
+    for qid, ans in compiled.options:
+        questions.setdefault(qid, []).append(ans)
+    return questions
+
+
+def _reference_top(scores, model_ids, k):
+    """Best k by (score desc, model order asc), from a full score vector."""
+    order = np.lexsort((np.arange(len(scores)), -np.asarray(scores)))[:k]
+    return [model_ids[j] for j in order]
+
+
+# ============================================================
+# ---------- INCREMENTAL RESCORING ----------
+# ============================================================
+
+def test_incremental_matches_full_rescoring(rules, compiled):
+    questions = _questions(compiled)
+    rng = random.Random(7)
+    for _ in range(50):
+        inc, answers = IncrementalScorer(compiled, k=5), {}
+        for _ in range(25):
+            qid = rng.choice(list(questions))
+            if rng.random() < 0.2:
+                inc.clear_answer(qid)
+                answers.pop(qid, None)
+            else:
+                answers[qid] = rng.choice(questions[qid])
+                inc.set_answer(qid, answers[qid])
+            ref = compute_rule_score(answers, rules)
+            got = inc.score_dict()
+            assert got.keys() == ref.keys()
+            assert all(got[m] == pytest.approx(ref[m], abs=1e-9) for m in ref)
+            # Summation order differs, so near-ties may swap; the top scores themselves must agree.
+            top = inc.top()
+            best = sorted(ref.values(), reverse=True)[:5]
+            np.testing.assert_allclose([s for _, s in top], best, atol=1e-9)
+            assert all(ref[m] == pytest.approx(s, abs=1e-9) for m, s in top)
+
+
+def test_ties_at_the_bound_do_not_force_rebuilds(monkeypatch):
+    rng = random.Random(0)
+    bank = {f"q{i}": {f"a{j}": {f"BM{rng.randrange(3000):04d}": 1.0 for _ in range(3)} for j in range(4)}
+            for i in range(300)}
+    compiled = CompiledRules.from_normalized(bank)
+    inc, answers = IncrementalScorer(compiled, k=5), {}
+    rebuilds = []
+    monkeypatch.setattr(inc, "_rebuild", lambda orig=inc._rebuild: (rebuilds.append(1), orig()))
+    for step in range(500):
+        qid, ans = f"q{rng.randrange(300)}", f"a{rng.randrange(4)}"
+        inc.set_answer(qid, ans)
+        answers[qid] = ans
+    assert len(rebuilds) < 10
+    assert [m for m, _ in inc.top()] == _reference_top(compiled.score_vector(answers), compiled.model_ids, 5)
+
+
+# ============================================================
+# ---------- COMPILED RULES ----------
+# ============================================================
+
+def _random_profiles(compiled, n, seed):
+    questions = _questions(compiled)
+    rng = random.Random(seed)
+    for _ in range(n):
+        picked = rng.sample(list(questions), rng.randrange(len(questions) + 1))
+        profile = {qid: rng.choice(questions[qid]) for qid in picked}
+        profile["unknown_question"] = "x"
+        if picked:
+            profile[picked[0]] = "unknown_answer"
+        yield profile
+
+
+def test_compiled_scores_match_dict_engine(rules, compiled):
+    for profile in _random_profiles(compiled, 300, 3):
+        ref = compute_rule_score(profile, rules, question_importance=1.5)
+        got = compute_rule_score(profile, compiled, question_importance=1.5)
+        assert got.keys() == ref.keys()
+        assert all(got[m] == pytest.approx(ref[m], abs=1e-12) for m in ref)
+        dense = compiled.one_hot(profile) @ compiled.matrix
+        np.testing.assert_allclose(compiled.score_vector(profile), np.asarray(dense.todense()).ravel(), atol=1e-12)
+
+
+def test_compiled_artifact_round_trip(tmp_path, rules, compiled):
+    source = tmp_path / "rules.json"
+    source.write_text(json.dumps(load_rules()))
+    first = load_compiled(str(source))
+    assert (tmp_path / ("rules" + COMPILED_SUFFIX)).exists()
+    assert load_compiled(str(source)) is first
+    loaded, _ = CompiledRules.load(str(tmp_path / ("rules" + COMPILED_SUFFIX)))
+    assert loaded.options == compiled.options and loaded.model_ids == compiled.model_ids
+    for profile in _random_profiles(compiled, 20, 5):
+        np.testing.assert_allclose(loaded.score_vector(profile), compiled.score_vector(profile))
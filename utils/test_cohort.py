@@ -0,0 +1,140 @@
+import json
+import random
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.bm_rule_engine import compute_rule_score, load_rules, normalize_rule_weights
+from utils.cohort import read_profiles, score_cohort, score_cohort_to_csv, top_k
+from utils.model_logic import load_models, score_models
+
+
+K = 4
+
+
+@pytest.fixture(scope="module")
+def raw_rules():
+    return load_rules()
+
+
+@pytest.fixture(scope="module")
+def profiles(raw_rules):
+    """Random answer profiles, some questions unanswered and some answers unknown."""
+    rng = random.Random(11)
+    out = []
+    for i in range(60):
+        answers = {}
+        for qid, options in raw_rules.items():
+            roll = rng.random()
+            if roll < 0.2:
+                continue
+            answers[qid] = "not_an_option" if roll < 0.25 else rng.choice(list(options))
+        out.append((f"p{i:03d}", answers))
+    return out
+
+
+@pytest.fixture(scope="module")
+def csv_path(tmp_path_factory, profiles, raw_rules):
+    path = tmp_path_factory.mktemp("cohort") / "profiles.csv"
+    pd.DataFrame([{"id": pid, **a} for pid, a in profiles], columns=["id", *raw_rules]).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope="module")
+def jsonl_path(tmp_path_factory, profiles):
+    path = tmp_path_factory.mktemp("cohort") / "profiles.jsonl"
+    with open(path, "w") as f:
+        for pid, answers in profiles:
+            f.write(json.dumps({"id": pid, "answers": answers}) + "\n")
+    return str(path)
+
+
+def _results(path, **kwargs):
+    return pd.concat(list(score_cohort(path, k=K, **kwargs)), ignore_index=True)
+
+
+def _check_top(result, reference):
+    """Returned scores are the k best of the reference, and each equals that model's reference score."""
+    for pid, ref in reference.items():
+        rows = result[result["profile_id"] == pid]
+        assert list(rows["rank"]) == list(range(1, K + 1))
+        np.testing.assert_allclose(rows["score"], sorted(ref.values(), reverse=True)[:K], atol=1e-9)
+        for model_id, score in zip(rows["model_id"], rows["score"]):
+            assert ref[model_id] == pytest.approx(score, abs=1e-9)
+
+
+# ============================================================
+# ---------- SCORING ----------
+# ============================================================
+
+def test_rules_method_matches_compute_rule_score(csv_path, profiles, raw_rules):
+    rules = normalize_rule_weights(raw_rules)
+    reference = {pid: compute_rule_score(a, rules, question_importance=1.5) for pid, a in profiles}
+    _check_top(_results(csv_path, question_importance=1.5), reference)
+
+
+def test_tags_method_matches_score_models(csv_path, profiles, raw_rules):
+    models = load_models()
+    reference = {}
+    for pid, answers in profiles:
+        tags = Counter()
+        for qid, ans in answers.items():
+            tags.update(raw_rules[qid].get(ans, {}).get("tags", {}))
+        reference[pid] = {r["model"]["id"]: r["score"] for r in score_models(tags, models, top_k=len(models))}
+    _check_top(_results(csv_path, method="tags"), reference)
+
+
+def test_unknown_method_is_rejected(csv_path):
+    with pytest.raises(ValueError, match="Unknown scoring method"):
+        next(score_cohort(csv_path, method="embeddings"))
+
+
+# ============================================================
+# ---------- TOP-K ----------
+# ============================================================
+
+@pytest.mark.parametrize("k", [1, 3, 8, 20])
+def test_top_k_matches_a_full_sort(k):
+    # Small integer scores, so ties are common and the column tie-break is exercised.
+    scores = np.random.default_rng(k).integers(-3, 4, size=(50, 8)).astype(float)
+    idx, vals = top_k(scores, k)
+    for row, got, got_vals in zip(scores, idx, vals):
+        order = sorted(range(len(row)), key=lambda j: (-row[j], j))[:k]
+        assert list(got) == order
+        assert list(got_vals) == [row[j] for j in order]
+
+
+# ============================================================
+# ---------- STREAMED INPUT ----------
+# ============================================================
+
+def test_csv_and_jsonl_give_the_same_results(csv_path, jsonl_path):
+    pd.testing.assert_frame_equal(_results(csv_path), _results(jsonl_path))
+
+
+def test_results_do_not_depend_on_chunk_size(csv_path):
+    pd.testing.assert_frame_equal(_results(csv_path, chunk_size=7), _results(csv_path, chunk_size=1000))
+
+
+def test_read_profiles_chunks_and_blank_cells(csv_path, jsonl_path, profiles):
+    for path in (csv_path, jsonl_path):
+        chunks = list(read_profiles(path, 25))
+        assert [len(c) for c in chunks] == [25, 25, 10]
+        frame = pd.concat(chunks, ignore_index=True)
+        for (pid, answers), (_, row) in zip(profiles, frame.iterrows()):
+            assert row["id"] == pid
+            assert {q: a for q, a in row.drop("id").items() if isinstance(a, str)} == answers
+
+
+def test_profiles_without_ids_are_numbered(tmp_path, profiles):
+    path = tmp_path / "anonymous.csv"
+    pd.DataFrame([a for _, a in profiles[:5]]).to_csv(path, index=False)
+    assert _results(str(path))["profile_id"].unique().tolist() == ["0", "1", "2", "3", "4"]
+
+
+def test_score_cohort_to_csv_writes_every_row(csv_path, tmp_path, profiles):
+    out = tmp_path / "scores.csv"
+    assert score_cohort_to_csv(csv_path, str(out), k=K, chunk_size=16) == len(profiles) * K
+    assert len(pd.read_csv(out)) == len(profiles) * K
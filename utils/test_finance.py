@@ -0,0 +1,200 @@
+import numpy as np
+import pytest
+
+from utils.finance import (
+    IRR_MULTIPLE, build_projection, depreciate, depreciation_kernel, irr, irr_batch, irr_roots, npv, payback_period,
+    taxable_income,
+)
+
+
+# ============================================================
+# ---------- IRR ----------
+# ============================================================
+
+def _random_flows(n, seed):
+    rng = np.random.default_rng(seed)
+    for _ in range(n):
+        f = rng.normal(0, 100, rng.integers(3, 12))
+        f[0] = -abs(f[0]) - 50
+        yield f
+
+
+def _irr_bisection(flows):
+    """The page's bisection IRR that irr() replaced; 0.0 when it does not converge."""
+    lo, hi = -0.99, 5.0
+    for _ in range(200):
+        mid = (lo + hi) / 2
+        npv_mid = sum(cf / (1 + mid)**t for t, cf in enumerate(flows, start=0))
+        npv_lo = sum(cf / (1 + lo)**t for t, cf in enumerate(flows, start=0))
+        if npv_mid == 0 or abs(npv_mid) < 1e-6:
+            return mid
+        if npv_lo * npv_mid < 0:
+            hi = mid
+        else:
+            lo = mid
+    return 0.0
+
+
+def test_single_root_matches_old_bisection():
+    checked = 0
+    for f in _random_flows(2000, 0):
+        roots = irr_roots(f)
+        if len(roots) == 1 and -0.5 < roots[0] < 5.0:   # old bisection stalls near -100%
+            assert irr(f) == pytest.approx(_irr_bisection(f.tolist()), abs=1e-5)
+            checked += 1
+    assert checked > 500
+
+
+def test_batch_matches_scalar():
+    flows = list(_random_flows(300, 1))
+    for f in flows:
+        rates, _ = irr_batch(f[None, :], guess=0.08)
+        expected = irr(f, guess=0.08)
+        assert (np.isnan(rates[0]) and np.isnan(expected)) or rates[0] == pytest.approx(expected, abs=1e-7)
+
+
+def test_multiple_roots_pick_nearest_guess_and_are_all_listed():
+    # NPV = -1 + 2.4/(1+r) - 1.35/(1+r)^2 has roots at r = -10% and r = 50%.
+    flows = [-1.0, 2.4, -1.35]
+    rates, status = irr_batch(np.array([flows, flows]), guess=np.array([0.1, 0.4]))
+    assert list(status) == [IRR_MULTIPLE, IRR_MULTIPLE]
+    np.testing.assert_allclose(rates, [-0.1, 0.5], atol=1e-8)
+    assert irr(flows, guess=0.45) == pytest.approx(0.5)
+    np.testing.assert_allclose(irr_roots(flows), [-0.1, 0.5], atol=1e-8)
+    for r in irr_roots(flows):
+        assert npv(r, flows) == pytest.approx(0.0, abs=1e-9)
+
+
+def test_irr_keeps_the_original_positional_arguments():
+    flows = [-1.0, 2.4, -1.35]
+    assert irr(flows, 0.45) == irr(flows, guess=0.45) == pytest.approx(0.5)
+    assert irr(flows, -0.05, 1e-12, 50) == pytest.approx(-0.1, abs=1e-12)
+
+
+def test_irr_without_a_root_is_nan():
+    assert np.isnan(irr([100.0, 50.0, 25.0]))
+    assert np.isnan(irr([-100.0]))
+
+
+# ============================================================
+# ---------- PAYBACK ----------
+# ============================================================
+
+@pytest.mark.parametrize("flows, expected", [
+    ([0, -50, 100], 1.5),
+    ([-100, 40, 40, 40], 2 + 20 / 40),
+    ([10, 5, 5], 2.0),
+    ([-100, 10, 10], float("inf")),
+    ([], float("inf")),
+    ([5.0], float("inf")),
+])
+def test_payback_matches_page_loop(flows, expected):
+    assert payback_period(flows) == pytest.approx(expected)
+
+
+def _payback_loop(flows):
+    """The page's payback loop that payback_period() replaced; None when never paid back."""
+    cum = np.cumsum(flows)
+    for i in range(1, len(flows)):
+        if cum[i] >= 0:
+            return i - 1 + (abs(cum[i-1]) / flows[i])
+    return None
+
+
+def test_payback_vectorised_matches_scalar_loop():
+    rng = np.random.default_rng(11)
+    flows = rng.normal(0, 100, size=(2000, 8))
+    flows[::3, 0] = 0.0
+    batch = payback_period(flows)
+    for row, pb in zip(flows, batch):
+        ref = _payback_loop(row)
+        assert pb == (np.inf if ref is None else pytest.approx(ref))
+        assert payback_period(row) == pb
+
+
+# ============================================================
+# ---------- PROJECTION (DEPRECIATION + TAX) ----------
+# ============================================================
+
+def _depreciation_loop(capex, method, life, factor=2.0):
+    """Each tranche's book value written down year by year, cut off at the horizon."""
+    dep = [0.0] * len(capex)
+    for year, spent in enumerate(capex):
+        book = spent
+        for k in range(life):
+            if method == "straight_line":
+                w = spent / life
+            else:
+                w = book if k == life - 1 else book * min(1.0, factor / life)
+            book -= w
+            if year + k < len(capex):
+                dep[year + k] += w
+    return dep
+
+
+def _projection_loop(revenue, opex, capex, tax_rate, life, method, carry_forward):
+    """Year-by-year EBIT and tax with an explicit assessed-loss pool."""
+    dep = _depreciation_loop(capex, method, life)
+    pool, out = 0.0, {"ebit": [], "taxable_income": [], "tax": [], "net_cf": [], "assessed_loss": []}
+    for y in range(len(revenue)):
+        ebit = revenue[y] - opex[y] - dep[y]
+        if not carry_forward:
+            taxable = max(0.0, ebit)
+        elif ebit < 0:
+            pool, taxable = pool - ebit, 0.0
+        else:
+            used = min(pool, ebit)
+            pool, taxable = pool - used, ebit - used
+        out["ebit"].append(ebit)
+        out["taxable_income"].append(taxable)
+        out["tax"].append(taxable * tax_rate)
+        out["net_cf"].append(revenue[y] - opex[y] - taxable * tax_rate - capex[y])
+        out["assessed_loss"].append(pool if carry_forward else 0.0)
+    return {"depreciation": dep, **out}
+
+
+@pytest.mark.parametrize("method", ["straight_line", "declining_balance"])
+@pytest.mark.parametrize("life", [1, 3, 5, 8])
+def test_depreciation_matches_the_book_value_loop(method, life):
+    kernel = depreciation_kernel(method, life)
+    assert kernel.shape == (life,) and kernel.sum() == pytest.approx(1.0)
+    capex = np.random.default_rng(life).uniform(0, 1e6, size=(4, 10)) * (np.arange(10) % 3 != 1)
+    dep = depreciate(capex, kernel)
+    for row, got in zip(capex, dep):
+        np.testing.assert_allclose(got, _depreciation_loop(row, method, life), rtol=1e-12)
+
+
+def test_declining_balance_writes_off_the_balance_in_the_last_year():
+    np.testing.assert_allclose(depreciation_kernel("declining_balance", 4), [0.5, 0.25, 0.125, 0.125])
+    np.testing.assert_allclose(depreciation_kernel("custom", schedule=[0.2, 0.3, 0.5]), [0.2, 0.3, 0.5])
+    with pytest.raises(ValueError, match="Unknown depreciation method"):
+        depreciation_kernel("sum_of_years")
+
+
+def test_losses_carry_forward_until_used_up():
+    ebit = [-100.0, -50.0, 30.0, 80.0, 200.0, -20.0, 50.0]
+    # 150 of losses absorb 30 + 80 + 40 of later profit; the next loss is absorbed in turn.
+    np.testing.assert_allclose(taxable_income(ebit), [0, 0, 0, 0, 160, 0, 30])
+    np.testing.assert_allclose(taxable_income(ebit, carry_forward=False), [0, 0, 30, 80, 200, 0, 50])
+
+
+@pytest.mark.parametrize("carry_forward", [True, False])
+@pytest.mark.parametrize("method", ["straight_line", "declining_balance"])
+def test_projection_matches_the_year_by_year_loop(method, carry_forward):
+    rng = np.random.default_rng(7)
+    years = 9
+    revenue = rng.uniform(0, 2e6, size=(25, years)) * np.linspace(0.2, 1.5, years)
+    opex = rng.uniform(3e5, 9e5, size=(25, years))
+    capex = rng.uniform(0, 3e6, size=(25, years)) * (rng.random((25, years)) < 0.3)
+    res = build_projection(years, revenue, opex, capex, 0.28, 4, method, carry_forward=carry_forward)
+    for i in range(len(revenue)):
+        ref = _projection_loop(revenue[i], opex[i], capex[i], 0.28, 4, method, carry_forward)
+        for key, values in ref.items():
+            np.testing.assert_allclose(res[key][i], values, rtol=1e-9, atol=1e-6)
+    loss_years = res["ebit"] < 0
+    assert loss_years.any() and (res["tax"][loss_years] == 0).all()
+    # Carried losses shelter some later profit, and some pools are fully used up.
+    sheltered = res["taxable_income"] < np.maximum(0.0, res["ebit"]) - 1e-6
+    assert sheltered.any() == carry_forward
+    if carry_forward:
+        assert ((res["assessed_loss"][:, :-1] > 0) & (res["assessed_loss"][:, 1:] == 0)).any()
@@ -0,0 +1,63 @@
+import os
+
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest
+
+import utils.simulation as simulation
+
+
+PAGE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages", "03_Financial_Projection.py")
+
+
+@pytest.fixture(scope="module")
+def app():
+    # The page re-imports stream_success on every run, so wrapping it counts scenario simulations.
+    runs = []
+    original = simulation.stream_success
+
+    def counted(revenue, *args, **kwargs):
+        runs.append(float(revenue.sum()))
+        return original(revenue, *args, **kwargs)
+
+    simulation.stream_success = counted
+    try:
+        at = AppTest.from_file(PAGE, default_timeout=120)
+        at.run()
+        assert not at.exception
+        yield at, runs
+    finally:
+        simulation.stream_success = original
+
+
+def _show(at, view):
+    at.radio(key="fin_view").set_value(view).run()
+    assert not at.exception
+
+
+# ============================================================
+# ---------- ACTIVE VIEW ONLY ----------
+# ============================================================
+
+def test_first_run_simulates_only_the_active_scenario(app):
+    at, runs = app
+    assert at.radio(key="fin_view").value == "Baseline"
+    assert len(runs) == 1
+
+
+def test_revisiting_a_view_is_served_from_the_cache(app):
+    at, runs = app
+    _show(at, "Optimistic")
+    assert len(runs) == 2
+    _show(at, "Baseline")
+    assert len(runs) == 2
+
+
+def test_summary_simulates_only_the_scenarios_not_yet_opened(app):
+    at, runs = app
+    _show(at, "Summary")
+    assert len(runs) == 3
+    _show(at, "Pessimistic")
+    assert len(runs) == 3
+    assert len(set(runs)) == 3
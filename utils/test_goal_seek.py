@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.finance import npv
+from utils.goal_seek import TABLE_COLUMNS, goal_seek, period_items
+from utils.projection import period_rate, unit_shares
+
+
+DISCOUNT = 0.12
+
+
+def _table():
+    """A scenario table with per-year edits, as the data editor leaves it."""
+    return pd.DataFrame({
+        "Year": np.arange(1, 6),
+        "Units": [800.0, 1500.0, 2600.0, 3100.0, 3000.0],
+        "Price (R/u)": [120.0, 120.0, 115.0, 118.0, 125.0],
+        "COGS (R/u)": [60.0, 58.0, 55.0, 55.0, 54.0],
+        "OPEX (R)": [90_000.0, 95_000.0, 100_000.0, 100_000.0, 110_000.0],
+        "CAPEX (R)": [250_000.0, 0.0, 40_000.0, 0.0, 0.0],
+    })
+
+
+def _shares(monthly):
+    return unit_shares(0.2, "Year-end retail") if monthly else None
+
+
+def _metric(table, metric, target, discount, monthly):
+    """The page's NPV, or NPV of its IRR cashflows at the target rate (zero when the IRR hits it)."""
+    ppy = 12 if monthly else 1
+    p = period_items(table, _shares(monthly))
+    if metric == "NPV":
+        return npv(period_rate(discount, ppy), p["net"], timing="end")
+    irr_flows = np.concatenate([[-p["capex"][0]], p["net"][1:]])
+    return npv(period_rate(target, ppy), irr_flows, timing="t0")
+
+
+# ============================================================
+# ---------- SOLVED VALUES ----------
+# ============================================================
+
+@pytest.mark.parametrize("monthly", [False, True])
+@pytest.mark.parametrize("metric, target", [("NPV", 0.0), ("NPV", -50_000.0), ("IRR", 0.25)])
+@pytest.mark.parametrize("driver", list(TABLE_COLUMNS))
+def test_scaled_column_reproduces_the_target(driver, metric, target, monthly):
+    table = _table()
+    scale = goal_seek(table, driver, metric, target, DISCOUNT, 12 if monthly else 1, _shares(monthly))
+    assert scale is not None and scale >= 0
+    solved = table.assign(**{TABLE_COLUMNS[driver]: table[TABLE_COLUMNS[driver]] * scale})
+    expected = target if metric == "NPV" else 0.0
+    assert _metric(solved, metric, target, DISCOUNT, monthly) == pytest.approx(expected, abs=1e-3)
+
+
+@pytest.mark.parametrize("monthly", [False, True])
+def test_solved_discount_rate_reproduces_the_target(monthly):
+    table = _table()
+    rate = goal_seek(table, "discount", "NPV", 100_000.0, DISCOUNT, 12 if monthly else 1, _shares(monthly))
+    assert rate is not None
+    assert _metric(table, "NPV", 100_000.0, rate, monthly) == pytest.approx(100_000.0, abs=1e-3)
+
+
+def test_table_edits_change_the_answer():
+    table = _table()
+    edited = table.assign(**{"OPEX (R)": table["OPEX (R)"] * 1.5})
+    assert goal_seek(edited, "price") > goal_seek(table, "price")
+
+
+# ============================================================
+# ---------- UNREACHABLE TARGETS ----------
+# ============================================================
+
+def test_unreachable_targets_return_none():
+    table = _table()
+    # No margin: units have no effect on NPV.
+    flat = table.assign(**{"COGS (R/u)": table["Price (R/u)"]})
+    assert goal_seek(flat, "units", "NPV", 0.0, DISCOUNT) is None
+    # Hitting a very negative NPV would need a negative price.
+    assert goal_seek(table, "price", "NPV", -1e12, DISCOUNT) is None
+    # No discount rate in range gives this NPV, and IRR does not depend on the rate.
+    assert goal_seek(table, "discount", "NPV", 1e12, DISCOUNT) is None
+    assert goal_seek(table, "discount", "IRR", 0.2, DISCOUNT) is None
+
+
+def test_unknown_driver_is_rejected():
+    with pytest.raises(ValueError, match="Unknown goal-seek driver"):
+        goal_seek(_table(), "growth")
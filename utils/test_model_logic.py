@@ -0,0 +1,183 @@
+import random
+from collections import Counter
+
+import pytest
+
+from utils.model_logic import (
+    LSH_MIN_THRESHOLD, SIMILARITY_MATRIX_MAX, SimilarityIndex, build_tag_index, find_adjacent_models,
+    load_models, model_similarity, score_models, similarity_index, tag_index,
+)
+
+
+@pytest.fixture(scope="module")
+def models():
+    return load_models()
+
+
+def _synthetic_catalog(n, vocab, seed, max_tags=8):
+    rng = random.Random(seed)
+    tags = [f"t{i}" for i in range(vocab)]
+    return [{"id": f"M{i:05d}", "tags": rng.sample(tags, rng.randint(0, max_tags))} for i in range(n)]
+
+
+def _random_weights(tags, rng):
+    """Tag weights over known and unknown tags, with positive, negative and zero entries."""
+    weights = Counter()
+    for t in rng.sample(tags, min(len(tags), rng.randint(1, 12))) + ["not_a_tag"]:
+        weights[t] = rng.randint(-3, 5)
+    return weights
+
+
+# ============================================================
+# ---------- MODEL SCORING ----------
+# ============================================================
+
+def _scan_scores(tag_weights, models, top_k=3):
+    """The full catalog scan score_models() replaced: every model scored, then a stable sort."""
+    results = []
+    for m in models:
+        mtags = set(m.get("tags", []))
+        overlap = {t: w for t, w in tag_weights.items() if t in mtags and w > 0}
+        penalty_overlap = {t: w for t, w in tag_weights.items() if t in mtags and w < 0}
+        results.append({
+            "model": m,
+            "score": sum(overlap.values()) + sum(penalty_overlap.values()),
+            "matched": dict(sorted(overlap.items(), key=lambda x: -x[1])),
+            "penalties": dict(sorted(penalty_overlap.items(), key=lambda x: x[1])),
+        })
+    results.sort(key=lambda x: x["score"], reverse=True)
+    return results[:top_k]
+
+
+def _same(got, ref):
+    assert [r["model"]["id"] for r in got] == [r["model"]["id"] for r in ref]
+    for g, r in zip(got, ref):
+        assert (g["score"], g["matched"], g["penalties"]) == (r["score"], r["matched"], r["penalties"])
+        assert list(g["matched"]) == list(r["matched"]) and list(g["penalties"]) == list(r["penalties"])
+
+
+@pytest.mark.parametrize("top_k", [1, 3, 10])
+def test_index_scoring_matches_full_scan_on_the_catalog(models, top_k):
+    tags = sorted({t for m in models for t in m["tags"]})
+    rng = random.Random(top_k)
+    for _ in range(200):
+        weights = _random_weights(tags, rng)
+        _same(score_models(weights, models, top_k), _scan_scores(weights, models, top_k))
+
+
+def test_index_scoring_matches_full_scan_on_a_large_catalog():
+    catalog = _synthetic_catalog(3000, 60, seed=1)
+    tags = [f"t{i}" for i in range(60)]
+    rng = random.Random(2)
+    for _ in range(30):
+        weights = _random_weights(tags, rng)
+        _same(score_models(weights, catalog, 5), _scan_scores(weights, catalog, 5))
+
+
+def test_no_overlap_falls_back_to_catalog_order(models):
+    got = score_models(Counter({"not_a_tag": 5}), models, top_k=4)
+    assert [r["model"]["id"] for r in got] == [m["id"] for m in models[:4]]
+    assert all(r["score"] == 0 for r in got)
+
+
+def test_tag_index_is_cached_and_refreshable():
+    catalog = _synthetic_catalog(50, 10, seed=3)
+    index = tag_index(catalog)
+    assert tag_index(catalog) is index
+    assert index == build_tag_index(catalog)
+
+    catalog[0]["tags"] = ["fresh"]
+    assert tag_index(catalog, refresh=True)["fresh"] == [0]
+    weights = Counter({"fresh": 2})
+    assert score_models(weights, catalog, 1)[0]["model"] is catalog[0]
+
+
+# ============================================================
+# ---------- MODEL SIMILARITY ----------
+# ============================================================
+
+def _scan_adjacent(top_model, all_models, threshold=0.35):
+    """The pairwise model_similarity() loop the similarity index replaced."""
+    adj = []
+    for m in all_models:
+        if m["id"] == top_model["id"]:
+            continue
+        sim = model_similarity(top_model, m)
+        if sim >= threshold:
+            adj.append({"model": m, "similarity": round(sim, 2)})
+    return sorted(adj, key=lambda x: -x["similarity"])
+
+
+def _pairs(adjacent):
+    return [(a["model"]["id"], a["similarity"]) for a in adjacent]
+
+
+def _clustered_catalog(n, seed):
+    """Models drawn around a few dozen base tag sets, so many pairs are genuinely similar."""
+    rng = random.Random(seed)
+    tags = [f"t{i}" for i in range(300)]
+    bases = [rng.sample(tags, 10) for _ in range(40)]
+    catalog = []
+    for i in range(n):
+        kept = [t for t in rng.choice(bases) if rng.random() < 0.85]
+        catalog.append({"id": f"M{i:05d}", "tags": kept + rng.sample(tags, rng.randint(0, 3))})
+    return catalog
+
+
+def test_bit_packed_jaccard_matches_set_jaccard():
+    catalog = _synthetic_catalog(120, 37, seed=4) + [{"id": "empty", "tags": []}]
+    index = SimilarityIndex(catalog)
+    matrix = index.matrix()
+    for i, m in enumerate(catalog):
+        ref = [model_similarity(m, other) for other in catalog]
+        assert matrix[i].tolist() == ref
+        assert index.similarities(m["tags"]).tolist() == ref
+    query = {"tags": ["t1", "t2", "not_a_tag"]}
+    assert index.similarities(query["tags"]).tolist() == [model_similarity(query, m) for m in catalog]
+    assert index.similarities([], [0, 1]).tolist() == [0.0, 0.0]
+
+
+@pytest.mark.parametrize("threshold", [0.0, 0.2, 0.35, 0.5, 1.0])
+def test_adjacent_models_match_the_pairwise_scan(models, threshold):
+    for m in models:
+        assert _pairs(find_adjacent_models(m, models, threshold)) == _pairs(_scan_adjacent(m, models, threshold))
+    # A model that is not an entry of the catalog list is answered from a direct query.
+    outsider = dict(models[0])
+    assert _pairs(find_adjacent_models(outsider, models, threshold)) == \
+        _pairs(_scan_adjacent(outsider, models, threshold))
+
+
+def test_threshold_compares_unrounded_similarity():
+    catalog = [{"id": "a", "tags": ["x", "y", "z"]}, {"id": "b", "tags": ["x", "y", "w"]}]
+    # Jaccard 2/4 = 0.5 exactly; 0.501 would round to 0.5 but must not match.
+    assert _pairs(find_adjacent_models(catalog[0], catalog, 0.5)) == [("b", 0.5)]
+    assert find_adjacent_models(catalog[0], catalog, 0.501) == []
+
+
+def test_large_catalog_lsh_results_are_exact_with_high_recall():
+    catalog = _clustered_catalog(SIMILARITY_MATRIX_MAX + 500, seed=5)
+    found = expected = 0
+    for m in catalog[:150]:
+        got = _pairs(find_adjacent_models(m, catalog, 0.5))
+        ref = _pairs(_scan_adjacent(m, catalog, 0.5))
+        assert set(got) <= set(ref)
+        assert got == [p for p in ref if p in set(got)]
+        found += len(got)
+        expected += len(ref)
+    assert expected > 1000
+    assert found / expected >= 0.99
+
+
+def test_large_catalog_low_threshold_uses_the_exact_scan():
+    catalog = _clustered_catalog(SIMILARITY_MATRIX_MAX + 10, seed=6)
+    threshold = LSH_MIN_THRESHOLD / 2
+    for m in catalog[:5]:
+        assert _pairs(find_adjacent_models(m, catalog, threshold)) == _pairs(_scan_adjacent(m, catalog, threshold))
+
+
+def test_similarity_index_is_cached_and_refreshable():
+    catalog = _synthetic_catalog(30, 10, seed=7)
+    index = similarity_index(catalog)
+    assert similarity_index(catalog) is index
+    catalog[0]["tags"] = list(catalog[1]["tags"])
+    assert similarity_index(catalog, refresh=True).matrix()[0, 1] == (1.0 if catalog[1]["tags"] else 0.0)
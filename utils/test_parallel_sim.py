@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+import utils.parallel_sim as parallel_sim
+from utils.parallel_sim import _merge_moments, default_workers, npv_bounds, parallel_success
+from utils.simulation import SIM_ARRAYS, draw_drivers, npv_samples, sim_chunk
+
+
+REVENUE = np.array([0.0, 300_000, 700_000, 1_000_000, 1_200_000])
+COST = np.array([1_500_000.0, 350_000, 450_000, 500_000, 550_000])
+N = 70_000
+TASK_SIZE = 20_000
+
+
+@pytest.fixture(scope="module")
+def runs():
+    # Several tasks from a small sample count, so the task split and merge are exercised.
+    # Each call starts a process pool, so both worker counts are run once for the module.
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(parallel_sim, "TASK_SIZE", TASK_SIZE)
+        return {w: parallel_success(REVENUE, COST, 0.1, N, seed=5, workers=w) for w in (1, 2)}
+
+
+def _reference_npvs(seed, n, task_size):
+    """The same spawned streams run in-process, one task after another."""
+    sizes = [min(task_size, n - s) for s in range(0, n, task_size)]
+    scale = max(np.abs(REVENUE).max(), np.abs(COST).max())
+    out = []
+    for child, size in zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes):
+        drivers = draw_drivers(np.random.default_rng(child), size, np.float32)
+        out.append(npv_samples(REVENUE / scale, COST / scale, 0.1, drivers).astype(np.float64) * scale)
+    return np.concatenate(out)
+
+
+# ============================================================
+# ---------- WORKER-COUNT INVARIANCE ----------
+# ============================================================
+
+def test_same_seed_gives_same_result_for_any_worker_count(runs):
+    one, two = runs[1], runs[2]
+    assert one["tasks"] == 4 and (one["workers"], two["workers"]) == (1, 2)
+    for key in ("success", "mean", "std", "p5", "p50", "p95", "n"):
+        assert one[key] == two[key]
+    np.testing.assert_array_equal(one["hist"], two["hist"])
+
+
+def test_merged_result_matches_a_direct_computation(runs):
+    res = runs[2]
+    npvs = _reference_npvs(5, N, TASK_SIZE)
+    assert res["n"] == N
+    assert res["success"] == pytest.approx(np.mean(npvs > 0) * 100, abs=1e-12)
+    assert res["mean"] == pytest.approx(npvs.mean(), rel=1e-9)
+    assert res["std"] == pytest.approx(npvs.std(), rel=1e-9)
+    bin_width = res["edges"][1] - res["edges"][0]
+    np.testing.assert_allclose([res["p5"], res["p50"], res["p95"]], np.percentile(npvs, [5, 50, 95]),
+                               atol=2 * bin_width)
+
+
+# ============================================================
+# ---------- MERGING ----------
+# ============================================================
+
+def test_pairwise_moment_merge_matches_numpy():
+    x = np.random.default_rng(0).normal(1e6, 3e5, 10_001)
+    n, mean, m2 = 0, 0.0, 0.0
+    for part in np.array_split(x, [3, 1000, 1001, 7000]):
+        n, mean, m2 = _merge_moments(n, mean, m2, part.size, part.mean(), ((part - part.mean()) ** 2).sum())
+    assert n == x.size
+    assert mean == pytest.approx(x.mean(), rel=1e-12)
+    assert m2 / n == pytest.approx(x.var(), rel=1e-10)
+
+
+def test_histogram_bounds_cover_every_draw():
+    lo, hi = npv_bounds(REVENUE, COST, 0.1)
+    npvs = _reference_npvs(1, 50_000, 50_000)
+    assert lo < npvs.min() and npvs.max() < hi
+
+
+# ============================================================
+# ---------- MEMORY ----------
+# ============================================================
+
+def test_default_workers_are_capped(monkeypatch):
+    monkeypatch.setattr(parallel_sim.os, "cpu_count", lambda: 96)
+    assert default_workers() == parallel_sim.MAX_WORKERS
+    monkeypatch.setattr(parallel_sim.os, "cpu_count", lambda: None)
+    assert default_workers() == 1
+
+
+@pytest.mark.parametrize("periods", [10, 120, 480, 4800])
+def test_worker_blocks_share_the_memory_budget(periods):
+    for workers in (1, 2, 4, 16):
+        chunk = sim_chunk(periods, budget=parallel_sim.PARALLEL_CHUNK_BYTES // workers)
+        if chunk > 1:
+            assert workers * chunk * periods * 4 * SIM_ARRAYS <= parallel_sim.PARALLEL_CHUNK_BYTES
@@ -0,0 +1,86 @@
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("reportlab")
+
+import utils.pdf_report as pdf_report
+from utils.pdf_report import build_financial_pdf, dismiss_pdf, pdf_status, request_pdf
+
+
+def _summary(irr=12.5):
+    return pd.DataFrame(
+        [["Baseline", 1_250_000.0, irr, 3.2, 0.8, 64.0], ["Pessimistic", -300_000.0, np.nan, None, -0.1, 21.0]],
+        columns=["Scenario", "NPV (R)", "IRR (%)", "Payback (yrs)", "Profitability Index", "Success Prob. (%)"],
+    )
+
+
+def _tables():
+    years = np.arange(1, 4)
+    df = pd.DataFrame({c: years * 1000.0 for c in pdf_report.YEAR_COLUMNS})
+    df["Year"] = years
+    return {"Baseline": df, "Pessimistic": df.assign(**{"Net Cashflow (R)": -df["Net Cashflow (R)"]})}
+
+
+def _wait(key, timeout=30.0):
+    end = time.monotonic() + timeout
+    while pdf_status(key)[0] == "running" and time.monotonic() < end:
+        time.sleep(0.02)
+    return pdf_status(key)
+
+
+# ============================================================
+# ---------- REPORT ----------
+# ============================================================
+
+def test_report_is_a_pdf_with_one_page_per_scenario():
+    pdf = build_financial_pdf(_summary(), _tables())
+    assert pdf.startswith(b"%PDF")
+    assert pdf.count(b"/Type /Page\n") + pdf.count(b"/Type /Page ") >= 3
+
+
+# ============================================================
+# ---------- BACKGROUND JOBS ----------
+# ============================================================
+
+def test_job_result_is_cached_by_key():
+    key = "test-ready"
+    assert pdf_status(key) == ("missing", None)
+    request_pdf(key, _summary(), _tables())
+    status, pdf = _wait(key)
+    assert status == "ready" and pdf.startswith(b"%PDF")
+    assert pdf_status(key) == ("ready", pdf)
+
+
+def test_failure_is_kept_until_dismissed(monkeypatch):
+    def broken(summary, tables):
+        raise RuntimeError("no fonts")
+
+    monkeypatch.setattr(pdf_report, "build_financial_pdf", broken)
+    key = "test-failed"
+    request_pdf(key, _summary(), _tables())
+    status, err = _wait(key)
+    assert status == "failed" and "no fonts" in str(err)
+    # Reported again on every later rerun, not just the first status check.
+    assert pdf_status(key) == ("failed", err)
+    dismiss_pdf(key)
+    assert pdf_status(key) == ("missing", None)
+
+
+def test_retry_replaces_a_failure(monkeypatch):
+    calls = []
+
+    def flaky(summary, tables):
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("transient")
+        return b"%PDF-retried"
+
+    monkeypatch.setattr(pdf_report, "build_financial_pdf", flaky)
+    key = "test-retry"
+    request_pdf(key, _summary(), _tables())
+    assert _wait(key)[0] == "failed"
+    request_pdf(key, _summary(), _tables())
+    assert _wait(key) == ("ready", b"%PDF-retried")
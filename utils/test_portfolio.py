@@ -0,0 +1,97 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.finance import npv
+from utils.portfolio import PRODUCT_COLUMNS, build_portfolio, portfolio_frame, product_frame, read_products
+from utils.projection import period_rate, seasonality
+
+
+def _csv(text):
+    return io.StringIO(text)
+
+
+def test_read_products_keeps_known_columns_in_order():
+    header = ",".join(["Extra"] + PRODUCT_COLUMNS[::-1])
+    df = read_products(_csv(header + "\nx,0.0,3000,0.0,5000,0.1,1000,Product A\n"))
+    assert list(df.columns) == PRODUCT_COLUMNS
+    assert df.loc[0, "Units (Year 1)"] == 1000 and df.loc[0, "Product"] == "Product A"
+
+
+@pytest.mark.parametrize("text, message", [
+    ("Product,Units\nA,10\n", "Missing column"),
+    (",".join(PRODUCT_COLUMNS) + "\nA,ten,0.1,5000,0,3000,0\n", "Non-numeric"),
+    ("", "Could not read"),
+    ('Product,"Units\nA,1\n', "Could not read"),
+])
+def test_read_products_rejects_bad_files(text, message):
+    with pytest.raises(ValueError, match=message):
+        read_products(_csv(text))
+
+
+# ============================================================
+# ---------- PORTFOLIO ENGINE ----------
+# ============================================================
+
+def _products(n=5, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "Product": [f"P{i}" for i in range(n)],
+        "Units (Year 1)": rng.uniform(100, 5000, n),
+        "Units Growth": rng.uniform(-0.1, 0.4, n),
+        "Price (R/u)": rng.uniform(50, 900, n),
+        "Price Growth": rng.uniform(0, 0.08, n),
+        "COGS (R/u)": rng.uniform(20, 400, n),
+        "COGS Growth": rng.uniform(0, 0.1, n),
+    }, columns=PRODUCT_COLUMNS)
+
+
+def _product_loop(row, years, periods_per_year, profile):
+    """One product line period by period: Year-1 units spread over the year, compounding per period."""
+    season = seasonality(profile) if periods_per_year == 12 else np.ones(periods_per_year)
+    g_u, g_p, g_c = (float(period_rate(row[c], periods_per_year)) for c in ("Units Growth", "Price Growth", "COGS Growth"))
+    weights = [(1 + g_u) ** t * season[t % periods_per_year] for t in range(years * periods_per_year)]
+    units = [w * row["Units (Year 1)"] / sum(weights[:periods_per_year]) for w in weights]
+    price = [row["Price (R/u)"] * (1 + g_p) ** t for t in range(len(units))]
+    cogs = [row["COGS (R/u)"] * (1 + g_c) ** t for t in range(len(units))]
+    return units, [u * p for u, p in zip(units, price)], [u * c for u, c in zip(units, cogs)]
+
+
+@pytest.mark.parametrize("periods_per_year, profile", [(1, "Flat"), (12, "Year-end retail")])
+def test_product_lines_match_a_per_product_loop(periods_per_year, profile):
+    products = _products()
+    port = build_portfolio(products, 4, 600_000.0, 2e6, periods_per_year, profile)
+    for i, (_, row) in enumerate(products.iterrows()):
+        units, revenue, cogs = _product_loop(row, 4, periods_per_year, profile)
+        np.testing.assert_allclose(port["units"][i], units, rtol=1e-10)
+        np.testing.assert_allclose(port["revenue"][i], revenue, rtol=1e-10)
+        np.testing.assert_allclose(port["cogs"][i], cogs, rtol=1e-10)
+
+
+@pytest.mark.parametrize("periods_per_year, profile", [(1, "Flat"), (12, "Summer peak (Southern Hemisphere)")])
+def test_portfolio_total_is_the_sum_of_its_products(periods_per_year, profile):
+    products = _products(7, seed=1)
+    opex, capex = 900_000.0, 3e6
+    port = build_portfolio(products, 5, opex, capex, periods_per_year, profile)
+    solo = [build_portfolio(products.iloc[[i]], 5, 0.0, 0.0, periods_per_year, profile) for i in range(len(products))]
+    shared = port["opex"] + port["capex"]
+    assert port["opex"].sum() == pytest.approx(5 * opex) and port["capex"].sum() == capex and port["capex"][0] == capex
+    np.testing.assert_allclose(port["net"], sum(p["net"] for p in solo) - shared, rtol=1e-10, atol=1e-6)
+    # NPV is linear, so the portfolio's NPV is the products' NPVs less the shared costs'.
+    rate = float(period_rate(0.12, periods_per_year))
+    assert npv(rate, port["net"], "end") == pytest.approx(
+        sum(npv(rate, p["net"], "end") for p in solo) - npv(rate, shared, "end"), rel=1e-9)
+
+
+def test_annual_tables_add_up():
+    products = _products(4, seed=2)
+    port = build_portfolio(products, 3, 500_000.0, 1e6, 12, "Year-end retail")
+    total = portfolio_frame(port, 12)
+    lines = [product_frame(port, i, 12) for i in range(len(products))]
+    for col in ("Units", "Revenue (R)", "COGS (R)"):
+        np.testing.assert_allclose(total[col], sum(f[col] for f in lines), rtol=1e-10)
+    np.testing.assert_allclose(total["Net Cashflow (R)"],
+                               sum(f["Gross Margin (R)"] for f in lines) - total["OPEX (R)"] - total["CAPEX (R)"], rtol=1e-10)
+    np.testing.assert_allclose(lines[0]["Units"][0], products.loc[0, "Units (Year 1)"])
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from utils.projection import (
+    LINE_ITEMS, MONTHS, SEASONALITY_PROFILES, build_monthly, expand_annual, period_rate, to_annual, unit_shares,
+)
+
+
+PROFILES = list(SEASONALITY_PROFILES)
+
+
+def _monthly(growth, profile, years=4):
+    return build_monthly(1200.0, growth, 150.0, 80.0, 240_000.0, 500_000.0, years, profile)
+
+
+# ============================================================
+# ---------- MONTHLY ENGINE ----------
+# ============================================================
+
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.parametrize("growth", [0.0, 0.25, -0.1])
+def test_monthly_build_keeps_year_one_inputs(growth, profile):
+    annual = to_annual(_monthly(growth, profile))
+    assert list(annual) == LINE_ITEMS and all(v.shape == (4,) for v in annual.values())
+    assert annual["units"][0] == pytest.approx(1200.0)
+    np.testing.assert_allclose(annual["opex"], 240_000.0)
+    np.testing.assert_allclose(annual["capex"], [500_000.0, 0, 0, 0])
+    # Year totals grow at the annual rate whatever the seasonality.
+    np.testing.assert_allclose(annual["units"][1:] / annual["units"][:-1], 1 + growth)
+
+
+@pytest.mark.parametrize("growth", [0.0, 0.3])
+def test_unit_shares_sum_to_one_and_follow_growth(growth):
+    shares = unit_shares(growth, "Year-end retail")
+    assert shares.shape == (MONTHS,) and shares.sum() == pytest.approx(1.0)
+    flat = unit_shares(growth)
+    np.testing.assert_allclose(flat[1:] / flat[:-1], 1 + period_rate(growth, MONTHS))
+
+
+# ============================================================
+# ---------- ROUND TRIPS ----------
+# ============================================================
+
+@pytest.mark.parametrize("profile", PROFILES)
+@pytest.mark.parametrize("growth", [0.0, 0.25])
+def test_monthly_to_annual_and_back_is_the_identity(growth, profile):
+    monthly = _monthly(growth, profile)
+    annual = to_annual(monthly)
+    price = annual["revenue"] / annual["units"]
+    cogs = annual["cogs"] / annual["units"]
+    back = expand_annual(annual["units"], price, cogs, annual["opex"], annual["capex"], unit_shares(growth, profile))
+    for item in LINE_ITEMS:
+        np.testing.assert_allclose(back[item], monthly[item], rtol=1e-12, atol=1e-6)
+
+
+def test_edited_annual_table_survives_expand_and_sum():
+    rng = np.random.default_rng(3)
+    units, price, cogs = rng.uniform(100, 5000, 6), rng.uniform(50, 200, 6), rng.uniform(10, 60, 6)
+    opex, capex = rng.uniform(1e5, 4e5, 6), rng.uniform(0, 1e6, 6) * (rng.random(6) < 0.5)
+    monthly = expand_annual(units, price, cogs, opex, capex, unit_shares(0.2, "Summer peak (Southern Hemisphere)"))
+    assert all(v.shape == (6 * MONTHS,) for v in monthly.values())
+    annual = to_annual(monthly)
+    np.testing.assert_allclose(annual["units"], units)
+    np.testing.assert_allclose(annual["revenue"], units * price)
+    np.testing.assert_allclose(annual["cogs"], units * cogs)
+    np.testing.assert_allclose(annual["opex"], opex)
+    np.testing.assert_allclose(annual["capex"], capex)
+    np.testing.assert_allclose(annual["net"], units * (price - cogs) - opex - capex)
+    # Each year's CAPEX lands in its first month.
+    np.testing.assert_array_equal(np.flatnonzero(monthly["capex"]), np.flatnonzero(capex) * MONTHS)
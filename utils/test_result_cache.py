@@ -0,0 +1,99 @@
+import weakref
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import utils.result_cache as result_cache
+from utils.result_cache import ResultCache, frame_key
+from utils.simulation import success_distribution
+
+
+def _table():
+    return pd.DataFrame({
+        "Year": [1, 2, 3],
+        "Units": [100.0, 150.0, 200.0],
+        "Price (R/u)": [50.0, 50.0, 55.0],
+        "Product": ["A", "A", "B"],
+    })
+
+
+# ============================================================
+# ---------- CONTENT KEYS ----------
+# ============================================================
+
+def test_frame_key_depends_only_on_content():
+    assert frame_key(_table(), 0.1, 500) == frame_key(_table().copy(), 0.1, 500)
+
+
+@pytest.mark.parametrize("change", [
+    lambda df: df.assign(Units=df["Units"] + [0.0, 0.0, 1e-9]),
+    lambda df: df.assign(Product=["A", "A", "C"]),
+    lambda df: df.rename(columns={"Units": "Volume"}),
+    lambda df: df.astype({"Year": float}),
+])
+def test_frame_key_changes_with_the_table(change):
+    assert frame_key(change(_table()), 0.1) != frame_key(_table(), 0.1)
+
+
+def test_frame_key_changes_with_the_parameters():
+    assert frame_key(_table(), 0.1, 500) != frame_key(_table(), 0.1, 501)
+    assert frame_key(_table(), 0.1, 500) != frame_key(_table(), 0.1, 500, "sobol")
+
+
+# ============================================================
+# ---------- LRU CACHE ----------
+# ============================================================
+
+def test_hits_and_misses_are_counted():
+    cache = ResultCache(max_entries=4)
+    assert cache.get("a") is None
+    value = {"npv": 1.0}
+    cache.put("a", value)
+    assert cache.get("a") is value
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+    assert len(cache) == 2
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+
+
+def test_global_budget_evicts_oldest_entry_across_caches(monkeypatch):
+    # Caches created elsewhere in the process (e.g. by a page under test) must not take part.
+    monkeypatch.setattr(ResultCache, "_instances", weakref.WeakSet())
+    monkeypatch.setattr(ResultCache, "_total_bytes", 0)
+    block = np.zeros(1000)
+    monkeypatch.setattr(result_cache, "GLOBAL_MAX_BYTES", 2.5 * block.nbytes)
+    first, second = ResultCache(), ResultCache()
+    first.put("a", block.copy())
+    second.put("b", block.copy())
+    first.put("c", block.copy())
+    assert first.get("a") is None
+    assert second.get("b") is not None and first.get("c") is not None
+    first.clear()
+    second.clear()
+
+
+# ============================================================
+# ---------- SEEDED RESULTS ----------
+# ============================================================
+
+@pytest.mark.parametrize("sampler", ["random", "lhs", "sobol"])
+def test_seeded_simulation_is_a_valid_cache_entry(sampler):
+    # A cached result is only correct if recomputing it with the same key gives the same value.
+    revenue = np.array([0.0, 400_000, 700_000, 900_000])
+    cost = np.array([900_000.0, 250_000, 300_000, 350_000])
+    runs = [success_distribution(revenue, cost, 0.12, 4_000, rng=np.random.default_rng(7), sampler=sampler)
+            for _ in range(2)]
+    assert runs[0] == runs[1]
+    other = success_distribution(revenue, cost, 0.12, 4_000, rng=np.random.default_rng(8), sampler=sampler)
+    assert other["mean"] != runs[0]["mean"]
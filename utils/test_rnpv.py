@@ -0,0 +1,28 @@
+import numpy as np
+
+from utils.rnpv import default_stages, expected_rnpv, sample_rnpv, stage_breakdown
+
+
+def test_zero_probability_stage_stops_later_spend():
+    stages = default_stages()
+    stages.loc[stages["From TRL"] == 5, "Success probability"] = 0.0
+    res = expected_rnpv(stages, [3, 7], 50_000_000, 0.1)
+    assert np.all(np.isfinite(res["rnpv"]))
+    # TRL 3 project: never launches, and nothing after the failing stage is ever started.
+    assert res["p_success"][0] == 0.0
+    table = stage_breakdown(stages, 3, 0.1)
+    assert np.all(np.isfinite(table["P(start) (%)"]))
+    blocked = np.flatnonzero(table["P(pass) (%)"].to_numpy() == 0)[0]
+    assert np.all(table["P(start) (%)"].to_numpy()[blocked + 1:] == 0)
+    assert res["rnpv"][0] == -table["Risked cost PV (R)"].sum()
+    # TRL 7 project is past the failing stage and unaffected.
+    assert res["p_success"][1] > 0
+
+
+def test_sampled_mean_matches_expected_rnpv():
+    stages = default_stages()
+    stages.loc[stages["From TRL"] == 4, "Success probability"] = 0.0
+    trl = [2, 6]
+    expected = expected_rnpv(stages, trl, 40_000_000, 0.08)["rnpv"].sum()
+    total = sample_rnpv(stages, trl, 40_000_000, 0.08, 20_000, rng=np.random.default_rng(3))["total"]
+    assert abs(total.mean() - expected) < 4 * total.std() / np.sqrt(total.size) + 1e-6
@@ -0,0 +1,52 @@
+import json
+import os
+
+import pytest
+
+pytest.importorskip("streamlit.testing.v1")
+from streamlit.testing.v1 import AppTest
+
+from utils.bm_rule_engine import load_compiled
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGE = os.path.join(ROOT, "pages", "02_Business_Model_Selector.py")
+
+
+@pytest.fixture
+def at():
+    with open(os.path.join(ROOT, "data", "archetype_tags.json")) as f:
+        archetype = next(iter(json.load(f)))
+    at = AppTest.from_file(PAGE, default_timeout=60)
+    at.session_state["archetype"] = archetype
+    at.session_state["secondary_done"] = True
+    at.run()
+    assert not at.exception
+    return at
+
+
+def _answered(at):
+    return {s.key: s.value for s in at.selectbox if s.key and s.key.startswith("rule_") and s.value is not None}
+
+
+# ============================================================
+# ---------- QUESTIONNAIRE STATE ----------
+# ============================================================
+
+def test_answers_survive_a_run_without_the_questionnaire(at):
+    questions = {}
+    for qid, ans in load_compiled().options:
+        questions.setdefault(qid, []).append(ans)
+    picks = {f"rule_{qid}": options[-1] for qid, options in list(questions.items())[:2]}
+    for key, ans in picks.items():
+        at.selectbox(key=key).set_value(ans).run()
+    assert _answered(at) == picks
+
+    # Back to the profile questions: the questionnaire is not rendered, so its widget state is dropped.
+    at.session_state["secondary_done"] = False
+    at.run()
+    at.session_state["secondary_done"] = True
+    at.run()
+    assert not at.exception
+    assert _answered(at) == picks
+    assert {f"rule_{q}": a for q, a in at.session_state["rule_scorer"].answers.items()} == picks
@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+from utils.finance import IRR_GRID, irr
+from utils.projection import build_monthly, period_rate
+from utils.sensitivity import (
+    DRIVER_LABELS, DRIVERS, IRR_BLOCK_BUDGET, IRR_GRID_ARRAYS, IRR_PERIOD_ARRAYS, POINTWISE_BUDGET, batch_npv,
+    driver_range, grid_irr, grid_npv, irr_block_rows, pointwise_chunk, pointwise_npv, tornado,
+)
+
+
+def _npv_listcomp(rate, flows):
+    """The list-comprehension NPV (end-of-period flows) the batched kernels replaced."""
+    return np.sum([cf / (1 + rate)**t for t, cf in enumerate(flows, start=1)])
+
+
+def _random_sets(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {
+        "units": rng.uniform(500, 1500, n), "growth": rng.uniform(0, 0.3, n),
+        "price": rng.uniform(4000, 6000, n), "cogs": rng.uniform(2000, 4000, n),
+        "opex": rng.uniform(1e5, 3e5, n), "capex": rng.uniform(5e5, 2e6, n),
+        "discount": rng.uniform(0.05, 0.2, n),
+    }
+
+
+@pytest.mark.parametrize("periods_per_year, years", [(1, 10), (12, 5)])
+def test_pointwise_matches_batch_npv_for_any_chunking(periods_per_year, years):
+    params = _random_sets(500)
+    ref = batch_npv(params, years, periods_per_year)
+    for chunk, workers in [(None, 1), (7, 1), (None, 4), (64, 3)]:
+        got = pointwise_npv(params, years, periods_per_year, chunk=chunk, workers=workers)
+        np.testing.assert_allclose(got, ref, rtol=1e-10)
+
+
+def test_chunk_memory_does_not_grow_with_workers():
+    periods = 40 * 12
+    for workers in (1, 2, 4, 16):
+        assert workers * pointwise_chunk(periods, workers) * periods * 8 <= POINTWISE_BUDGET
+
+
+# ============================================================
+# ---------- TWO-WAY GRID ----------
+# ============================================================
+
+BASE = {"units": 1000.0, "growth": 0.1, "price": 5000.0, "cogs": 3000.0,
+        "opex": 1.2e6, "capex": 2.5e6, "discount": 0.12}
+
+
+def _scalar_flows(d, years, periods_per_year, profile="Flat"):
+    """One driver set through the page's table builders (unrounded units)."""
+    if periods_per_year == 1:
+        units = d["units"] * (1 + d["growth"]) ** np.arange(years)
+        capex = np.zeros(years)
+        capex[0] = d["capex"]
+        return units * d["price"] - units * d["cogs"] - d["opex"] - capex
+    return build_monthly(d["units"], d["growth"], d["price"], d["cogs"], d["opex"], d["capex"], years, profile)["net"]
+
+
+def _cells(x_driver, xs, y_driver, ys):
+    for i, y in enumerate(ys):
+        for j, x in enumerate(xs):
+            yield i, j, {**BASE, x_driver: x, y_driver: y}
+
+
+@pytest.mark.parametrize("periods_per_year, profile", [(1, "Flat"), (12, "Year-end retail")])
+@pytest.mark.parametrize("x_driver, y_driver", [("price", "units"), ("growth", "discount"), ("capex", "opex")])
+def test_grid_npv_matches_per_cell_scalar_npv(x_driver, y_driver, periods_per_year, profile):
+    xs = driver_range(BASE[x_driver], 0.3, 5)
+    ys = driver_range(BASE[y_driver], 0.3, 4)
+    grid = grid_npv(BASE, x_driver, xs, y_driver, ys, 6, periods_per_year, profile)
+    assert grid.shape == (4, 5)
+    for i, j, d in _cells(x_driver, xs, y_driver, ys):
+        flows = _scalar_flows(d, 6, periods_per_year, profile)
+        ref = _npv_listcomp(float(period_rate(d["discount"], periods_per_year)), flows)
+        assert grid[i, j] == pytest.approx(ref, rel=1e-9, abs=1e-3)
+
+
+@pytest.mark.parametrize("periods_per_year", [1, 12])
+def test_grid_irr_matches_per_cell_scalar_irr(periods_per_year):
+    xs = driver_range(BASE["price"], 0.3, 5)
+    ys = driver_range(BASE["growth"], 0.5, 4)
+    grid = grid_irr(BASE, "price", xs, "growth", ys, 8, periods_per_year)
+    for i, j, d in _cells("price", xs, "growth", ys):
+        flows = _scalar_flows(d, 8, periods_per_year)
+        irr_flows = np.concatenate([[-d["capex"]], flows[1:]])
+        rate = irr(irr_flows, guess=float(period_rate(d["discount"], periods_per_year)))
+        ref = (1 + rate) ** periods_per_year - 1
+        if np.isnan(ref):
+            assert np.isnan(grid[i, j])
+        else:
+            assert grid[i, j] == pytest.approx(ref, abs=1e-8)
+    assert np.isfinite(grid).sum() > 10
+
+
+@pytest.mark.parametrize("block_rows", [1, 3, 7])
+def test_grid_irr_blocks_match_one_pass(block_rows):
+    xs = driver_range(BASE["price"], 0.4, 6)
+    ys = driver_range(BASE["capex"], 0.6, 7)
+    whole = grid_irr(BASE, "price", xs, "capex", ys, 5, 12, block_rows=len(ys))
+    np.testing.assert_array_equal(grid_irr(BASE, "price", xs, "capex", ys, 5, 12, block_rows=block_rows), whole)
+
+
+def test_irr_blocks_stay_within_budget():
+    for periods, columns in [(10, 50), (480, 200), (480, 300), (4800, 300)]:
+        rows = irr_block_rows(periods, columns)
+        assert rows >= 1
+        if rows > 1:
+            assert rows * columns * 8 * (IRR_PERIOD_ARRAYS * periods + IRR_GRID_ARRAYS * len(IRR_GRID)) <= IRR_BLOCK_BUDGET
+
+
+# ============================================================
+# ---------- TORNADO ----------
+# ============================================================
+
+def _pointwise_npv(d, years, periods_per_year, profile="Flat"):
+    return _npv_listcomp(float(period_rate(d["discount"], periods_per_year)),
+                         _scalar_flows(d, years, periods_per_year, profile))
+
+
+@pytest.mark.parametrize("periods_per_year, profile", [(1, "Flat"), (12, "Year-end retail")])
+def test_tornado_bars_match_pointwise_npv_at_low_and_high(periods_per_year, profile):
+    levels = [0.1, 0.25]
+    table = tornado(BASE, 6, periods_per_year, profile, levels=levels)
+    assert len(table) == len(DRIVERS) * len(levels)
+    by_label = {DRIVER_LABELS[d]: d for d in DRIVERS}
+    for _, row in table.iterrows():
+        d, lvl = by_label[row["Driver"]], row["Change (±%)"] / 100
+        low = _pointwise_npv({**BASE, d: BASE[d] * (1 - lvl)}, 6, periods_per_year, profile)
+        high = _pointwise_npv({**BASE, d: BASE[d] * (1 + lvl)}, 6, periods_per_year, profile)
+        assert row["NPV at -"] == pytest.approx(low, rel=1e-9, abs=1e-3)
+        assert row["NPV at +"] == pytest.approx(high, rel=1e-9, abs=1e-3)
+        assert row["Swing (R)"] == pytest.approx(abs(high - low), rel=1e-9, abs=1e-3)
+    assert table.attrs["base_npv"] == pytest.approx(_pointwise_npv(BASE, 6, periods_per_year, profile), rel=1e-9)
+
+
+def test_tornado_bars_are_sorted_by_swing():
+    table = tornado(BASE, 8, levels=[0.05, 0.1, 0.2])
+    swings = table["Swing (R)"].to_numpy()
+    assert (np.diff(swings) <= 0).all()
+    # A wider perturbation of the same driver never swings NPV less.
+    for _, rows in table.groupby("Driver"):
+        assert (np.diff(rows.sort_values("Change (±%)")["Swing (R)"].to_numpy()) >= -1e-6).all()
+
+
+def test_tornado_driver_subset_and_driver_range():
+    table = tornado(BASE, 5, drivers=["price", "opex"])
+    assert set(table["Driver"]) == {DRIVER_LABELS["price"], DRIVER_LABELS["opex"]}
+    np.testing.assert_allclose(driver_range(200.0, 0.25, 3), [150.0, 200.0, 250.0])
+    np.testing.assert_allclose(driver_range(0.0, 0.3, 4), [0.0, 0.1, 0.2, 0.3])
@@ -0,0 +1,256 @@
+import numpy as np
+import pytest
+
+import utils.simulation as simulation
+from utils.simulation import (
+    CHUNK_SIZE, PATH_CHUNK_BYTES, PATH_TENSOR_COPIES, QMC_REPLICATES, SIM_ARRAYS, SIM_CHUNK_BYTES, cholesky_factor,
+    draw_drivers, driver_paths, funding_need, npv_samples, path_chunk, replicate_interval, replicate_sizes,
+    simulate_npv, simulate_path_npv, sim_chunk, stack_success, stream_success, success_distribution, uniform_samples,
+)
+
+
+# ============================================================
+# ---------- FUNDING NEED ----------
+# ============================================================
+
+REVENUE = np.array([0.0, 200_000, 600_000, 900_000, 1_200_000])
+COGS = 0.4 * REVENUE
+FIXED = np.array([1_000_000.0, 150_000, 150_000, 150_000, 150_000])
+
+
+def _need(cash_on_hand, seed=5):
+    return funding_need(REVENUE, COGS, FIXED, 4_000, cash_on_hand, rng=np.random.default_rng(seed))
+
+
+def test_need_is_trough_net_of_cash_on_hand():
+    gross = _need(0.0)["need"]
+    assert gross.min() > 0
+    cash = float(np.median(gross))
+    np.testing.assert_allclose(_need(cash)["need"], np.maximum(0.0, gross - cash), rtol=1e-6, atol=1.0)
+
+
+def test_cash_on_hand_covering_the_trough_needs_no_raise():
+    res = _need(1e9)
+    assert np.all(res["need"] == 0.0)
+    assert np.all(np.isnan(res["cash_out"]))
+
+
+# ============================================================
+# ---------- STREAMING EARLY STOP ----------
+# ============================================================
+
+@pytest.mark.parametrize("sampler", ["random", "lhs", "sobol"])
+def test_stream_success_is_reproducible_for_a_seed(sampler):
+    runs = [stream_success(REVENUE, COGS + FIXED, 0.1, 200_000, tolerance=0.5,
+                           rng=np.random.default_rng(42), sampler=sampler) for _ in range(2)]
+    assert runs[0]["stopped"] == "tolerance" and runs[0]["reproducible"]
+    for key in ("success", "n", "mean", "p5", "p95", "ci_low", "ci_high"):
+        assert runs[0][key] == runs[1][key]
+
+
+@pytest.mark.parametrize("sampler", ["lhs", "sobol"])
+def test_qmc_stops_earlier_than_pseudo_random(sampler):
+    def run(s):
+        return stream_success(REVENUE, COGS + FIXED, 0.1, 2_000_000, tolerance=0.3,
+                              rng=np.random.default_rng(42), sampler=s)
+
+    random_run, qmc_run = run("random"), run(sampler)
+    assert random_run["stopped"] == qmc_run["stopped"] == "tolerance"
+    assert qmc_run["n"] * 2 <= random_run["n"]
+    assert (qmc_run["ci_high"] - qmc_run["ci_low"]) / 2 <= 0.3
+    assert abs(qmc_run["success"] - random_run["success"]) < 0.6
+
+
+def test_replicate_interval_matches_the_t_interval():
+    rates = np.array([0.30, 0.32, 0.31, 0.29, 0.33, 0.30])
+    lo, hi = replicate_interval(rates)
+    half = 2.5706 * rates.std(ddof=1) / np.sqrt(rates.size)
+    assert (lo, hi) == pytest.approx((rates.mean() - half, rates.mean() + half), abs=1e-4)
+    assert replicate_interval([0.3]) == (0.0, 1.0)
+
+
+def test_time_budget_stop_is_marked_not_reproducible():
+    res = stream_success(REVENUE, COGS + FIXED, 0.1, 10_000_000, tolerance=0.0, time_budget=0.0,
+                         rng=np.random.default_rng(1))
+    assert res["stopped"] == "time" and not res["reproducible"]
+
+
+# ============================================================
+# ---------- SAMPLING ----------
+# ============================================================
+
+@pytest.mark.parametrize("sampler", ["random", "lhs", "sobol"])
+def test_uniform_samples_shape_and_range(sampler):
+    u = uniform_samples(np.random.default_rng(0), 1000, 3, sampler)
+    assert u.shape == (1000, 3) and u.dtype == np.float32
+    assert u.min() >= 0.0 and u.max() < 1.0
+
+
+@pytest.mark.parametrize("sampler", ["lhs", "sobol"])
+def test_qmc_designs_are_stratified_in_every_dimension(sampler):
+    n = 256
+    u = uniform_samples(np.random.default_rng(3), n, 3, sampler, dtype=np.float64)
+    for col in u.T:
+        assert sorted(np.floor(col * n).astype(int)) == list(range(n))
+
+
+def test_unknown_sampler_is_rejected():
+    with pytest.raises(ValueError, match="Unknown sampler"):
+        uniform_samples(np.random.default_rng(0), 10, 3, "halton")
+
+
+@pytest.mark.parametrize("sampler, n, expected", [
+    ("random", 1000, (1, 1000)),
+    ("lhs", 1000, (QMC_REPLICATES, 125)),
+    ("lhs", 1001, (QMC_REPLICATES, 126)),
+    ("sobol", 1000, (QMC_REPLICATES, 128)),
+    ("sobol", 1025, (QMC_REPLICATES, 256)),
+])
+def test_replicate_sizes(sampler, n, expected):
+    assert replicate_sizes(n, sampler) == expected
+
+
+# ============================================================
+# ---------- BATCHED MONTE CARLO ----------
+# ============================================================
+
+def _npv_listcomp(rate, flows):
+    """The list-comprehension NPV (end-of-period flows) the batched kernels replaced."""
+    return np.sum([cf / (1 + rate)**t for t, cf in enumerate(flows, start=1)])
+
+
+def test_npv_samples_match_scalar_npv_per_draw():
+    revenue, cost = REVENUE / 1e6, (COGS + FIXED) / 1e6
+    drivers = draw_drivers(np.random.default_rng(2), 200, dtype=np.float64)
+    got = npv_samples(revenue, cost, 0.1, drivers)
+    ref = [_npv_listcomp(0.1 * d[2], d[0] * revenue - d[1] * cost) for d in drivers]
+    np.testing.assert_allclose(got, ref, rtol=1e-10)
+
+
+@pytest.mark.parametrize("sampler", ["random", "lhs", "sobol"])
+def test_simulation_is_reproducible_for_a_seed(sampler):
+    runs = [simulate_npv(REVENUE, COGS + FIXED, 0.1, 3_000, rng=np.random.default_rng(9), sampler=sampler)
+            for _ in range(2)]
+    np.testing.assert_array_equal(runs[0], runs[1])
+    assert runs[0].shape == replicate_sizes(3_000, sampler)
+
+
+def test_samplers_agree_on_the_success_estimate():
+    res = {s: success_distribution(REVENUE, COGS + FIXED, 0.1, 40_000, rng=np.random.default_rng(11), sampler=s)
+           for s in ("random", "lhs", "sobol")}
+    for s in ("lhs", "sobol"):
+        gap = abs(res[s]["success"] - res["random"]["success"])
+        assert gap < 4 * np.hypot(res[s]["success_se"], res["random"]["success_se"])
+        assert res[s]["mean_se"] < res["random"]["mean_se"]
+
+
+# ============================================================
+# ---------- SCENARIO STACKS ----------
+# ============================================================
+
+STACK_REVENUE = np.stack([REVENUE, REVENUE * 1.1, REVENUE * 0.9])
+STACK_COGS = 0.4 * STACK_REVENUE
+STACK_FIXED = np.broadcast_to(FIXED, STACK_REVENUE.shape)
+
+
+@pytest.mark.parametrize("sampler", ["random", "lhs"])
+@pytest.mark.parametrize("paths", [None, {"corr": np.eye(3), "vol": (0.1, 0.05, 0.05), "model": "random_walk"}])
+def test_stack_stops_once_every_scenario_meets_the_tolerance(sampler, paths):
+    res = stack_success(STACK_REVENUE, STACK_COGS, STACK_FIXED, 0.1, 2_000_000, rng=np.random.default_rng(4),
+                        sampler=sampler, paths=paths, tolerance=0.5)
+    assert res["stopped"] == "tolerance" and res["n"] < 2_000_000
+    half = (res["ci_high"] - res["ci_low"]) / 2
+    assert half.max() <= 0.5 and np.all((res["ci_low"] <= res["success"]) & (res["success"] <= res["ci_high"]))
+
+
+def test_stack_tolerance_matches_a_single_stream():
+    stack = stack_success(REVENUE, COGS, FIXED, 0.1, 2_000_000, rng=np.random.default_rng(8), tolerance=0.5)
+    single = stream_success(REVENUE, COGS + FIXED, 0.1, 2_000_000, tolerance=0.5, rng=np.random.default_rng(8))
+    assert stack["n"] == single["n"]
+    assert stack["success"][0] == pytest.approx(single["success"], abs=1e-9)
+
+
+def test_stack_without_tolerance_uses_the_full_cap():
+    res = stack_success(STACK_REVENUE, STACK_COGS, STACK_FIXED, 0.1, 30_000, rng=np.random.default_rng(4))
+    assert res["n"] == 30_000 and "stopped" not in res
+
+
+# ============================================================
+# ---------- MEMORY ----------
+# ============================================================
+
+@pytest.mark.parametrize("periods", [10, 120, 480, 4800])
+def test_sim_chunk_stays_within_budget(periods):
+    chunk = sim_chunk(periods)
+    assert 1 <= chunk <= CHUNK_SIZE
+    assert chunk * periods * 4 * SIM_ARRAYS <= SIM_CHUNK_BYTES
+
+
+@pytest.mark.parametrize("sampler", ["random", "lhs"])
+def test_block_size_does_not_change_the_simulation(monkeypatch, sampler):
+    run = lambda: simulate_npv(REVENUE, COGS + FIXED, 0.1, 5_000, rng=np.random.default_rng(3), sampler=sampler)
+    whole = run()
+    monkeypatch.setattr(simulation, "SIM_CHUNK_BYTES", 17 * len(REVENUE) * 4 * SIM_ARRAYS)
+    assert sim_chunk(len(REVENUE)) == 17
+    np.testing.assert_array_equal(run(), whole)
+
+
+# ============================================================
+# ---------- DRIVER PATHS ----------
+# ============================================================
+
+CORR = np.array([[1.0, 0.6, -0.3], [0.6, 1.0, 0.2], [-0.3, 0.2, 1.0]])
+VOL = np.array([0.2, 0.1, 0.3])
+PERIODS = 6
+
+
+def _paths(model, n=200_000, seed=0):
+    return driver_paths(np.random.default_rng(seed), n, PERIODS, CORR, VOL, model, reversion=0.7, dtype=np.float64)
+
+
+@pytest.mark.parametrize("model", ["random_walk", "mean_reverting"])
+def test_driver_paths_have_unit_mean(model):
+    paths = _paths(model)
+    assert paths.shape == (200_000, PERIODS, 3) and (paths > 0).all()
+    np.testing.assert_allclose(paths.mean(axis=0), 1.0, atol=0.01)
+
+
+@pytest.mark.parametrize("model", ["random_walk", "mean_reverting"])
+def test_driver_shocks_recover_the_correlation(model):
+    # The first period's log multipliers are the correlated shocks before any accumulation.
+    first = np.log(_paths(model)[:, 0, :])
+    np.testing.assert_allclose(np.corrcoef(first.T), CORR, atol=0.01)
+
+
+def test_random_walk_variance_grows_and_mean_reversion_bounds_it():
+    t = np.arange(1, PERIODS + 1)
+    phi = np.exp(-0.7)
+    walk = np.log(_paths("random_walk")).var(axis=0)
+    ar1 = np.log(_paths("mean_reverting")).var(axis=0)
+    np.testing.assert_allclose(walk, np.outer(t, VOL**2), rtol=0.03)
+    np.testing.assert_allclose(ar1, np.outer((1 - phi ** (2 * t)) / (1 - phi**2), VOL**2), rtol=0.03)
+    assert (ar1[-1] < walk[-1] / 4).all()
+
+
+@pytest.mark.parametrize("corr", [np.array([[1.0, 0.5], [0.4, 1.0]]), np.array([[1.0, 2.0], [2.0, 1.0]]), np.eye(2) * 2])
+def test_invalid_correlation_is_rejected(corr):
+    with pytest.raises(ValueError, match="Correlation matrix"):
+        cholesky_factor(corr)
+
+
+@pytest.mark.parametrize("periods", [10, 120, 360, 4800])
+def test_path_chunk_counts_every_per_sample_array(periods):
+    chunk = path_chunk(periods)
+    assert chunk * periods * 3 * 4 * PATH_TENSOR_COPIES <= PATH_CHUNK_BYTES
+
+
+@pytest.mark.parametrize("sampler", ["random", "lhs", "sobol"])
+def test_path_chunking_does_not_change_the_simulation(monkeypatch, sampler):
+    run = lambda: simulate_path_npv(REVENUE, COGS, FIXED, 0.1, 512, CORR, VOL, rng=np.random.default_rng(4),
+                                    sampler=sampler)
+    whole = run()
+    # A QMC design still fits, but it is transformed in slices of 37 rows.
+    monkeypatch.setattr(simulation, "QMC_CELL_BYTES", 4)
+    design = 512 * len(REVENUE) * 3 * 4
+    monkeypatch.setattr(simulation, "PATH_CHUNK_BYTES", design + 37 * len(REVENUE) * 3 * 4 * PATH_TENSOR_COPIES)
+    np.testing.assert_allclose(run(), whole, rtol=1e-6)